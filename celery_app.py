@@ -1,6 +1,10 @@
 # celery_app.py
 import os
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_ready, worker_shutdown
+from database.worker_db import worker_db
+from utils.browser_pool import browser_pool
+from utils.http_fetcher import http_fetcher
 
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 celery_app = Celery(
@@ -17,9 +21,45 @@ celery_app.conf.update(
     result_serializer="json",
     accept_content=["json"],
     result_expires=3600,
+    # Scans fan out into one subtask per pillar; take one task at a time so a
+    # slow pillar doesn't hold queued ones hostage on a busy worker
+    worker_prefetch_multiplier=1,
 )
 
 # Add these two lines (recommended)
 celery_app.conf.worker_redirect_stdouts = False
 # optional: if you do want redirecting but at a specific level
 # celery_app.conf.worker_redirect_stdouts_level = "INFO"
+
+
+# One database client and one browser pool per task-running process, for its
+# whole lifetime. Thread/solo pools run tasks in the main process
+# (worker_ready/worker_shutdown); prefork children each open their own
+# (worker_process_init/worker_process_shutdown).
+def _runs_tasks_in_main_process(consumer) -> bool:
+    pool_cls = getattr(getattr(consumer, "controller", None), "pool_cls", None)
+    return "prefork" not in getattr(pool_cls, "__module__", "")
+
+
+def _open_worker_resources():
+    worker_db.start()
+    browser_pool.start()
+
+
+@worker_ready.connect
+def open_main_process_resources(sender=None, **kwargs):
+    if _runs_tasks_in_main_process(sender):
+        _open_worker_resources()
+
+
+@worker_process_init.connect
+def open_pool_process_resources(**kwargs):
+    _open_worker_resources()
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def close_worker_resources(**kwargs):
+    browser_pool.shutdown()
+    http_fetcher.stop()
+    worker_db.stop()
@@ -0,0 +1,107 @@
+import json
+import os
+import time
+from typing import Any, Callable
+
+import redis
+
+from celery_app import REDIS_URL
+from utils.fetch_context import DeadlineExceeded, deadline_passed
+
+# How long a scan's shared artifacts are kept; they are dropped when the scan ends
+ARTIFACT_TTL = int(os.getenv("SCAN_ARTIFACT_TTL", "3600"))
+# How long one pillar may hold the right to produce an artifact before another takes over
+ARTIFACT_LOCK_TTL = int(os.getenv("SCAN_ARTIFACT_LOCK_TTL", "120"))
+# How often a pillar waiting on another's artifact checks for it
+ARTIFACT_POLL = 0.1
+# After a Redis error artifacts are produced locally for this many seconds
+REDIS_RETRY_AFTER = 30
+
+ARTIFACT_KEY = "scan:{scan_id}:artifact:{name}:{key}"
+LOCK_KEY = "scan:{scan_id}:artifact_lock:{name}:{key}"
+INDEX_KEY = "scan:{scan_id}:artifacts"
+
+
+class ScanArtifacts:
+    """
+    Redis store of a scan's shared inputs, so its pillars produce each once.
+
+    A scan's pillars run as separate tasks, possibly on different workers, so
+    the per-pillar fetch context can't share them. The first pillar to need an
+    artifact takes a lock and produces it; the others wait for its JSON
+    encoding and decode their own copy. If the producer fails or dies, the
+    lock is released (or expires) and the next pillar produces it instead.
+    Like the HTTP cache it fails open: while Redis is unreachable every
+    pillar produces its own.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL):
+        self._client = redis.Redis.from_url(redis_url)
+        self._down_until = 0.0
+
+    def _redis_failed(self, e: Exception):
+        if time.monotonic() >= self._down_until:
+            print(f"⚠️ Scan artifact store unavailable, producing artifacts locally for {REDIS_RETRY_AFTER}s: {e}")
+        self._down_until = time.monotonic() + REDIS_RETRY_AFTER
+
+    def get_or_produce(self, scan_id: str, name: str, key: str, produce: Callable[[], Any],
+                       encode: Callable[[Any], Any], decode: Callable[[Any], Any]) -> Any:
+        """
+        Returns the scan's artifact `name` for `key`, calling `produce()` only
+        if no other pillar has produced it or is producing it.
+
+        `encode` turns the value into something JSON-serializable and `decode`
+        turns that back. Exceptions from `produce` are raised and not shared.
+        Waiting gives up with DeadlineExceeded once the caller is out of time.
+        """
+        if time.monotonic() < self._down_until:
+            return produce()
+        artifact_key = ARTIFACT_KEY.format(scan_id=scan_id, name=name, key=key)
+        lock_key = LOCK_KEY.format(scan_id=scan_id, name=name, key=key)
+        try:
+            while True:
+                raw = self._client.get(artifact_key)
+                if raw is not None:
+                    return decode(json.loads(raw))
+                if self._client.set(lock_key, 1, nx=True, ex=ARTIFACT_LOCK_TTL):
+                    break
+                if deadline_passed():
+                    raise DeadlineExceeded(f"Out of time waiting for {name}")
+                time.sleep(ARTIFACT_POLL)
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return produce()
+
+        try:
+            value = produce()
+        except BaseException:
+            self._release(lock_key)
+            raise
+        try:
+            pipe = self._client.pipeline()
+            pipe.set(artifact_key, json.dumps(encode(value), default=str), ex=ARTIFACT_TTL)
+            pipe.sadd(INDEX_KEY.format(scan_id=scan_id), artifact_key)
+            pipe.expire(INDEX_KEY.format(scan_id=scan_id), ARTIFACT_TTL)
+            pipe.delete(lock_key)
+            pipe.execute()
+        except redis.RedisError as e:
+            self._redis_failed(e)
+        return value
+
+    def _release(self, lock_key: str):
+        try:
+            self._client.delete(lock_key)
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    def clear(self, scan_id: str):
+        """Drops a finished scan's artifacts."""
+        index_key = INDEX_KEY.format(scan_id=scan_id)
+        try:
+            keys = self._client.smembers(index_key)
+            self._client.delete(index_key, *keys)
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+
+scan_artifacts = ScanArtifacts()
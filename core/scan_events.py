@@ -0,0 +1,85 @@
+import json
+from typing import AsyncIterator, Dict, Any
+
+import redis
+import redis.asyncio as aioredis
+
+from celery_app import REDIS_URL
+
+CHANNEL = "scan:{scan_id}:events"
+# Latest progress/terminal event of a scan, replayed to clients that connect late
+SNAPSHOT_KEY = "scan:{scan_id}:last_event"
+SNAPSHOT_TTL = 3600
+
+# Events after which a scan's stream is closed
+TERMINAL_EVENTS = {"completed", "failed"}
+# Events that describe the whole scan's state, as opposed to one step of it
+SNAPSHOT_EVENTS = {"progress"} | TERMINAL_EVENTS
+
+# Seconds between SSE keep-alive comments while a scan is quiet
+HEARTBEAT_INTERVAL = 15
+
+
+class ScanEvents:
+    """
+    Publishes scan progress to Redis and streams it back out as Server-Sent Events.
+
+    Tasks publish from any worker with `publish`; the API relays the scan's
+    channel to clients with `stream`, so following a scan costs a Redis
+    subscription rather than repeated database reads.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL):
+        self.redis_url = redis_url
+        self._client = redis.Redis.from_url(redis_url)
+        self._async_client = None
+
+    def publish(self, scan_id: str, event: str, data: Dict[str, Any]):
+        """Publishes `event` for a scan (sync; for use in background tasks)."""
+        message = json.dumps({"event": event, "data": data})
+        pipe = self._client.pipeline()
+        if event in SNAPSHOT_EVENTS:
+            pipe.set(SNAPSHOT_KEY.format(scan_id=scan_id), message, ex=SNAPSHOT_TTL)
+        pipe.publish(CHANNEL.format(scan_id=scan_id), message)
+        pipe.execute()
+
+    @staticmethod
+    def format_sse(event: str, data: Dict[str, Any]) -> str:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    async def stream(self, scan_id: str) -> AsyncIterator[str]:
+        """
+        Yields the scan's events as SSE frames until it completes or fails.
+
+        The last known state is sent first, so a client that connects (or
+        reconnects) mid-scan doesn't wait for the next event to catch up.
+        """
+        if self._async_client is None:
+            self._async_client = aioredis.Redis.from_url(self.redis_url)
+
+        pubsub = self._async_client.pubsub()
+        # Subscribe before reading the snapshot so nothing published in between is lost
+        await pubsub.subscribe(CHANNEL.format(scan_id=scan_id))
+        try:
+            snapshot = await self._async_client.get(SNAPSHOT_KEY.format(scan_id=scan_id))
+            if snapshot:
+                message = json.loads(snapshot)
+                yield self.format_sse(message["event"], message["data"])
+                if message["event"] in TERMINAL_EVENTS:
+                    return
+
+            while True:
+                raw = await pubsub.get_message(ignore_subscribe_messages=True, timeout=HEARTBEAT_INTERVAL)
+                if raw is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                message = json.loads(raw["data"])
+                yield self.format_sse(message["event"], message["data"])
+                if message["event"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            # Also runs when the client disconnects and the generator is closed
+            await pubsub.reset()
+
+
+scan_events = ScanEvents()
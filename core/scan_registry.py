@@ -0,0 +1,263 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import redis
+import redis.asyncio as aioredis
+
+from celery_app import REDIS_URL
+
+# Completed results younger than this are reused instead of rescanning (0 disables)
+RESULT_REUSE_TTL = int(os.getenv("SCAN_RESULT_TTL", "900"))
+# How long a scan stays in flight without a heartbeat. Its tasks refresh it every
+# HEARTBEAT_INTERVAL seconds while they run, so new requests stop joining a scan
+# soon after its dispatch failed or its worker died. A scan that waits in the
+# queue longer than this can be run a second time by a new request.
+INFLIGHT_TTL = int(os.getenv("SCAN_INFLIGHT_TTL", "180"))
+HEARTBEAT_INTERVAL = float(os.getenv("SCAN_HEARTBEAT_INTERVAL", "30"))
+# Upper bound on how long a scan's followers are remembered for its outcome
+FOLLOWERS_TTL = int(os.getenv("SCAN_FOLLOWERS_TTL", "3600"))
+# How long an Idempotency-Key keeps pointing at the scan it created
+IDEMPOTENCY_TTL = int(os.getenv("SCAN_IDEMPOTENCY_TTL", "86400"))
+
+INFLIGHT_KEY = "scan:inflight:{url_key}"
+FRESH_KEY = "scan:fresh:{url_key}"
+FOLLOWERS_KEY = "scan:{scan_id}:followers"
+IDEMPOTENCY_KEY = "scan:idempotency:{user_id}:{key}"
+PILLAR_SLOTS_KEY = "scan:{scan_id}:pillar_slots"
+
+# Placeholder stored while the request that claimed an Idempotency-Key is still creating its scan
+PENDING = b"pending"
+
+# Extends a scan's in-flight lease, but only while the scan still holds it: a
+# finished scan must not become joinable again through a late heartbeat.
+EXTEND_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Takes one of a scan's ARGV[1] pillar slots for ARGV[2] until ARGV[4], dropping
+# slots whose holders stopped heartbeating before ARGV[3] (now). A pillar that
+# already holds a slot keeps it, so a redelivered task doesn't wait on itself.
+TAKE_PILLAR_SLOT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[3])
+if redis.call('ZSCORE', KEYS[1], ARGV[2]) or redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('ZADD', KEYS[1], ARGV[4], ARGV[2])
+    redis.call('EXPIRE', KEYS[1], ARGV[5])
+    return 1
+end
+return 0
+"""
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a scan target, used as the coalescing key.
+
+    Adds https:// when no scheme is given, lowercases scheme and host, drops
+    default ports, fragments and trailing slashes, and sorts query parameters.
+    """
+    url = url.strip()
+    if not url.startswith('http'):
+        url = 'https://' + url
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    if parsed.port and (scheme, parsed.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parsed.port}"
+    path = parsed.path.rstrip('/') or '/'
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, host, path, '', query, ''))
+
+
+class ScanRegistry:
+    """
+    Redis-backed registry that lets identical scan requests share one run.
+
+    The first request for a normalized URL becomes the leader and runs the
+    audit; requests arriving while it runs get their own Scan row registered
+    as a follower, and the leader's tasks write the outcome to every follower.
+    Once a scan completes, its id is kept as the URL's fresh result for
+    RESULT_REUSE_TTL seconds so later requests can copy it without scanning.
+    A run stays in flight only as long as its tasks keep up a heartbeat
+    (`keep_alive`), which also holds a pillar's slot when the scan's pillars
+    are limited (`take_pillar_slot`).
+
+    The API uses the async methods; Celery tasks use the sync ones.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL):
+        self.redis_url = redis_url
+        self._client = redis.Redis.from_url(redis_url)
+        self._async_client = None
+        self._extend_lease = self._client.register_script(EXTEND_LEASE)
+        self._take_pillar_slot = self._client.register_script(TAKE_PILLAR_SLOT)
+
+    @property
+    def _aredis(self):
+        if self._async_client is None:
+            self._async_client = aioredis.Redis.from_url(self.redis_url)
+        return self._async_client
+
+    # ------------------------------------------------------------- API side
+
+    async def claim_idempotency_key(self, user_id: str, key: str, wait: float = 10.0) -> Optional[str]:
+        """
+        Claims `key` for a new scan, or returns the scan id a previous request used it for.
+
+        Returns None when the caller won the claim and must create the scan and
+        call `bind_idempotency_key`. A concurrent retry waits up to `wait`
+        seconds for the winner to finish creating it.
+        """
+        redis_key = IDEMPOTENCY_KEY.format(user_id=user_id, key=key)
+        if await self._aredis.set(redis_key, PENDING, nx=True, ex=IDEMPOTENCY_TTL):
+            return None
+
+        deadline = asyncio.get_running_loop().time() + wait
+        while True:
+            value = await self._aredis.get(redis_key)
+            if value is None:
+                # The winner gave up; try to take over
+                if await self._aredis.set(redis_key, PENDING, nx=True, ex=IDEMPOTENCY_TTL):
+                    return None
+            elif value != PENDING:
+                return value.decode()
+            if asyncio.get_running_loop().time() >= deadline:
+                raise TimeoutError("A request with this Idempotency-Key is still being processed")
+            await asyncio.sleep(0.1)
+
+    async def bind_idempotency_key(self, user_id: str, key: str, scan_id: str):
+        await self._aredis.set(IDEMPOTENCY_KEY.format(user_id=user_id, key=key), scan_id, ex=IDEMPOTENCY_TTL)
+
+    async def release_idempotency_key(self, user_id: str, key: str):
+        """Drops an unbound claim so a retry can go through after a failed request."""
+        redis_key = IDEMPOTENCY_KEY.format(user_id=user_id, key=key)
+        if await self._aredis.get(redis_key) == PENDING:
+            await self._aredis.delete(redis_key)
+
+    async def get_fresh_scan(self, url_key: str) -> Optional[str]:
+        """Id of a completed scan of `url_key` still within RESULT_REUSE_TTL, if any."""
+        value = await self._aredis.get(FRESH_KEY.format(url_key=url_key))
+        return value.decode() if value else None
+
+    async def lead_or_follow(self, url_key: str, scan_id: str) -> Tuple[str, Optional[str]]:
+        """
+        Registers `scan_id` as the run for `url_key`, or attaches it to the run in flight.
+
+        Returns ("leader", None) if `scan_id` must be dispatched,
+        ("follower", leader_id) if it was attached to a running scan, or
+        ("fresh", fresh_scan_id) if a run finished meanwhile and its result
+        can be copied. A follower is only registered while its leader is still in
+        flight, so the leader's outcome is guaranteed to reach it.
+        """
+        inflight_key = INFLIGHT_KEY.format(url_key=url_key)
+        while True:
+            if await self._aredis.set(inflight_key, scan_id, nx=True, ex=INFLIGHT_TTL):
+                return "leader", None
+            leader = await self._aredis.get(inflight_key)
+            if leader is None:
+                continue
+
+            followers_key = FOLLOWERS_KEY.format(scan_id=leader.decode())
+            await self._aredis.sadd(followers_key, scan_id)
+            await self._aredis.expire(followers_key, FOLLOWERS_TTL)
+            # The leader finishes by clearing the in-flight key *before* reading its
+            # followers: if it is still set now, this follower will be picked up.
+            if await self._aredis.get(inflight_key) == leader:
+                return "follower", leader.decode()
+            await self._aredis.srem(followers_key, scan_id)
+
+            fresh = await self.get_fresh_scan(url_key)
+            if fresh:
+                return "fresh", fresh
+            # The leader failed; take over
+
+    async def release(self, url_key: str, scan_id: str):
+        """Ends the in-flight run of a leader that could not be dispatched."""
+        inflight_key = INFLIGHT_KEY.format(url_key=url_key)
+        if await self._aredis.get(inflight_key) == scan_id.encode():
+            await self._aredis.delete(inflight_key)
+
+    # ----------------------------------------------------------- task side
+
+    def heartbeat(self, url_key: str, scan_id: str) -> bool:
+        """Extends the scan's in-flight lease by INFLIGHT_TTL; False if it no longer holds it."""
+        return bool(self._extend_lease(keys=[INFLIGHT_KEY.format(url_key=url_key)], args=[scan_id, INFLIGHT_TTL]))
+
+    def take_pillar_slot(self, scan_id: str, pillar: str, limit: int) -> bool:
+        """
+        Claims one of the `limit` slots for running the scan's pillars at once.
+
+        A slot lasts INFLIGHT_TTL seconds unless refreshed, through `keep_alive`
+        or by claiming it again, so one held by a dead worker frees itself.
+        """
+        now = time.time()
+        return bool(self._take_pillar_slot(keys=[PILLAR_SLOTS_KEY.format(scan_id=scan_id)],
+                                           args=[limit, pillar, now, now + INFLIGHT_TTL, INFLIGHT_TTL]))
+
+    def release_pillar_slot(self, scan_id: str, pillar: str):
+        self._client.zrem(PILLAR_SLOTS_KEY.format(scan_id=scan_id), pillar)
+
+    def _refresh_pillar_slot(self, scan_id: str, pillar: str):
+        self._client.zadd(PILLAR_SLOTS_KEY.format(scan_id=scan_id), {pillar: time.time() + INFLIGHT_TTL}, xx=True)
+
+    @contextmanager
+    def keep_alive(self, url_key: Optional[str], scan_id: str, pillar: Optional[str] = None):
+        """
+        Keeps the scan in flight for the `with` block, heartbeating from a background thread.
+
+        With `pillar`, the slot it holds from `take_pillar_slot` is kept too.
+        """
+        if not url_key and not pillar:
+            yield
+            return
+        stop = threading.Event()
+
+        def beat():
+            while True:
+                try:
+                    if url_key:
+                        self.heartbeat(url_key, scan_id)
+                    if pillar:
+                        self._refresh_pillar_slot(scan_id, pillar)
+                except redis.RedisError as e:
+                    print(f"⚠️ Could not refresh in-flight scan {scan_id}: {e}")
+                if stop.wait(HEARTBEAT_INTERVAL):
+                    return
+
+        thread = threading.Thread(target=beat, name=f"scan-heartbeat-{scan_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def followers(self, scan_id: str) -> List[str]:
+        return [f.decode() for f in self._client.smembers(FOLLOWERS_KEY.format(scan_id=scan_id))]
+
+    def finish(self, url_key: str, scan_id: str, succeeded: bool) -> List[str]:
+        """
+        Ends the leader's run and returns the followers that must receive its outcome.
+
+        A successful result becomes the URL's fresh result before the run stops
+        being in flight, so a request arriving in between can always find one
+        of the two.
+        """
+        if succeeded and RESULT_REUSE_TTL > 0:
+            self._client.set(FRESH_KEY.format(url_key=url_key), scan_id, ex=RESULT_REUSE_TTL)
+        inflight_key = INFLIGHT_KEY.format(url_key=url_key)
+        if self._client.get(inflight_key) == scan_id.encode():
+            self._client.delete(inflight_key)
+        followers = self.followers(scan_id)
+        self._client.delete(FOLLOWERS_KEY.format(scan_id=scan_id))
+        return followers
+
+
+scan_registry = ScanRegistry()
@@ -2,8 +2,8 @@ import json
 import subprocess
 from typing import Dict, Any
 from database.init_db import get_db
+from database.worker_db import worker_db
 from schemas.scan import ScanResponse
-from prisma import Prisma
 
 
 class ScanService:
@@ -36,6 +36,42 @@ class ScanService:
         )
         return scan
 
+    async def clone_scan(self, source_scan_id: str, user_id: str, url: str):
+        """
+        Save a new completed scan that reuses another scan's result. Returns None if the source isn't completed.
+        """
+        prisma = await get_db.get_client()
+        source = await prisma.scan.find_unique(where={"id": source_scan_id})
+        if not source or source.status != "completed":
+            return None
+        new_scan = await prisma.scan.create(
+            data={
+                "userId": user_id,
+                "url": url,
+                "status": "completed",
+                "result": json.dumps(source.result)
+            }
+        )
+        return new_scan.id
+
+    async def copy_scan_result(self, source_scan_id: str, scan_id: str):
+        """
+        Copy a completed scan's result and status onto another scan
+        """
+        prisma = await get_db.get_client()
+        source = await prisma.scan.find_unique(where={"id": source_scan_id})
+        if not source:
+            return None
+        return await self.update_scan_result(scan_id, source.result, source.status)
+
+    async def get_scan_status(self, scan_id: str):
+        """
+        Get a scan without its user, for cheap ownership/status checks
+        """
+        prisma = await get_db.get_client()
+        scan = await prisma.scan.find_unique(where={"id": scan_id})
+        return scan
+
     async def get_scans_by_user(self, user_id: str):
         """
         Get all scans for a specific user
@@ -63,21 +99,13 @@ class ScanService:
         )
         return scan
 
-    async def update_scan_from_task(self, scan_id: str, result: Dict[str, Any], status: str):
-        """
-        Connects, updates, and disconnects. For use in background tasks.
-        """
-        prisma = Prisma(log_queries=False)
-        try:
-            await prisma.connect()
-            
-            await prisma.scan.update(
-                where={"id": scan_id},
-                # FIX: Also ensure the result is converted to a JSON string.
-                data={"result": json.dumps(result), "status": status}
-            )
-        finally:
-            if prisma.is_connected():
-                await prisma.disconnect()
+    def update_scan_from_task(self, scan_id: str, result: Dict[str, Any], status: str, wait: bool = True):
+        """
+        Writes through the worker's persistent client. For use in background tasks.
+
+        Pass `wait=False` for progress updates: they are batched with other
+        pending writes instead of being committed one by one.
+        """
+        worker_db.write_scan(scan_id, result, status, wait=wait)
 
 scan_service = ScanService()
\ No newline at end of file
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+import threading
+from typing import Any, Dict, Tuple
+
+from prisma import Prisma
+from prisma.errors import DataError
+
+# How long a non-urgent write may wait so it can be committed with others
+FLUSH_INTERVAL = float(os.getenv("WORKER_DB_FLUSH_INTERVAL", "0.5"))
+
+# Scan statuses that later progress writes must never overwrite
+TERMINAL_STATUSES = ["completed", "failed"]
+
+
+class WorkerDb:
+    """
+    Worker-lifetime Prisma client for Celery tasks.
+
+    A single connected client lives on a dedicated event loop thread for as long
+    as the worker process runs; task threads hand it work instead of connecting,
+    querying and disconnecting through a fresh `asyncio.run` each time.
+
+    Scan writes are buffered: updates to the same scan are coalesced (last one
+    wins) and everything pending is committed in one batch. A batch that fails
+    is written again one update at a time, so an update the database refuses
+    (DataError) is dropped and reported alone while the others commit. Updates
+    that failed for any other reason (connection, cancellation) go back into
+    the buffer, behind any newer write to the same scan, and are retried with
+    the next flush.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._thread = None
+        self._prisma = None
+        self._flush_lock = None
+        self._flush_scheduled = False
+        self._pending: Dict[str, Tuple[str, str]] = {}
+        # scan_id -> (dropped update, why), until the scan's writer learns of it
+        self._rejected: Dict[str, Tuple[Tuple[str, str], Exception]] = {}
+
+    # ------------------------------------------------------------ lifecycle
+
+    def start(self):
+        """Starts the loop thread and connects; a no-op if already running in this process."""
+        with self._lock:
+            # A forked pool child inherits the object but not the loop thread
+            if self._loop is not None and self._pid == os.getpid():
+                return
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="worker-db", daemon=True)
+            thread.start()
+
+            prisma = Prisma(log_queries=False)
+            asyncio.run_coroutine_threadsafe(prisma.connect(), loop).result()
+
+            self._pid = os.getpid()
+            self._loop, self._thread, self._prisma = loop, thread, prisma
+            self._flush_lock = asyncio.Lock()
+            self._flush_scheduled = False
+            self._pending = {}
+            self._rejected = {}
+
+    def stop(self):
+        """Commits pending writes, disconnects and stops the loop thread."""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            loop, thread, prisma = self._loop, self._thread, self._prisma
+            self._loop = self._thread = self._prisma = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._flush(prisma), loop).result()
+        finally:
+            if prisma.is_connected():
+                asyncio.run_coroutine_threadsafe(prisma.disconnect(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+
+    # --------------------------------------------------------------- access
+
+    def run(self, coro_fn, *args) -> Any:
+        """Runs `coro_fn(prisma, *args)` on the worker's loop and returns its result."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro_fn(self._prisma, *args), self._loop).result()
+
+    def write_scan(self, scan_id: str, result: Dict[str, Any], status: str, wait: bool = False):
+        """
+        Queues a result/status update for a scan.
+
+        Without `wait` the update is committed with whatever else is pending at
+        most FLUSH_INTERVAL later. With `wait` everything pending is committed
+        now and the call returns once it is stored, or raises if it can't be.
+        """
+        self.start()
+        entry = (json.dumps(result), status)
+        with self._lock:
+            self._pending[scan_id] = entry
+            self._rejected.pop(scan_id, None)
+            loop, prisma = self._loop, self._prisma
+
+        if wait:
+            asyncio.run_coroutine_threadsafe(self._flush(prisma), loop).result()
+            # Another caller's flush may have been the one to drop it
+            with self._lock:
+                rejected = self._rejected.pop(scan_id, None)
+            if rejected is not None and rejected[0] is entry:
+                raise rejected[1]
+        else:
+            loop.call_soon_threadsafe(self._schedule_flush, prisma)
+
+    # ------------------------------------------------------------ batching
+
+    def _schedule_flush(self, prisma: Prisma):
+        # Runs on the loop thread. If stop() detached this loop since the write
+        # was queued, its final flush commits whatever is pending.
+        loop = asyncio.get_running_loop()
+        if self._flush_scheduled or self._loop is not loop:
+            return
+        self._flush_scheduled = True
+
+        def fire():
+            self._flush_scheduled = False
+            task = asyncio.ensure_future(self._flush(prisma))
+            task.add_done_callback(self._report_flush_error)
+
+        loop.call_later(FLUSH_INTERVAL, fire)
+
+    @staticmethod
+    def _report_flush_error(task):
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Failed to write scan updates: {task.exception()}")
+
+    async def _flush(self, prisma: Prisma):
+        # Serialised so an older batch can never land after a newer one
+        async with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            try:
+                async with prisma.batch_() as batcher:
+                    for scan_id, (result, status) in pending.items():
+                        batcher.scan.update_many(**self._update_args(scan_id, result, status))
+            except Exception:
+                # The batch is one transaction, so a single refused update fails all of them
+                await self._flush_each(prisma, list(pending.items()))
+            except BaseException:
+                self._requeue(pending.items())
+                raise
+
+    @staticmethod
+    def _update_args(scan_id: str, result: str, status: str) -> dict:
+        where = {"id": scan_id}
+        if status not in TERMINAL_STATUSES:
+            # A progress write arriving late must not undo a finished scan
+            where["status"] = {"not_in": TERMINAL_STATUSES}
+        return {"where": where, "data": {"result": result, "status": status}}
+
+    def _requeue(self, entries):
+        # Put the updates back for the next flush, unless a newer write to the
+        # same scan replaced them meanwhile. A waiting caller whose write was
+        # among them flushes after this one (the lock) and so retries it, and raises.
+        with self._lock:
+            for scan_id, entry in entries:
+                self._pending.setdefault(scan_id, entry)
+
+    async def _flush_each(self, prisma: Prisma, entries):
+        for index, (scan_id, entry) in enumerate(entries):
+            try:
+                await prisma.scan.update_many(**self._update_args(scan_id, *entry))
+            except DataError as e:
+                print(f"❌ Dropped the update of scan {scan_id}, the database refused it: {e}")
+                with self._lock:
+                    self._rejected[scan_id] = (entry, e)
+            except BaseException:
+                self._requeue(entries[index:])
+                raise
+
+
+worker_db = WorkerDb()
@@ -1,4 +1,5 @@
 # === services/automation_resilience/__init__.py ===
+from functools import partial
 from .captcha import check_captcha_presence
 from .form_predictability import check_form_predictability
 from .url_navigability import check_url_navigability
@@ -9,7 +10,9 @@ from .anti_automation import check_anti_automation_absence
 from .mfa_handling import check_mfa_handling
 from .encapsulation import check_encapsulation_analysis
 from .intrusive_elements import check_intrusive_elements
-from utils.featcher import fetch_html_selenium
+from utils.featcher import fetch_page
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
 
 __all__ = [
     "check_captcha_presence",
@@ -24,14 +27,16 @@ __all__ = [
     "check_intrusive_elements",
 ]
 
+@consumes("homepage")
 class AutomationAuditor:
     """
     Orchestrates automation resilience checks for web content.
     """
 
-    def __init__(self, base_url: str, timeout: float = 15.0) -> None:
+    def __init__(self, base_url: str, timeout: float = 15.0, fetch: FetchContext = None) -> None:
         self.base_url = base_url
         self.timeout = timeout
+        self.fetch = fetch or FetchContext()
 
     def run_all(self) -> dict:
         """
@@ -42,26 +47,27 @@ class AutomationAuditor:
         overall_score = 0
         overall_status = 'Not Assessed'
 
-        # Map check functions to their keys
+        # Map check functions to their keys; checks that hit the network share the scan's fetch context
         check_map = {
             'captcha_presence': check_captcha_presence,
             'form_predictability': check_form_predictability,
             'url_navigability': check_url_navigability,
-            'session_state_recovery': check_session_state_recovery,
+            'session_state_recovery': partial(check_session_state_recovery, fetch=self.fetch),
             'clear_action_feedback': check_clear_action_feedback,
             'graceful_degradation': check_graceful_degradation,
-            'anti_automation_absence': check_anti_automation_absence,
-            'mfa_handling': check_mfa_handling,
-            'encapsulation_analysis': check_encapsulation_analysis,
+            'anti_automation_absence': partial(check_anti_automation_absence, fetch=self.fetch),
+            'mfa_handling': partial(check_mfa_handling, fetch=self.fetch),
+            'encapsulation_analysis': partial(check_encapsulation_analysis, fetch=self.fetch),
             'intrusive_elements': check_intrusive_elements,
         }
 
         try:
-            html = fetch_html_selenium(self.base_url)
+            # Parsed once and shared with every check (and with the other pillars)
+            page = fetch_page(self.base_url, fetch=self.fetch)
 
             for key, check_func in check_map.items():
                 try:
-                    score, issues, recs = check_func(self.base_url, html)
+                    score, issues, recs = check_func(page)
                     results[key] = {'score': score, 'issues': issues, 'recommendations': recs}
                     overall_score += score
                     recommendations.extend(recs)
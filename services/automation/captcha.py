@@ -1,16 +1,14 @@
 from typing import Tuple, List
-from bs4 import BeautifulSoup
+from utils.page import Page
 
 # ---------- CAPTCHA Presence Check ----------
 
-def check_captcha_presence(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_captcha_presence(page: Page) -> Tuple[int, List[str], List[str]]:
     score = 30
     issues = []
     recommendations = []
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
-
         captcha_signatures = [
             'g-recaptcha',
             'h-captcha',
@@ -21,7 +19,7 @@ def check_captcha_presence(url: str, html: str) -> Tuple[int, List[str], List[st
             'are you a robot'
         ]
 
-        html_lower = html.lower()
+        html_lower = page.html_lower
         found = False
 
         for sig in captcha_signatures:
@@ -1,20 +1,21 @@
-import requests
 from typing import Tuple, List
-from bs4 import BeautifulSoup
+from utils.fetch_context import FetchContext
+from utils.page import Page, get_page
 
 # ---------- Encapsulation Analysis Check ----------
 
-def check_encapsulation_analysis(url: str, html: str) -> Tuple[float, List[str], List[str]]:
+def check_encapsulation_analysis(page: Page, fetch: FetchContext = None) -> Tuple[float, List[str], List[str]]:
     score = 0.0
     issues = []
     recommendations = []
+    fetch = fetch or FetchContext()
 
     try:
-        res = requests.get(url, timeout=10)
-        soup = BeautifulSoup(res.text, "html.parser")
+        # Static (non-rendered) markup; shared with the other checks through the fetch context
+        static = get_page(page.url, fetch)
 
         # Check for iframes
-        iframes = soup.find_all("iframe")
+        iframes = static.find_all("iframe")
         if len(iframes) == 0:
             score += 1
         else:
@@ -22,20 +23,20 @@ def check_encapsulation_analysis(url: str, html: str) -> Tuple[float, List[str],
             recommendations.append("Avoid excessive iframe usage for core content.")
 
         # Shadow DOM can't be parsed directly via static HTML
-        if "shadowRoot" in res.text or "attachShadow" in res.text:
+        if "shadowRoot" in static.html or "attachShadow" in static.html:
             issues.append("Shadow DOM usage detected via JavaScript.")
             recommendations.append("Avoid Shadow DOM for critical UI or provide semantic fallback.")
         else:
             score += 1
 
         # Check for semantic containers
-        if soup.find("main") or soup.find("section"):
+        if static.find("main") or static.find("section"):
             score += 0.5
         else:
             recommendations.append("Use semantic HTML containers like <main>, <section>, etc.")
 
         # Check for div soup
-        body = soup.find("body")
+        body = static.find("body")
         if body:
             divs = body.find_all("div", recursive=True)
             tags = body.find_all(True, recursive=True)
@@ -1,35 +1,40 @@
 from typing import Tuple, List
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from utils.page import Page
 from selenium.webdriver.common.by import By
-import time
+from utils.browser_pool import browser_pool, wait_for_page_ready
 
 # ---------- Action Feedback Check ----------
 
-def check_clear_action_feedback(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_clear_action_feedback(page: Page) -> Tuple[int, List[str], List[str]]:
     score = 0
     issues = []
     recommendations = []
 
     try:
-        options = Options()
-        options.add_argument("--headless")
-        driver = webdriver.Chrome(options=options)
-        driver.get(url)
-        time.sleep(4)
+        aria_feedback = [
+            '[role="alert"]', '[role="status"]', '[aria-live]'
+        ]
+
+        with browser_pool.lease() as driver:
+            driver.get(page.url)
+            wait_for_page_ready(driver)
+
+            rendered_html = driver.page_source.lower()
 
-        html = driver.page_source.lower()
+            # Text of the first element matching each ARIA feedback selector
+            aria_texts = []
+            for selector in aria_feedback:
+                try:
+                    aria_texts.append(driver.find_element(By.CSS_SELECTOR, selector).text)
+                except:
+                    continue
 
         feedback_keywords = [
             "success", "error", "submitted", "invalid", "failed",
             "required", "added to cart", "welcome", "try again"
         ]
 
-        aria_feedback = [
-            '[role="alert"]', '[role="status"]', '[aria-live]'
-        ]
-
-        found_feedback = any(k in html for k in feedback_keywords)
+        found_feedback = any(k in rendered_html for k in feedback_keywords)
 
         if found_feedback:
             score += 7
@@ -38,19 +43,12 @@ def check_clear_action_feedback(url: str, html: str) -> Tuple[int, List[str], Li
             recommendations.append("Show meaningful confirmation/error messages after actions.")
 
         # Check ARIA-based alerts
-        for selector in aria_feedback:
-            try:
-                el = driver.find_element(By.CSS_SELECTOR, selector)
-                if el and el.text.strip():
-                    score += 3
-                    break
-            except:
-                continue
+        if any(text.strip() for text in aria_texts):
+            score += 3
 
         if score < 10:
             recommendations.append("Use ARIA roles or aria-live for screen-reader/agent-readable feedback.")
 
-        driver.quit()
         return min(score, 10), issues, recommendations
 
     except Exception as e:
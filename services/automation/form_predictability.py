@@ -1,15 +1,14 @@
 from typing import Tuple, List
-from bs4 import BeautifulSoup
+from utils.page import Page
 # ---------- Form Predictability Check ----------
 
-def check_form_predictability(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_form_predictability(page: Page) -> Tuple[int, List[str], List[str]]:
     score = 0
     issues = []
     recommendations = []
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        forms = soup.find_all("form")
+        forms = page.find_all("form")
 
         if not forms:
             issues.append("No form tags found on the page.")
@@ -34,10 +33,10 @@ def check_form_predictability(url: str, html: str) -> Tuple[int, List[str], List
                     semantic_inputs += 1
 
         # Check for <label for=""> linking
-        labels = soup.find_all("label")
+        labels = page.find_all("label")
         label_for_ids = {label.get("for") for label in labels if label.get("for")}
 
-        for input_tag in soup.find_all("input"):
+        for input_tag in page.find_all("input"):
             if input_tag.get("id") and input_tag.get("id") in label_for_ids:
                 inputs_with_labels += 1
 
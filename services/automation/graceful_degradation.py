@@ -1,29 +1,92 @@
-from typing import Tuple, List
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import re
+from typing import Dict, Optional, Tuple, List
+from bs4 import NavigableString
+from utils.page import Page
 from selenium.webdriver.common.by import By
-import time
+from utils.browser_pool import browser_pool, wait_for_page_ready
+
+# Elements whose content a browser never renders as page text
+NON_RENDERED_TAGS = {"script", "style", "template", "head", "title", "meta", "link"}
+HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.IGNORECASE)
 
 # ---------- Graceful Degradation Check ----------
 
-def check_graceful_degradation(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def _is_hidden(tag) -> bool:
+    return tag.has_attr("hidden") or bool(HIDDEN_STYLE.search(tag.get("style", "")))
+
+
+def _static_signals(page: Page) -> Optional[Dict[str, int]]:
+    """
+    What a client without JavaScript gets, computed from the fetched HTML.
+
+    With scripts off, a browser renders the markup as served, `<noscript>`
+    content included, so the text and the forms, links and buttons can be read
+    straight from the parsed document. Returns None when the markup alone can't
+    settle it and a real browser has to look: no document, a meta refresh the
+    browser would follow, or text that only exists in elements hidden by markup
+    a `<noscript>` stylesheet could reveal.
+    """
+    soup = page.soup
+    if soup is None or soup.body is None:
+        return None
+    if any(m.get("http-equiv", "").lower() == "refresh" for m in page.find_all("meta")):
+        return None
+
+    visible_text, hidden_text = False, False
+    for node in soup.body.descendants:
+        # Comments, doctypes, CDATA and processing instructions are strings too, but never rendered
+        if type(node) is not NavigableString or not node.strip():
+            continue
+        parents = list(node.parents)
+        if any(p.name in NON_RENDERED_TAGS for p in parents):
+            continue
+        if any(_is_hidden(p) for p in parents if p.name):
+            hidden_text = True
+            continue
+        visible_text = True
+        break
+    if not visible_text and hidden_text and page.find_all("noscript"):
+        return None
+
+    def count(name: str) -> int:
+        # Template content is inert until a script clones it
+        return sum(1 for tag in page.find_all(name) if tag.find_parent("template") is None)
+
+    return {
+        "body_text": int(visible_text),
+        "forms": count("form"),
+        "links": count("a"),
+        "buttons": count("button"),
+    }
+
+
+def _browser_signals(page: Page) -> Dict[str, int]:
+    # Scripts are disabled for the lease to see what a no-JS client gets
+    with browser_pool.lease(javascript=False) as driver:
+        driver.get(page.url)
+        wait_for_page_ready(driver)
+
+        return {
+            "body_text": int(bool(driver.find_element(By.TAG_NAME, "body").text.strip())),
+            "forms": len(driver.find_elements(By.TAG_NAME, "form")),
+            "links": len(driver.find_elements(By.TAG_NAME, "a")),
+            "buttons": len(driver.find_elements(By.TAG_NAME, "button")),
+        }
+
+
+def check_graceful_degradation(page: Page) -> Tuple[int, List[str], List[str]]:
     score = 0
     issues = []
     recommendations = []
 
     try:
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--disable-javascript")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-gpu")
-
-        driver = webdriver.Chrome(options=options)
-        driver.get(url)
-        time.sleep(4)
+        signals = _static_signals(page) or _browser_signals(page)
+        body_text = signals["body_text"]
+        forms = signals["forms"]
+        links = signals["links"]
+        buttons = signals["buttons"]
 
         # 1. Content visibility
-        body_text = driver.find_element(By.TAG_NAME, "body").text.strip()
         if body_text:
             score += 1
         else:
@@ -31,7 +94,6 @@ def check_graceful_degradation(url: str, html: str) -> Tuple[int, List[str], Lis
             recommendations.append("Ensure meaningful fallback content without JS.")
 
         # 2. Forms fallback check
-        forms = driver.find_elements(By.TAG_NAME, "form")
         if forms:
             score += 2
         else:
@@ -39,7 +101,6 @@ def check_graceful_degradation(url: str, html: str) -> Tuple[int, List[str], Lis
             recommendations.append("Ensure forms can POST even with JS disabled.")
 
         # 3. Link navigation
-        links = driver.find_elements(By.TAG_NAME, "a")
         if links:
             score += 1
         else:
@@ -47,16 +108,14 @@ def check_graceful_degradation(url: str, html: str) -> Tuple[int, List[str], Lis
             recommendations.append("Use basic anchor tags as fallback navigation.")
 
         # 4. JS-free CTA/buttons
-        buttons = driver.find_elements(By.TAG_NAME, "button")
         if buttons:
             score += 1
         else:
             recommendations.append("Provide non-JS alternatives for call-to-action buttons.")
 
-        driver.quit()
         return min(score, 5), issues, recommendations
 
     except Exception as e:
         issues.append("Degradation check failed.")
         recommendations.append(str(e))
-        return 0, issues, recommendations
\ No newline at end of file
+        return 0, issues, recommendations
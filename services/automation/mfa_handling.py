@@ -1,21 +1,22 @@
-import requests
 from typing import Tuple, List
-from bs4 import BeautifulSoup
+from utils.fetch_context import FetchContext
+from utils.page import Page, get_page
 
 # ---------- MFA Handling Check ----------
 
-def check_mfa_handling(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_mfa_handling(page: Page, fetch: FetchContext = None) -> Tuple[int, List[str], List[str]]:
     score = 0
     issues = []
     recommendations = []
+    fetch = fetch or FetchContext()
 
     try:
-        res = requests.get(url, timeout=10)
-        soup = BeautifulSoup(res.text, "html.parser")
+        # Static (non-rendered) markup; shared with the other checks through the fetch context
+        static = get_page(page.url, fetch)
 
         mfa_keywords = ['otp', '2fa', 'verification', 'authenticator', 'mfa', 'security code']
 
-        input_tags = soup.find_all("input")
+        input_tags = static.find_all("input")
         found_mfa = any(any(k in (i.get("name", "") + i.get("id", "") + i.get("type", "")).lower() for k in mfa_keywords) for i in input_tags)
 
         if found_mfa:
@@ -23,12 +24,12 @@ def check_mfa_handling(url: str, html: str) -> Tuple[int, List[str], List[str]]:
         else:
             recommendations.append("Add HTML cues or labels for MFA inputs if applicable.")
 
-        if "remember me" in res.text.lower() or "remember this device" in res.text.lower():
+        if "remember me" in static.html_lower or "remember this device" in static.html_lower:
             score += 1
         else:
             recommendations.append("Support 'remember this device' or fallback for agents.")
 
-        if "login" in url or "signin" in url:
+        if "login" in page.url or "signin" in page.url:
             if found_mfa:
                 score += 2
         else:
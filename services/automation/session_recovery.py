@@ -1,21 +1,22 @@
-import requests
 from typing import Tuple, List
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-import time
+from utils.browser_pool import browser_pool, wait_for_page_ready
+from utils.fetch_context import FetchContext
+from utils.page import Page
 
 # ---------- Session State Recovery Check ----------
 
-def check_session_state_recovery(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_session_state_recovery(page: Page, fetch: FetchContext = None) -> Tuple[int, List[str], List[str]]:
     score = 0
     issues = []
     recommendations = []
+    fetch = fetch or FetchContext()
 
     try:
         # 1. Check for session cookie
-        session = requests.Session()
-        resp = session.get(url, timeout=10)
-        cookies = session.cookies.get_dict()
+        # The shared fetch context never persists cookies, so read them off the
+        # redirect chain of the (possibly shared) response itself.
+        resp = fetch.get(page.url, timeout=10)
+        cookies = {c.name: c.value for r in resp.history + [resp] for c in r.cookies}
         if cookies:
             score += 2
         else:
@@ -23,14 +24,14 @@ def check_session_state_recovery(url: str, html: str) -> Tuple[int, List[str], L
             recommendations.append("Use session cookies to persist user state.")
 
         # 2. Use Selenium to detect state persistence visually
-        driver = webdriver.Chrome(options=Options().add_argument("--headless"))
-        driver.get(url)
-        time.sleep(3)
-        html_before = driver.page_source
+        with browser_pool.lease() as driver:
+            driver.get(page.url)
+            wait_for_page_ready(driver)
+            html_before = driver.page_source
 
-        driver.refresh()
-        time.sleep(3)
-        html_after = driver.page_source
+            driver.refresh()
+            wait_for_page_ready(driver)
+            html_after = driver.page_source
 
         if html_before == html_after:
             score += 3
@@ -39,7 +40,7 @@ def check_session_state_recovery(url: str, html: str) -> Tuple[int, List[str], L
             recommendations.append("Ensure session-specific content survives page reload.")
 
         # 3. Check for minimal state in URL
-        if "?" in url or "=" in url:
+        if "?" in page.url or "=" in page.url:
             score += 2
         else:
             issues.append("No user state encoded in URL.")
@@ -51,7 +52,6 @@ def check_session_state_recovery(url: str, html: str) -> Tuple[int, List[str], L
         else:
             recommendations.append("Include visual cues for returning users (e.g., Resume, Cart, Saved).")
 
-        driver.quit()
         return min(score, 10), issues, recommendations
 
     except Exception as e:
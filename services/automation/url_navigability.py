@@ -1,16 +1,16 @@
 from urllib.parse import urlparse
 from typing import Tuple, List
-from bs4 import BeautifulSoup
+from utils.page import Page
 
 # ---------- URL State & Navigability Check ----------
 
-def check_url_navigability(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_url_navigability(page: Page) -> Tuple[int, List[str], List[str]]:
     score = 0
     issues = []
     recommendations = []
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = page.soup
 
         # ✅ Canonical check
         canonical_link = soup.find("link", rel="canonical")
@@ -29,7 +29,7 @@ def check_url_navigability(url: str, html: str) -> Tuple[int, List[str], List[st
             recommendations.append("Add proper anchor links to internal, uniquely-addressable pages.")
 
         # ✅ URL pattern checks
-        parsed = urlparse(url)
+        parsed = urlparse(page.url)
         if "#" not in parsed.path and len(parsed.query) < 60:
             score += 3
         else:
@@ -37,7 +37,7 @@ def check_url_navigability(url: str, html: str) -> Tuple[int, List[str], List[st
             recommendations.append("Use clean, RESTful URLs without # or long query parameters.")
 
         # ✅ State persistence test (only simulated here)
-        if "?" in url or "#" in url:
+        if "?" in page.url or "#" in page.url:
             score -= 1  # potential client-side state
             issues.append("Page may rely on client-side fragments or params.")
         else:
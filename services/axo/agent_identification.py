@@ -1,13 +1,18 @@
 import asyncio
 import json
+import os
 import re
 from urllib.parse import urljoin
-import httpx
 import logging
+from utils.fetch_context import FetchContext
 
 # --- Basic Configuration ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Bytes of each probed page that are read (and summarized) at most; 0 leaves only the
+# fetcher's own cap on every body (FETCH_MAX_BODY_BYTES, 5 MB by default)
+PROBE_BYTE_BUDGET = int(os.getenv("AGENT_PROBE_BYTE_BUDGET", str(512 * 1024)))
+
 
 class AgentIdentification:
     """
@@ -17,10 +22,13 @@ class AgentIdentification:
     asynchronously and using an LLM for advanced analysis, scoring, and explanation.
     Combines high-performance probing with intelligent, context-aware analysis.
     """
-    def __init__(self, base_url: str, model, timeout: float = 15.0):
+    def __init__(self, base_url: str, model, timeout: float = 15.0, fetch: FetchContext = None,
+                 byte_budget: int = PROBE_BYTE_BUDGET):
         self.base_url = base_url
         self.model = model
         self.timeout = timeout
+        self.byte_budget = byte_budget
+        self.fetch = fetch or FetchContext()
         self.user_agents = {
             "human_baseline": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
             "googlebot": "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
@@ -38,28 +46,36 @@ class AgentIdentification:
             "duckduckbot": "DuckDuckBot/1.0; (+http://duckduckgo.com/duckduckbot.html)",
             "slackbot": "Slackbot 1.0 (+https://api.slack.com/robots)",
             "comet": "Mozilla/5.0 (compatible; Comet/1.0; Perplexity AI Agent)",
-            "gptbot": "Mozilla/5.0 (compatible; GPTBot/1.0; +https://openai.com/gptbot)",
             "claude": "Mozilla/5.0 (compatible; Claude-3/1.0; Anthropic AI Agent)",
             "gemini": "Mozilla/5.0 (compatible; Gemini/1.0; Google AI Agent)"
         }
 
-    async def _probe(self, client: httpx.AsyncClient, url: str, headers: dict = {}) -> dict:
+    async def _probe(self, url: str, headers: dict = {}) -> dict:
         """
-        Performs a single, safe, asynchronous request.
+        Performs a single, safe, asynchronous request through the scan's fetch context.
+
+        The body is summarized while it streams in (length, hash, markup
+        structure, first 500 bytes) rather than kept, and reading stops after
+        `byte_budget` bytes (the fetcher's MAX_BODY_BYTES when it is 0).
         """
-        try:
-            response = await client.get(url, headers=headers, timeout=self.timeout, follow_redirects=True)
-            return {
-                "status_code": response.status_code,
-                "content_length": len(response.content),
-                "content_type": response.headers.get("content-type", "unknown"),
-                "headers": dict(response.headers),
-                "final_url": str(response.url),
-                "content_snippet": response.text[:500]  # Snippet for behavioral analysis
-            }
-        except httpx.RequestError as e:
-            logging.warning(f"Request failed for {url}: {e}")
-            return {"error": str(e)}
+        kwargs = {"max_bytes": self.byte_budget} if self.byte_budget else {}
+        response = await self.fetch.afetch(url, headers=headers, timeout=self.timeout, summarize=True, **kwargs)
+        if response.error:
+            logging.warning(f"Request failed for {url}: {response.error}")
+            return {"error": response.error}
+        summary = response.summary
+        return {
+            "status_code": response.status_code,
+            "content_length": summary["length"],
+            "content_truncated": response.truncated,
+            "content_sha256": summary["sha256"],
+            "structure_fingerprint": summary["structure"],
+            "tag_count": summary["tag_count"],
+            "content_type": response.headers.get("content-type", "unknown"),
+            "headers": dict(response.headers),
+            "final_url": str(response.url),
+            "content_snippet": summary["head"]  # Snippet for behavioral analysis
+        }
 
     async def gather_evidence(self) -> dict:
         """
@@ -69,29 +85,36 @@ class AgentIdentification:
         evidence = {}
         tasks = []
 
-        async with httpx.AsyncClient() as client:
-            # 1. Create task for agents.json manifest check
-            manifest_url = urljoin(self.base_url, "/.well-known/agents.json")
-            tasks.append(self._probe(client, manifest_url))
-
-            # 2. Create tasks for probing with different User-Agents
-            for ua_string in self.user_agents.values():
-                tasks.append(self._probe(client, self.base_url, headers={"User-Agent": ua_string}))
-
-            # 3. Create task for probing with custom agent headers
-            custom_headers = {
-                "User-Agent": self.user_agents["human_baseline"],
-                "X-Agent-Type": "AI-Assistant",
-                "X-Requested-By": "AI-Agent"
-            }
-            tasks.append(self._probe(client, self.base_url, headers=custom_headers))
+        # 1. Create task for agents.json manifest check
+        manifest_url = urljoin(self.base_url, "/.well-known/agents.json")
+        tasks.append(self._probe(manifest_url))
+
+        # 2. Create tasks for probing with different User-Agents, one per distinct
+        # User-Agent string; names sharing a string share its probe
+        aliases = {}
+        for name, ua_string in self.user_agents.items():
+            aliases.setdefault(ua_string, []).append(name)
+        for ua_string in aliases:
+            tasks.append(self._probe(self.base_url, headers={"User-Agent": ua_string}))
+
+        # 3. Create task for probing with custom agent headers
+        custom_headers = {
+            "User-Agent": self.user_agents["human_baseline"],
+            "X-Agent-Type": "AI-Assistant",
+            "X-Requested-By": "AI-Agent"
+        }
+        tasks.append(self._probe(self.base_url, headers=custom_headers))
 
-            logging.info(f"Executing {len(tasks)} probes concurrently...")
-            results = await asyncio.gather(*tasks)
+        logging.info(f"Executing {len(tasks)} probes concurrently...")
+        results = await asyncio.gather(*tasks)
 
         # Structure the results
         evidence['manifest_check'] = results[0]
-        evidence['user_agent_probes'] = {name: result for name, result in zip(self.user_agents.keys(), results[1:-1])}
+        evidence['user_agent_probes'] = {}
+        for names, result in zip(aliases.values(), results[1:-1]):
+            if len(names) > 1:
+                result = {**result, "also_sent_as": names[1:]}
+            evidence['user_agent_probes'][names[0]] = result
         evidence['custom_header_probe'] = results[-1]
 
         logging.info("Evidence gathering complete.")
@@ -113,7 +136,7 @@ class AgentIdentification:
 
         **Analysis Instructions:**
         1.  **Manifest Analysis:** Review `manifest_check`. Does the site provide a valid `agents.json` file (status 200)? If so, summarize its declarations. This is a strong positive signal.
-        2.  **Differential Treatment (User-Agent):** Compare the `human_baseline` response in `user_agent_probes` to the bot responses (googlebot, gptbot, etc.). Note any significant differences in status code, content length, or headers. Different responses indicate the site is actively identifying and segmenting traffic.
+        2.  **Differential Treatment (User-Agent):** Compare the `human_baseline` response in `user_agent_probes` to the bot responses (googlebot, gptbot, etc.). Note any significant differences in status code, content length, content hash, structure fingerprint, or headers. Different responses indicate the site is actively identifying and segmenting traffic.
         3.  **Differential Treatment (Custom Headers):** Compare the `human_baseline` response to the `custom_header_probe`. Is there any evidence (different status, content, or headers) that the site recognized the custom `X-Agent-*` headers?
         4.  **Behavioral Evasion:** Analyze the `content_snippet` from the `human_baseline` probe. Are there any JavaScript patterns suggesting anti-bot measures like `navigator.webdriver`, canvas fingerprinting, or JS challenges? The presence of these indicates a sophisticated, albeit potentially adversarial, detection mechanism.
         5.  **Final Score & Justification:** Based on all evidence, provide a final score from 0 (no detection) to 100 (sophisticated, multi-layered detection and differentiation). Justify your score with a concise, expert explanation, referencing your findings from the steps above.
@@ -1,4 +1,5 @@
 import google.generativeai as genai
+from utils.fetch_context import FetchContext
 from .agent_identification import AgentIdentification
 from .conversational_bot import ConversationalBot
 from .error_recovery import ErrorRecovery
@@ -22,10 +23,11 @@ class AxoAuditor:
         'error_recovery': 0.34,
     }
 
-    def __init__(self, base_url: str, model, weights: dict = {}, timeout: float = 15.0):
+    def __init__(self, base_url: str, model, weights: dict = {}, timeout: float = 15.0, fetch: FetchContext = None):
         self.base_url = base_url
         self.model = model
         self.timeout = timeout
+        self.fetch = fetch or FetchContext()
         self.weights = weights or self.DEFAULT_WEIGHTS.copy()
         self.results = {}
         self.recommendations = []
@@ -46,7 +48,7 @@ class AxoAuditor:
 
         for key, analyzer_cls in analyzer_map.items():
             try:
-                analyzer = analyzer_cls(self.base_url, self.model, self.timeout)
+                analyzer = analyzer_cls(self.base_url, self.model, self.timeout, fetch=self.fetch)
                 report = analyzer.run_and_analyze()
             except Exception as ex:
                 report = {'score': 0, 'explanation': str(ex), 'recommendations': []}
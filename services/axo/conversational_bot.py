@@ -1,10 +1,10 @@
 import asyncio
-import httpx
 import json
 import re
 import logging
 from urllib.parse import urljoin
 from dotenv import load_dotenv
+from utils.fetch_context import FetchContext
 
 load_dotenv()
 
@@ -18,10 +18,11 @@ class ConversationalBot:
     Audits a website's ability to provide programmatic assistance to an AI agent
     via a conversational interface (chatbot), using an LLM-first detection strategy.
     """
-    def __init__(self, base_url: str, model, timeout: float = 15.0):
+    def __init__(self, base_url: str, model, timeout: float = 15.0, fetch: FetchContext = None):
         self.base_url = base_url
         self.model = model
         self.timeout = timeout
+        self.fetch = fetch or FetchContext()
 
         self.bot_patterns = {
             "Intercom": r"widget\.intercom\.io",
@@ -31,27 +32,26 @@ class ConversationalBot:
             "Dialogflow": r"dialogflow\.cloud\.google\.com"
         }
     
-    async def _probe(self, client: httpx.AsyncClient, url: str, method: str = "GET", headers: dict = {}, data: dict = {}) -> dict:
+    async def _probe(self, url: str, method: str = "GET", headers: dict = {}, data: dict = {}) -> dict:
         """
         Performs a single, safe and asynchronous request and returns the summary
         """
-        try:
-            if method.upper() == "POST":
-                response = await client.post(url, headers=headers, json=data, timeout=self.timeout, follow_redirects=True)
-            else:
-                response = await client.get(url, headers=headers, timeout=self.timeout, follow_redirects=True)
+        if method.upper() == "POST":
+            response = await self.fetch.afetch(url, method="POST", headers=headers, json=data, timeout=self.timeout)
+        else:
+            response = await self.fetch.afetch(url, headers=headers, timeout=self.timeout)
 
-            logging.info(f"Response from {url}: {response.status_code}")
+        if response.error:
+            logging.warning(f"Request failed for {url}: {response.error}")
+            return {"error": response.error}
 
-            return {
-                "status_code": response.status_code,
-                "headers": dict(response.headers),
-                "body": response.text
-            }
+        logging.info(f"Response from {url}: {response.status_code}")
 
-        except httpx.RequestError as e:
-            logging.warning(f"Request failed for {url}: {e}")
-            return {"error": str(e)}
+        return {
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "body": response.text
+        }
         
     async def _detect_bot(self, body: str):
         """
@@ -116,63 +116,62 @@ class ConversationalBot:
         logging.info("Gathering conversational bot evidence...")
         evidence = {}
         
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            # 1. Get the homepage content
-            homepage_response = await self._probe(client, self.base_url)
-            homepage_body = homepage_response.get("body", "")
-            evidence['homepage_scan_status'] = homepage_response.get("status_code")
-
-            # 2. LLM-First Detection
-            logging.info("-> Attempting bot detection with LLM...")
-            llm_detected_platform = await self._detect_bot(homepage_body) # Use a snippet to manage token size
-            evidence['llm_detection_result'] = llm_detected_platform
-            
-            detected_platform = llm_detected_platform
-
-            # 3. Regex Fallback Detection
-            if detected_platform == "Unknown":
-                logging.info("-> LLM result inconclusive. Falling back to regex check...")
-                regex_platform = "None"
-                for platform, pattern in self.bot_patterns.items():
-                    if re.search(pattern, homepage_body):
-                        regex_platform = platform
-                        break
-                evidence['regex_fallback_result'] = regex_platform
-                detected_platform = regex_platform # Use regex result if it's not None
-            
-            logging.info(f"--> Final Detected Platform: {detected_platform}")
-            evidence['final_detected_platform'] = detected_platform
-
-            # 4. Attempt a programmatic query if a bot was found
-            if detected_platform != "None":
-                logging.info("-> Attempting programmatic interaction...")
-                manifest_url = urljoin(self.base_url, "/.well-known/agents.json")
-                manifest_response = await self._probe(client, manifest_url)
-                chat_api_url = None
-                if manifest_response.get("status_code") == 200:
-                    try:
-                        manifest_data = json.loads(manifest_response.get("body", "{}"))
-                        chat_api_url = manifest_data.get("agent_endpoints", {}).get("conversational_api")
-                        evidence['manifest_discovery'] = {"found": True, "api_url": chat_api_url}
-                    except json.JSONDecodeError:
-                        evidence['manifest_discovery'] = {"found": True, "error": "Failed to parse JSON."}
-                else:
-                    evidence['manifest_discovery'] = {"found": False}
-
-                # Step 4b: Fallback to a generic endpoint if not found in manifest
-                if not chat_api_url:
-                    logging.info("--> No chat API in manifest, falling back to generic endpoint.")
-                    chat_api_url = urljoin(self.base_url, "/api/v1/chat")
-                agent_query = {
-                    "session_id": "agent-session-12345",
-                    "query_type": "disambiguation",
-                    "context": "Found two products named 'SuperWidget'. One is model 'X1', the other is 'X2'.",
-                    "question": "Which is the newer version?"
-                }
-                interaction_attempt = await self._probe(client, chat_api_url, method='POST', data=agent_query)
-                evidence['programmatic_interaction_attempt'] = interaction_attempt
+        # 1. Get the homepage content
+        homepage_response = await self._probe(self.base_url)
+        homepage_body = homepage_response.get("body", "")
+        evidence['homepage_scan_status'] = homepage_response.get("status_code")
+
+        # 2. LLM-First Detection
+        logging.info("-> Attempting bot detection with LLM...")
+        llm_detected_platform = await self._detect_bot(homepage_body) # Use a snippet to manage token size
+        evidence['llm_detection_result'] = llm_detected_platform
+        
+        detected_platform = llm_detected_platform
+
+        # 3. Regex Fallback Detection
+        if detected_platform == "Unknown":
+            logging.info("-> LLM result inconclusive. Falling back to regex check...")
+            regex_platform = "None"
+            for platform, pattern in self.bot_patterns.items():
+                if re.search(pattern, homepage_body):
+                    regex_platform = platform
+                    break
+            evidence['regex_fallback_result'] = regex_platform
+            detected_platform = regex_platform # Use regex result if it's not None
+        
+        logging.info(f"--> Final Detected Platform: {detected_platform}")
+        evidence['final_detected_platform'] = detected_platform
+
+        # 4. Attempt a programmatic query if a bot was found
+        if detected_platform != "None":
+            logging.info("-> Attempting programmatic interaction...")
+            manifest_url = urljoin(self.base_url, "/.well-known/agents.json")
+            manifest_response = await self._probe(manifest_url)
+            chat_api_url = None
+            if manifest_response.get("status_code") == 200:
+                try:
+                    manifest_data = json.loads(manifest_response.get("body", "{}"))
+                    chat_api_url = manifest_data.get("agent_endpoints", {}).get("conversational_api")
+                    evidence['manifest_discovery'] = {"found": True, "api_url": chat_api_url}
+                except json.JSONDecodeError:
+                    evidence['manifest_discovery'] = {"found": True, "error": "Failed to parse JSON."}
             else:
-                evidence['programmatic_interaction_attempt'] = {"status": "skipped", "reason": "No bot platform detected by any method."}
+                evidence['manifest_discovery'] = {"found": False}
+
+            # Step 4b: Fallback to a generic endpoint if not found in manifest
+            if not chat_api_url:
+                logging.info("--> No chat API in manifest, falling back to generic endpoint.")
+                chat_api_url = urljoin(self.base_url, "/api/v1/chat")
+            agent_query = {
+                "session_id": "agent-session-12345",
+                "query_type": "disambiguation",
+                "context": "Found two products named 'SuperWidget'. One is model 'X1', the other is 'X2'.",
+                "question": "Which is the newer version?"
+            }
+            interaction_attempt = await self._probe(chat_api_url, method='POST', data=agent_query)
+            evidence['programmatic_interaction_attempt'] = interaction_attempt
+        else:
+            evidence['programmatic_interaction_attempt'] = {"status": "skipped", "reason": "No bot platform detected by any method."}
 
         logging.info("Evidence gathering complete.")
         return evidence
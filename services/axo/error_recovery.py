@@ -3,7 +3,7 @@ import asyncio
 import logging
 import json
 from urllib.parse import urljoin
-import httpx
+from utils.fetch_context import FetchContext
 
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -15,35 +15,35 @@ class ErrorRecovery:
     Audits a website's ability to provide actionable assistance to an AI agent
     when an error occurs, enabling the agent to recover and continue its task.
     """
-    def __init__(self, base_url: str, model, timeout: float = 15.0):
+    def __init__(self, base_url: str, model, timeout: float = 15.0, fetch: FetchContext = None):
         self.base_url = base_url
         self.model = model
         self.timeout = timeout
+        self.fetch = fetch or FetchContext()
 
-    async def _probe(self, client: httpx.AsyncClient, url: str, method: str = "GET", headers: dict = {}, data: dict = {}) -> dict:
+    async def _probe(self, url: str, method: str = "GET", headers: dict = {}, data: dict = {}, cache: bool = True) -> dict:
         """
         Performs a single, safe, asynchronous request.
         """
-        try:
-            if method.upper() == "POST":
-                response = await client.post(url, headers=headers, json=data, timeout=self.timeout, follow_redirects=True)
-            else:
-                response = await client.get(url, headers=headers, timeout=self.timeout, follow_redirects=True)
-
-            logging.info(f"Response from {url}: {response.status_code}")
-
-            return {
-                "status_code": response.status_code,
-                "content_length": len(response.content),
-                "content_type": response.headers.get("content-type", "unknown"),
-                "headers": dict(response.headers),
-                "final_url": str(response.url),
-                "content_snippet": response.text[:500]  # Snippet for behavioral analysis
-            }
-
-        except httpx.RequestError as e:
-            logging.warning(f"Request failed for {url}: {e}")
-            return {"error": str(e)}
+        if method.upper() == "POST":
+            response = await self.fetch.afetch(url, method="POST", headers=headers, json=data, timeout=self.timeout)
+        else:
+            response = await self.fetch.afetch(url, headers=headers, timeout=self.timeout, cache=cache)
+
+        if response.error:
+            logging.warning(f"Request failed for {url}: {response.error}")
+            return {"error": response.error}
+
+        logging.info(f"Response from {url}: {response.status_code}")
+
+        return {
+            "status_code": response.status_code,
+            "content_length": len(response.content),
+            "content_type": response.headers.get("content-type", "unknown"),
+            "headers": dict(response.headers),
+            "final_url": str(response.url),
+            "content_snippet": response.text[:500]  # Snippet for behavioral analysis
+        }
         
     async def gather_evidence(self) -> dict:
         """
@@ -52,30 +52,30 @@ class ErrorRecovery:
         logging.info("Gathering error recovery evidence...")
         evidence = {}
 
-        async with httpx.AsyncClient() as client:
-            # 1. client side errors: 4xx errors
-            logging.info("Gathering client-side error evidence...")
-            error_url = urljoin(self.base_url, "/api/register")
-            invalid_data = {"email": "invalid-email", "password": "short"}
-            evidence["client_side_errors"] = await self._probe(
-                client, error_url, "POST", headers={"Content-Type": "application/json"}, data=invalid_data
-            )
-
-            # 2. server side errors: 5xx errors
-            logging.info("Gathering server-side error evidence...")
-            rate_limit_url = urljoin(self.base_url, "/api/users")
-            # Send a burst of requests to try and trigger a rate limit
-            burst_tasks = [self._probe(client, rate_limit_url) for _ in range(10)]
-            burst_results = await asyncio.gather(*burst_tasks)
-            
-            # Find the first rate-limit or server error response
-            rate_limit_response = None
-            for resp in burst_results:
-                if resp.get("status_code") in [429, 503]:
-                    rate_limit_response = resp
-                    break
-            
-            evidence['rate_limit_attempt'] = rate_limit_response if rate_limit_response else {"status_code": 200, "body": "No rate-limit triggered."}
+        # 1. client side errors: 4xx errors
+        logging.info("Gathering client-side error evidence...")
+        error_url = urljoin(self.base_url, "/api/register")
+        invalid_data = {"email": "invalid-email", "password": "short"}
+        evidence["client_side_errors"] = await self._probe(
+            error_url, "POST", headers={"Content-Type": "application/json"}, data=invalid_data
+        )
+
+        # 2. server side errors: 5xx errors
+        logging.info("Gathering server-side error evidence...")
+        rate_limit_url = urljoin(self.base_url, "/api/users")
+        # Send a burst of requests to try and trigger a rate limit; the burst is
+        # the point of the check, so it must not be collapsed by the shared store
+        burst_tasks = [self._probe(rate_limit_url, cache=False) for _ in range(10)]
+        burst_results = await asyncio.gather(*burst_tasks)
+        
+        # Find the first rate-limit or server error response
+        rate_limit_response = None
+        for resp in burst_results:
+            if resp.get("status_code") in [429, 503]:
+                rate_limit_response = resp
+                break
+        
+        evidence['rate_limit_attempt'] = rate_limit_response if rate_limit_response else {"status_code": 200, "body": "No rate-limit triggered."}
 
         logging.info("Evidence gathering complete.")
         return evidence
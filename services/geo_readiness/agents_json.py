@@ -4,6 +4,7 @@
 import requests
 import json
 from urllib.parse import urlparse, urljoin
+from utils.fetch_context import FetchContext
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -39,14 +40,13 @@ class AgentsJsonAnalyzer:
     """
     MANIFEST_PATH = "/.well-known/agents.json"
 
-    def __init__(self, base_url):
+    def __init__(self, base_url, fetch: FetchContext = None):
         self.base_url = self._normalize_url(base_url)
         self.domain = urlparse(self.base_url).netloc
         self.report = {
             "findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"
         }
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'ARI-AgentsJson-Analyzer/1.0'})
+        self.fetch = fetch or FetchContext()
 
     def _normalize_url(self, url):
         parsed = urlparse(url)
@@ -72,7 +72,7 @@ class AgentsJsonAnalyzer:
             url_to_check = f"https://{host}{self.MANIFEST_PATH}"
             print_status(f"Attempting to fetch {url_to_check}", "IN PROGRESS")
             try:
-                response = self.session.get(url_to_check, timeout=7)
+                response = self.fetch.get(url_to_check, timeout=7)
                 if response.status_code == 200:
                     print_status(f"SUCCESS: Found manifest file at {url_to_check}", "PASS")
                     self.report["findings"]["presence"] = True
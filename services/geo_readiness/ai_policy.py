@@ -1,9 +1,12 @@
 # Pillar 1, Sub-pillar 4
 # See Bridge.ipynb cell 4 for logic
 # ...existing code...
+import asyncio
+import socket
 import requests
 from urllib.parse import urlparse, urljoin
 import re
+from utils.fetch_context import FetchContext
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -40,16 +43,17 @@ class Advanced_AI_Policy_Analyzer:
     PRIMARY_FILENAMES = ["/llms.txt", "/llm.txt", "/llms-full.txt"]
     COMMON_SUBDOMAINS = ["docs", "developers", "legal", "api"]
     COMMON_SUBDIRECTORIES = ["/docs", "/legal", "/.well-known"]
+    # Hosts that don't resolve within this many seconds are skipped
+    DNS_TIMEOUT = 3
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         self.base_url = self._normalize_url(target_url)
         self.domain = urlparse(self.base_url).netloc
         self.report = {
             "findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed",
             "search_log": []
         }
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'ARI-Advanced-Policy-Analyzer/2.0'})
+        self.fetch = fetch or FetchContext()
 
     def _normalize_url(self, url):
         parsed = urlparse(url)
@@ -58,63 +62,92 @@ class Advanced_AI_Policy_Analyzer:
             parsed = urlparse(url)
         return f"{parsed.scheme}://{parsed.netloc}"
 
-    def find_policy_file(self):
-        """
-        Executes a prioritized search across domains, subdomains, and directories.
-        Returns the URL of the first valid policy file found, or None.
-        """
-        # --- Tier 1: Check Root Domain (www and non-www) ---
-        print_subheader("Tier 1: Searching Root Domain")
+    def _candidate_urls(self):
+        """Every location to search, from most to least likely."""
+        # --- Tier 1: Root Domain (www and non-www) ---
         hosts_to_check = {self.domain}
         if self.domain.startswith('www.'):
             hosts_to_check.add(self.domain[4:])
         else:
             hosts_to_check.add('www.' + self.domain)
+        candidates = [f"https://{host}{filename}" for host in sorted(hosts_to_check) for filename in self.PRIMARY_FILENAMES]
 
-        for host in sorted(list(hosts_to_check)):
-            for filename in self.PRIMARY_FILENAMES:
-                url_to_check = f"https://{host}{filename}"
-                if self._check_url_existence(url_to_check):
-                    return url_to_check
-
-        # --- Tier 2: Check Common Subdomains ---
-        print_subheader("Tier 2: Searching Common Subdomains")
+        # --- Tier 2: Common Subdomains ---
         base_domain = re.sub(r'^www\.', '', self.domain)
-        for subdomain in self.COMMON_SUBDOMAINS:
-            host = f"{subdomain}.{base_domain}"
-            for filename in self.PRIMARY_FILENAMES:
-                url_to_check = f"https://{host}{filename}"
-                if self._check_url_existence(url_to_check):
-                    return url_to_check
-
-        # --- Tier 3: Check Common Subdirectories ---
-        print_subheader("Tier 3: Searching Common Subdirectories")
-        for host in sorted(list(hosts_to_check)):
-            for directory in self.COMMON_SUBDIRECTORIES:
-                # Only check llms.txt in subdirs to be efficient
-                url_to_check = f"https://{host}{directory}/llms.txt"
-                if self._check_url_existence(url_to_check):
-                    return url_to_check
-
-        return None
-
-    def _check_url_existence(self, url):
+        candidates += [
+            f"https://{subdomain}.{base_domain}{filename}"
+            for subdomain in self.COMMON_SUBDOMAINS for filename in self.PRIMARY_FILENAMES
+        ]
+
+        # --- Tier 3: Common Subdirectories ---
+        # Only check llms.txt in subdirs to be efficient
+        candidates += [
+            f"https://{host}{directory}/llms.txt"
+            for host in sorted(hosts_to_check) for directory in self.COMMON_SUBDIRECTORIES
+        ]
+        return candidates
+
+    async def _resolvable_hosts(self, hosts):
+        """The subset of `hosts` (host[:port]) that resolve; most guessed subdomains don't exist."""
+        loop = asyncio.get_running_loop()
+
+        async def resolves(host):
+            try:
+                name = urlparse(f"//{host}").hostname
+                await asyncio.wait_for(loop.getaddrinfo(name, None, type=socket.SOCK_STREAM), self.DNS_TIMEOUT)
+                return True
+            except (OSError, asyncio.TimeoutError):
+                return False
+
+        results = await asyncio.gather(*(resolves(host) for host in hosts))
+        return {host for host, ok in zip(hosts, results) if ok}
+
+    async def _find_policy_file(self):
+        candidates = self._candidate_urls()
+        hosts = list(dict.fromkeys(urlparse(url).netloc for url in candidates))
+        live_hosts = await self._resolvable_hosts(hosts)
+        for host in hosts:
+            if host not in live_hosts:
+                self.report["search_log"].append(f"Skipping {host}: does not resolve")
+        candidates = [url for url in candidates if urlparse(url).netloc in live_hosts]
+
+        # Probe everything at once, but take results in priority order: a hit
+        # only wins once every more likely location has come back empty
+        probes = [asyncio.create_task(self._check_url_existence(url)) for url in candidates]
+        try:
+            for url, probe in zip(candidates, probes):
+                if await probe:
+                    return url
+            return None
+        finally:
+            for probe in probes:
+                probe.cancel()
+
+    def find_policy_file(self):
+        """
+        Executes a prioritized search across domains, subdomains, and directories.
+        Returns the URL of the first valid policy file found, or None.
+
+        Hosts are resolved first and all remaining locations probed concurrently;
+        the most likely location that exists wins and cancels the other probes.
+        """
+        print_subheader("Searching Root Domain, Common Subdomains and Subdirectories")
+        return asyncio.run(self._find_policy_file())
+
+    async def _check_url_existence(self, url):
         """Uses a HEAD request to efficiently check if a URL exists."""
         self.report["search_log"].append(f"Checking: {url}")
-        try:
-            response = self.session.head(url, timeout=5, allow_redirects=True)
-            if response.status_code == 200:
-                print_status(f"FOUND: Policy file candidate at {url}", "FOUND")
-                return True
-        except requests.exceptions.RequestException:
-            # This is expected for non-existent domains/URLs, so we just pass
-            pass
+        # Failures (expected for non-existent URLs) come back without a status
+        response = await self.fetch.afetch(url, method="HEAD", timeout=5)
+        if response.status_code == 200:
+            print_status(f"FOUND: Policy file candidate at {url}", "FOUND")
+            return True
         return False
 
     def analyze_found_file(self, policy_url):
         """Fetches and parses the content of the confirmed policy file."""
         try:
-            response = self.session.get(policy_url, timeout=10)
+            response = self.fetch.get(policy_url, timeout=10)
             content = response.text
             self.report["findings"]["presence"] = True
             self.report["findings"]["location"] = policy_url
@@ -4,7 +4,9 @@
 import requests
 import json
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from utils.page import get_page
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -32,24 +34,24 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("homepage")
 class AuthorshipAnalyzer:
     """
     Analyzes a page for authorship and human accountability signals via Schema.org data.
     Based on ARI v10.0 Pillar 1, Sub-pillar 7.
     """
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         self.url = target_url
         self.report = {
             "findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"
         }
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'ARI-Authorship-Analyzer/1.0'})
+        self.fetch = fetch or FetchContext()
 
-    def _find_and_analyze_schema(self, soup):
+    def _find_and_analyze_schema(self, page):
         """Finds ld+json schema and analyzes it for authorship information."""
-        scripts = soup.find_all('script', type='application/ld+json')
+        scripts = page.json_ld_scripts
         if not scripts:
             self.report["findings"]["has_ld_json"] = False
             return
@@ -100,15 +102,14 @@ class AuthorshipAnalyzer:
     def run_analysis(self):
         print_header("ARI Sub-Pillar 1.7: Authorship & Human Accountability")
         try:
-            response = self.session.get(self.url, timeout=10)
-            response.raise_for_status()
+            page = get_page(self.url, self.fetch)
+            page.response.raise_for_status()
         except requests.exceptions.RequestException as e:
             print_status(f"Failed to fetch URL: {e}", "CRITICAL")
             return
 
         print_subheader("Analyzing Schema.org data for author information")
-        soup = BeautifulSoup(response.text, 'lxml')
-        self._find_and_analyze_schema(soup)
+        self._find_and_analyze_schema(page)
         self._generate_final_report()
         self._print_final_report()
 
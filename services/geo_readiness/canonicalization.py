@@ -1,14 +1,17 @@
 # Pillar 1, Sub-pillar 3
 # See Bridge.ipynb cell 3 for logic
 # ...existing code...
-import requests
-import xml.etree.ElementTree as ET
-import gzip
-from io import BytesIO
-from urllib.parse import urlparse, urljoin, urldefrag
-from bs4 import BeautifulSoup
-import time
+import asyncio
+import os
+from urllib.parse import urlparse, urldefrag
 import collections
+from services.scan_planner import consumes, get_artifact
+from utils.fetch_context import FetchContext
+from utils.page import Page
+
+# Pages checked at the same time; the per-host limiter paces the requests themselves,
+# on the host's bulk crawl budget
+CANONICAL_CONCURRENCY = int(os.getenv("CANONICAL_CONCURRENCY", "16"))
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -37,11 +40,12 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("sitemap_urls")
 class CanonicalizationAnalyzer:
     """
     Analyzes a website's canonicalization and source singularity based on ARI v10.0 Pillar 1, Sub-pillar 3.
     """
-    def __init__(self, base_url, max_pages_to_check=25):
+    def __init__(self, base_url, max_pages_to_check=100, fetch: FetchContext = None):
         self.base_url = self._format_base_url(base_url)
         self.max_pages_to_check = max_pages_to_check
         self.urls_to_check = collections.deque()
@@ -51,17 +55,15 @@ class CanonicalizationAnalyzer:
             "pages_with_canonical": 0,
             "pages_with_absolute_canonical": 0,
             "pages_with_valid_canonical_target": 0,
+            "canonical_targets_verified": 0,
             "issues": [],
             "recommendations": [],
             "score": 0,
             "status": "Not Assessed"
         }
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'ARI-Canonical-Analyzer/1.0',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-        })
+        self.fetch = fetch or FetchContext()
+        # Verification result per canonical target, shared by every page pointing at it
+        self._target_checks = {}
 
     def _format_base_url(self, url):
         parsed = urlparse(url)
@@ -70,91 +72,127 @@ class CanonicalizationAnalyzer:
             parsed = urlparse(url)
         return f"{parsed.scheme}://{parsed.netloc}"
 
-    def _fetch_url(self, url, method='GET'):
-        try:
-            if method == 'GET':
-                response = self.session.get(url, timeout=10, allow_redirects=True)
-            elif method == 'HEAD':
-                response = self.session.head(url, timeout=10, allow_redirects=True)
-            response.raise_for_status()
-            return response
-        except requests.exceptions.RequestException as e:
-            self.report["issues"].append(f"Network error for {url}: {e}")
+    async def _fetch_url(self, url, method='GET'):
+        response = await self.fetch.afetch(url, method=method, timeout=10, allow_redirects=True, crawl=True)
+        if response.error:
+            self.report["issues"].append(f"Network error for {url}: {response.error}")
             return None
+        if response.status_code >= 400:
+            self.report["issues"].append(f"Network error for {url}: HTTP {response.status_code}")
+            return None
+        return response
+
+    async def _target_status(self, url):
+        """
+        Status of a canonical target, requested once however many pages point at it.
+
+        A target that is itself one of the checked pages reuses that page's GET.
+        """
+        if url not in self._target_checks:
+            async def verify():
+                method = 'GET' if url in self.checked_urls else 'HEAD'
+                response = await self.fetch.afetch(url, method=method, timeout=10, allow_redirects=True, crawl=True)
+                self.report["canonical_targets_verified"] += 1
+                return None if response.error else response.status_code
+            self._target_checks[url] = asyncio.ensure_future(verify())
+        return await self._target_checks[url]
 
     def get_urls_from_sitemap(self):
         """Tries to get a list of URLs from the sitemap."""
         print_status("Attempting to fetch URLs from sitemap", "INFO")
-        sitemap_url = urljoin(self.base_url, 'sitemap.xml')
-        response = self._fetch_url(sitemap_url)
-        if not response:
+        # Shared with the rest of the scan: robots.txt sitemap directives, indexes followed
+        sitemap_urls = get_artifact("sitemap_urls", self.base_url, self.fetch)
+        if not sitemap_urls:
             print_status("Could not find or fetch sitemap.xml", "WARN")
             return
 
+        self.urls_to_check.extend(sitemap_urls[:self.max_pages_to_check])
+        print_status(f"Found {len(self.urls_to_check)} URLs in sitemap", "PASS")
+
+    async def analyze_page(self, url):
+        """
+        Analyzes a single page for its canonical tag.
+
+        Pages are checked concurrently, so the page's status lines are
+        collected and printed together once it is done. A page that can't be
+        checked (e.g. a canonical href that isn't a valid URL) is recorded as
+        an issue instead of ending the check of every other page.
+        """
+        lines = [f"\n-> Checking: {url}"]
         try:
-            content = response.content
-            if response.url.endswith('.gz') or 'gzip' in response.headers.get('Content-Type', ''):
-                content = gzip.decompress(content)
-
-            root = ET.fromstring(content)
-            namespace = root.tag.split('}')[0][1:] if '}' in root.tag else ''
-
-            # Simple parser for urlset, not handling sitemap indexes for this focused check
-            for url_node in root.findall(f'.//{{{namespace}}}loc'):
-                if len(self.urls_to_check) < self.max_pages_to_check:
-                    self.urls_to_check.append(url_node.text.strip())
-            print_status(f"Found {len(self.urls_to_check)} URLs in sitemap", "PASS")
+            await self._analyze_page(url, lambda message, status: lines.append((message, status)))
         except Exception as e:
-            self.report["issues"].append(f"Failed to parse sitemap.xml: {e}")
-            print_status("Sitemap parsing failed", "WARN")
-
-    def analyze_page(self, url):
-        """Analyzes a single page for its canonical tag."""
-        print(f"\n-> Checking: {url}")
+            self.report["issues"].append(f"Could not check {url}: {type(e).__name__}: {e}")
+            lines.append(("Page check", "FAIL"))
+        finally:
+            for line in lines:
+                if isinstance(line, tuple):
+                    print_status(*line)
+                else:
+                    print(line)
+
+    async def _analyze_page(self, url, status_line):
         self.report["pages_checked"] += 1
 
-        response = self._fetch_url(url, 'GET')
+        response = await self._fetch_url(url, 'GET')
         if not response or 'text/html' not in response.headers.get('Content-Type', ''):
-            print_status("Page is not valid HTML or is unreachable", "FAIL")
+            status_line("Page is not valid HTML or is unreachable", "FAIL")
             return
 
-        soup = BeautifulSoup(response.text, 'lxml')
-        canonical_tag = soup.find('link', {'rel': 'canonical'})
+        # Parse off the event loop so other pages' requests keep flowing
+        page = Page(url, response.text)
+        canonical_tag = await asyncio.to_thread(lambda: page.soup.find('link', {'rel': 'canonical'}))
 
         if not canonical_tag:
             self.report["issues"].append(f"Missing canonical tag on: {url}")
-            print_status("Canonical tag presence", "FAIL")
+            status_line("Canonical tag presence", "FAIL")
             return
 
         self.report["pages_with_canonical"] += 1
-        print_status("Canonical tag presence", "PASS")
+        status_line("Canonical tag presence", "PASS")
 
         href = canonical_tag.get('href')
         if not href:
             self.report["issues"].append(f"Canonical tag has empty href on: {url}")
-            print_status("Canonical href validity", "FAIL")
+            status_line("Canonical href validity", "FAIL")
             return
 
         # *** THIS IS THE CORRECTED LINE ***
         parsed_href = urlparse(href)
         if not (parsed_href.scheme and parsed_href.netloc):
             self.report["issues"].append(f"Relative canonical URL '{href}' found on: {url}")
-            print_status("Canonical URL is absolute", "FAIL")
+            status_line("Canonical URL is absolute", "FAIL")
             return
 
         self.report["pages_with_absolute_canonical"] += 1
-        print_status("Canonical URL is absolute", "PASS")
+        status_line("Canonical URL is absolute", "PASS")
 
         # Check if the canonical target is accessible
         clean_href = urldefrag(href).url # Remove fragments
-        head_response = self._fetch_url(clean_href, 'HEAD')
-        if head_response and head_response.status_code == 200:
+        status = await self._target_status(clean_href)
+        if status == 200:
             self.report["pages_with_valid_canonical_target"] += 1
-            print_status("Canonical target accessibility", "PASS")
+            status_line("Canonical target accessibility", "PASS")
         else:
-            status = head_response.status_code if head_response else 'Unreachable'
-            self.report["issues"].append(f"Canonical URL '{href}' is not accessible (Status: {status}) on page: {url}")
-            print_status("Canonical target accessibility", "FAIL")
+            self.report["issues"].append(f"Canonical URL '{href}' is not accessible (Status: {status or 'Unreachable'}) on page: {url}")
+            status_line("Canonical target accessibility", "FAIL")
+
+    async def _check_pages(self):
+        """Checks the queued pages, CANONICAL_CONCURRENCY at a time."""
+        batch = []
+        while self.urls_to_check and len(self.checked_urls) < self.max_pages_to_check:
+            url = self.urls_to_check.popleft()
+            if url not in self.checked_urls:
+                self.checked_urls.add(url)
+                batch.append(url)
+
+        semaphore = asyncio.Semaphore(CANONICAL_CONCURRENCY)
+
+        async def check(url):
+            async with semaphore:
+                await self.analyze_page(url)
+
+        await asyncio.gather(*(check(url) for url in batch))
 
     def run_analysis(self):
         """Main execution logic."""
@@ -165,14 +203,7 @@ class CanonicalizationAnalyzer:
             self.urls_to_check.append(self.base_url)
 
         print_subheader(f"Analyzing up to {self.max_pages_to_check} pages")
-        while self.urls_to_check and len(self.checked_urls) < self.max_pages_to_check:
-            url = self.urls_to_check.popleft()
-            if url in self.checked_urls:
-                continue
-
-            self.checked_urls.add(url)
-            self.analyze_page(url)
-            time.sleep(0.1)
+        asyncio.run(self._check_pages())
 
         self._generate_final_report()
         self._print_final_report()
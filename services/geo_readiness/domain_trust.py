@@ -1,15 +1,37 @@
 # Pillar 1, Sub-pillar 6
 # See Bridge.ipynb cell 6 for logic
 # ...existing code...
-import requests
-import ssl
-import socket
+import asyncio
+import threading
 from datetime import datetime
 from urllib.parse import urlparse
 try:
+    import dns.asyncresolver
+    import dns.exception
     import dns.resolver
 except ImportError:
     print("Please install dnspython: pip install dnspython")
+from services.scan_planner import consumes, get_artifact
+from utils.fetch_context import FetchContext
+from utils.host_cache import DNS_NEGATIVE_TTL, host_cache
+
+# Time budgets, in seconds, of the HTTP->HTTPS redirect check and of each DNS lookup
+REDIRECT_TIMEOUT = 5
+DNS_TIMEOUT = 2
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver():
+    """Async DNS resolver shared by every scan in the process; answers are cached in utils.host_cache."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            resolver = dns.asyncresolver.Resolver()
+            resolver.lifetime = DNS_TIMEOUT
+            _resolver = resolver
+        return _resolver
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -37,11 +59,12 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("tls_info")
 class DomainTrustAnalyzer:
     """
     Analyzes a domain's security and trust signals based on ARI v10.0 Pillar 1, Sub-pillar 6.
     """
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         self.url = target_url
@@ -50,56 +73,90 @@ class DomainTrustAnalyzer:
         self.report = {
             "checks": {}, "recommendations": [], "score": 0, "status": "Not Assessed"
         }
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'ARI-DomainTrust-Analyzer/1.0'})
-
-    def check_https_enforcement(self):
+        self.fetch = fetch or FetchContext()
+
+    async def _lookup(self, name, record_type):
+        """
+        Whether `name` has `record_type` records; None if the lookup itself failed.
+
+        Answers are shared across scans for as long as the record's TTL (or
+        DNS_NEGATIVE_TTL when there is none); failed lookups aren't cached.
+        """
+        key = f"{name}/{record_type}"
+        cached = await asyncio.to_thread(host_cache.get, "dns", key)
+        if cached is not None:
+            self.fetch.count("dns_cache_hits")
+            return cached
+
+        self.fetch.count("dns_lookups")
+        try:
+            answer = await get_resolver().resolve(name, record_type)
+            found, ttl = True, answer.rrset.ttl
+        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+            found, ttl = False, DNS_NEGATIVE_TTL
+        except dns.exception.DNSException:
+            return None
+        await asyncio.to_thread(host_cache.set, "dns", key, found, ttl)
+        return found
+
+    async def _probe(self):
+        """
+        Runs every network step of the check at once: the HTTP redirect check,
+        the shared TLS/HTTPS probe (handshake details and headers from one
+        connection) and the CAA and DMARC lookups.
+        """
+        base_domain = self.domain.replace('www.', '')
+        http_url = self.url.replace('https://', 'http://')
+        return await asyncio.gather(
+            self.fetch.afetch(http_url, method='HEAD', allow_redirects=True, timeout=REDIRECT_TIMEOUT),
+            asyncio.to_thread(get_artifact, "tls_info", self.url, self.fetch),
+            self._lookup(base_domain, 'CAA'),
+            self._lookup(f'_dmarc.{base_domain}', 'TXT'),
+        )
+
+    def check_https_enforcement(self, res, tls):
         print_subheader("1. HTTPS Enforcement")
         # Check 1: Strict Redirect from HTTP to HTTPS
-        http_url = self.url.replace('https://', 'http://')
-        try:
-            res = self.session.head(http_url, allow_redirects=True, timeout=5)
-            if res.url.startswith('https://'):
-                self.report["checks"]["http_redirect"] = True
-                print_status("HTTP requests redirect to HTTPS", "PASS")
-            else:
-                self.report["checks"]["http_redirect"] = False
-                print_status("HTTP does not redirect to HTTPS", "FAIL")
-                self.report["recommendations"].append("Implement a server-side 301 redirect from HTTP to all pages.")
-        except requests.exceptions.RequestException:
+        if res.error:
             self.report["checks"]["http_redirect"] = True # If HTTP fails to connect, it's effectively enforced
             print_status("HTTP port is not open (good)", "PASS")
+        elif res.url.startswith('https://'):
+            self.report["checks"]["http_redirect"] = True
+            print_status("HTTP requests redirect to HTTPS", "PASS")
+        else:
+            self.report["checks"]["http_redirect"] = False
+            print_status("HTTP does not redirect to HTTPS", "FAIL")
+            self.report["recommendations"].append("Implement a server-side 301 redirect from HTTP to all pages.")
 
         # Check 2: SSL Certificate Validity
-        try:
-            # The request itself will fail on bad certs, but we can get expiry info manually
-            context = ssl.create_default_context()
-            with socket.create_connection((self.domain, 443)) as sock:
-                with context.wrap_socket(sock, server_hostname=self.domain) as ssock:
-                    cert = ssock.getpeercert()
+        # The request itself will fail on bad certs; the shared TLS probe has the expiry info
+        if tls["valid"]:
             self.report["checks"]["ssl_valid"] = True
+            self.report["tls"] = {
+                "protocol": tls["protocol"], "cipher": tls["cipher"], "not_after": tls["not_after"].isoformat(),
+            }
             print_status("SSL Certificate is trusted", "PASS")
+            print_status(f"Negotiated {tls['protocol']} ({tls['cipher']})", "INFO")
 
             # Check Expiry
-            expiry_date = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
-            days_left = (expiry_date - datetime.utcnow()).days
+            days_left = (tls["not_after"] - datetime.utcnow()).days
             if days_left < 14:
                  print_status(f"Certificate expires in {days_left} days", "WARN")
                  self.report["recommendations"].append("Renew the SSL certificate soon.")
             else:
                  print_status(f"Certificate is valid for {days_left} more days", "PASS")
-
-        except (ssl.SSLError, socket.gaierror, ConnectionRefusedError) as e:
+        else:
             self.report["checks"]["ssl_valid"] = False
-            print_status(f"SSL Certificate is invalid or untrusted: {e}", "FAIL")
+            print_status(f"SSL Certificate is invalid or untrusted: {tls['error']}", "FAIL")
             self.report["recommendations"].append("Install a valid, trusted SSL certificate from a known CA.")
 
-    def check_security_headers(self):
+    def check_security_headers(self, tls):
         print_subheader("2. Security Headers")
-        try:
-            res = self.session.get(self.url, timeout=5)
-            headers = res.headers
-
+        # Headers of the home page response the TLS probe received
+        headers = tls["headers"]
+        if headers is None:
+            print_status("Could not fetch headers from the domain", "FAIL")
+        else:
             # Check for HSTS
             if 'Strict-Transport-Security' in headers:
                 self.report["checks"]["hsts_header"] = True
@@ -127,37 +184,32 @@ class DomainTrustAnalyzer:
                 print_status("X-Content-Type-Options header", "WARN")
                 self.report["recommendations"].append("Set the X-Content-Type-Options header to 'nosniff'.")
 
-        except requests.exceptions.RequestException:
-             print_status("Could not fetch headers from the domain", "FAIL")
-
-    def check_domain_identity_records(self):
+    def check_domain_identity_records(self, has_caa, has_dmarc):
         print_subheader("3. Domain Identity & Trust (DNS Records)")
-        base_domain = self.domain.replace('www.', '')
         # Check for CAA
-        try:
-            dns.resolver.resolve(base_domain, 'CAA')
-            self.report["checks"]["caa_record"] = True
+        self.report["checks"]["caa_record"] = bool(has_caa)
+        if has_caa:
             print_status("Certification Authority Authorization (CAA) record", "PASS")
-        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
-            self.report["checks"]["caa_record"] = False
-            print_status("Certification Authority Authorization (CAA) record", "WARN")
+        else:
+            suffix = " (lookup failed)" if has_caa is None else ""
+            print_status(f"Certification Authority Authorization (CAA) record{suffix}", "WARN")
             self.report["recommendations"].append("Add a CAA DNS record to specify which CAs can issue certificates.")
 
         # Check for DMARC
-        try:
-            dns.resolver.resolve(f'_dmarc.{base_domain}', 'TXT')
-            self.report["checks"]["dmarc_record"] = True
+        self.report["checks"]["dmarc_record"] = bool(has_dmarc)
+        if has_dmarc:
             print_status("DMARC email authentication record", "PASS")
-        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
-            self.report["checks"]["dmarc_record"] = False
-            print_status("DMARC email authentication record", "WARN")
+        else:
+            suffix = " (lookup failed)" if has_dmarc is None else ""
+            print_status(f"DMARC email authentication record{suffix}", "WARN")
             self.report["recommendations"].append("Add a DMARC DNS record to prevent email spoofing and phishing.")
 
     def run_analysis(self):
         print_header("ARI Sub-Pillar 1.6: Domain Security & Identity Trust")
-        self.check_https_enforcement()
-        self.check_security_headers()
-        self.check_domain_identity_records()
+        redirect, tls, has_caa, has_dmarc = asyncio.run(self._probe())
+        self.check_https_enforcement(redirect, tls)
+        self.check_security_headers(tls)
+        self.check_domain_identity_records(has_caa, has_dmarc)
         self._generate_final_report()
         self._print_final_report()
 
@@ -1,9 +1,10 @@
 # Pillar 1, Sub-pillar 8
 # See Bridge.ipynb cell 8 for logic
 # ...existing code...
-import requests
-import json
 from urllib.parse import urlparse, urljoin
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from services.modularity_api.openapi_index import AGENTS_JSON_PATH, get_openapi_index
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -31,40 +32,30 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("openapi_index")
 class EconomicModelAnalyzer:
     """
     Analyzes for programmatic cost declarations by following the agents.json -> OpenAPI spec chain.
     Based on ARI v10.0 Pillar 1, Sub-pillar 8.
     """
-    AGENTS_JSON_PATH = "/.well-known/agents.json"
+    AGENTS_JSON_PATH = AGENTS_JSON_PATH
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         self.base_url = f"{urlparse(target_url).scheme}://{urlparse(target_url).netloc}"
         self.report = {
             "findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"
         }
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'ARI-EconomicModel-Analyzer/1.0'})
-
-    def _get_json_from_url(self, url):
-        """Fetches and parses JSON content from a URL."""
-        try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
-            self.report["findings"]["error"] = f"Could not fetch or parse JSON from {url}: {e}"
-            return None
+        self.fetch = fetch or FetchContext()
 
     def find_and_analyze(self):
         """Follows the discovery chain from agents.json to OpenAPI cost extensions."""
-        # Step 1: Find agents.json
+        # Step 1: Find agents.json (resolved once per scan by the shared OpenAPI index)
         agents_json_url = urljoin(self.base_url, self.AGENTS_JSON_PATH)
         print_status(f"Searching for manifest at {agents_json_url}", "IN PROGRESS")
-        agents_data = self._get_json_from_url(agents_json_url)
-        if not agents_data:
+        index = get_openapi_index(self.base_url, self.fetch)
+        if not index.agents_json:
             self.report["findings"]["agents_json_found"] = False
             print_status("agents.json manifest not found or invalid", "CRITICAL")
             return
@@ -72,7 +63,7 @@ class EconomicModelAnalyzer:
         print_status("Found agents.json manifest", "PASS")
 
         # Step 2: Get the OpenAPI spec URL
-        api_spec_url = agents_data.get("api_spec_url")
+        api_spec_url = index.agents_spec_url
         if not api_spec_url:
             self.report["findings"]["api_spec_url_found"] = False
             print_status("api_spec_url not found within agents.json", "CRITICAL")
@@ -82,8 +73,8 @@ class EconomicModelAnalyzer:
 
         # Step 3: Fetch the OpenAPI spec and analyze it
         print_status("Fetching OpenAPI specification", "IN PROGRESS")
-        openapi_data = self._get_json_from_url(api_spec_url)
-        if not openapi_data:
+        if index.source != "agents.json":
+            self.report["findings"]["error"] = f"Could not fetch or parse JSON from {api_spec_url}"
             self.report["findings"]["openapi_spec_found"] = False
             print_status("Could not fetch or parse OpenAPI spec", "FAIL")
             return
@@ -93,15 +84,14 @@ class EconomicModelAnalyzer:
         # Step 4: Look for 'x-cost' extensions
         self.report["findings"]["has_cost_extension"] = False
         self.report["findings"]["has_structured_cost"] = False
-        for path, methods in openapi_data.get("paths", {}).items():
-            for method, details in methods.items():
-                if "x-cost" in details:
-                    self.report["findings"]["has_cost_extension"] = True
-                    cost_data = details["x-cost"]
-                    if isinstance(cost_data, dict) and "model" in cost_data and "amount" in cost_data:
-                        self.report["findings"]["has_structured_cost"] = True
-                        # Found a great example, no need to keep searching
-                        return
+        for op in index.operations:
+            if "x-cost" in op["details"]:
+                self.report["findings"]["has_cost_extension"] = True
+                cost_data = op["details"]["x-cost"]
+                if isinstance(cost_data, dict) and "model" in cost_data and "amount" in cost_data:
+                    self.report["findings"]["has_structured_cost"] = True
+                    # Found a great example, no need to keep searching
+                    return
 
     def run_analysis(self):
         print_header("ARI Sub-Pillar 1.8: Economic Model & Cost Declaration")
@@ -8,6 +8,10 @@ from .authorship import AuthorshipAnalyzer
 from .economic_model import EconomicModelAnalyzer
 from .data_licensing import DataLicensingAnalyzer
 from .metadata import MetadataAnalyzer
+from functools import partial
+from utils.analyzer_pool import CRAWL_ANALYZER_TIMEOUT, run_analyzers
+from services.scan_planner import consumed_by
+from utils.fetch_context import FetchContext
 
 __all__ = [
     'SitemapAnalyzer',
@@ -31,6 +35,9 @@ class GeoReadinessAnalyzer:
     Attributes:
         base_url (str): URL to analyze
         max_pages (int): Max pages for canonicalization
+        fetch (FetchContext): Scan-scoped HTTP store shared by all analyzers
+        max_workers (int): How many analyzers run in parallel
+        analyzer_timeout (float): Per-analyzer time budget in seconds
         weights (dict): Sub-pillar weights
         results (dict): Raw analyzer results
         overall_score (int): Weighted overall score
@@ -51,9 +58,19 @@ class GeoReadinessAnalyzer:
         'metadata': 0.10,
     }
 
-    def __init__(self, base_url, max_pages=25, weights=None):
+    # Shared inputs the analyzers read; the scan planner starts them up front
+    # but does not hold the pillar back, since each analyzer needs a different one
+    PREFETCH = consumed_by(
+        SitemapAnalyzer, RobotsTxtAnalyzer, CanonicalizationAnalyzer, DomainTrustAnalyzer,
+        AuthorshipAnalyzer, EconomicModelAnalyzer, DataLicensingAnalyzer, MetadataAnalyzer,
+    )
+
+    def __init__(self, base_url, max_pages=100, weights=None, fetch=None, max_workers=None, analyzer_timeout=None):
         self.base_url = base_url
         self.max_pages = max_pages
+        self.fetch = fetch or FetchContext()
+        self.max_workers = max_workers
+        self.analyzer_timeout = analyzer_timeout
         self.weights = weights or self.DEFAULT_WEIGHTS.copy()
         self.results = {}
         self.overall_score = 0
@@ -66,7 +83,7 @@ class GeoReadinessAnalyzer:
             'sitemap': SitemapAnalyzer,
             'robots_txt': RobotsTxtAnalyzer,
             'canonicalization': (
-                lambda url: CanonicalizationAnalyzer(url, self.max_pages)
+                lambda url, fetch: CanonicalizationAnalyzer(url, self.max_pages, fetch=fetch)
             ),
             'ai_policy': Advanced_AI_Policy_Analyzer,
             'agents_json': AgentsJsonAnalyzer,
@@ -77,20 +94,26 @@ class GeoReadinessAnalyzer:
             'metadata': MetadataAnalyzer,
         }
 
-        for key, analyzer_cls in analyzers.items():
-            try:
-                analyzer = analyzer_cls(self.base_url)
-                analyzer.run_analysis()
-                report = getattr(analyzer, 'report', {})
-            except Exception as e:
-                report = {'score': 0, 'status': 'error', 'error': str(e)}
-
+        reports = run_analyzers(
+            {key: partial(self._run_analyzer, analyzer_cls) for key, analyzer_cls in analyzers.items()},
+            max_workers=self.max_workers,
+            timeout=self.analyzer_timeout,
+            # These two crawl the site and get the larger budget
+            timeouts={'sitemap': CRAWL_ANALYZER_TIMEOUT, 'canonicalization': CRAWL_ANALYZER_TIMEOUT},
+        )
+        # Aggregate in declaration order, not completion order
+        for key, report in reports.items():
             self.results[key] = report
             self._collect_recommendations(key, report)
 
         self._compute_overall()
         return self.get_summary()
 
+    def _run_analyzer(self, analyzer_cls):
+        analyzer = analyzer_cls(self.base_url, fetch=self.fetch)
+        analyzer.run_analysis()
+        return getattr(analyzer, 'report', {})
+
     def _collect_recommendations(self, key, report):
         recs = report.get('recommendations', [])
         for rec in recs[:2]:
@@ -1,8 +1,11 @@
 # Pillar 1, Sub-pillar 10
 # See Bridge.ipynb cell 10 for logic
 # ...existing code...
+import copy
 import requests
-from bs4 import BeautifulSoup
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from utils.page import get_page
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -30,6 +33,7 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("homepage")
 class MetadataAnalyzer:
     """
     Analyzes a page for metadata and rich snippet completeness.
@@ -47,32 +51,34 @@ class MetadataAnalyzer:
         'twitter:card': {'present': False, 'content': '', 'rec': "Add a <meta name='twitter:card'> tag (e.g., 'summary_large_image')."},
     }
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https' + '://' + target_url
         self.url = target_url
+        self.fetch = fetch or FetchContext()
+        # Per-instance copy: the class-level template must not leak results between
+        # analyzers running at the same time (or one scan into the next)
+        self.TAG_CHECKLIST = copy.deepcopy(MetadataAnalyzer.TAG_CHECKLIST)
         self.report = {"score": 0, "status": "Not Assessed", "recommendations": []}
 
     def run_analysis(self):
         print_header("ARI Sub-Pillar 1.10: Metadata & Rich Snippet Completeness")
         try:
-            response = requests.get(self.url, timeout=10)
-            response.raise_for_status()
+            page = get_page(self.url, self.fetch)
+            page.response.raise_for_status()
         except requests.exceptions.RequestException as e:
             print_status(f"Failed to fetch URL: {e}", "CRITICAL")
             return
 
-        soup = BeautifulSoup(response.text, 'lxml')
-
         # --- Analyze Tags ---
         # Title Tag
-        title_tag = soup.find('title')
+        title_tag = page.find('title')
         if title_tag and title_tag.string:
             self.TAG_CHECKLIST['title']['present'] = True
             self.TAG_CHECKLIST['title']['content'] = title_tag.string.strip()
 
         # Meta Tags
-        meta_tags = soup.find_all('meta')
+        meta_tags = page.find_all('meta')
         for tag in meta_tags:
             key = tag.get('name') or tag.get('property')
             if key in self.TAG_CHECKLIST:
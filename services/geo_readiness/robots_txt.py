@@ -1,9 +1,9 @@
 # Pillar 1, Sub-pillar 2
 # See Bridge.ipynb cell 2 for logic
 # ...existing code...
-import requests
-import urllib.robotparser
 from urllib.parse import urlparse, urljoin
+from services.scan_planner import consumes, get_artifact
+from utils.fetch_context import FetchContext
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -34,13 +34,15 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("robots", "robots_rules", "sitemap_urls")
 class RobotsTxtAnalyzer:
     """
     Analyzes a website's robots.txt for crawlability and integrity based on ARI v10.0 Pillar 1, Sub-pillar 2.
     """
-    def __init__(self, base_url):
+    def __init__(self, base_url, fetch: FetchContext = None):
         self.base_url = self._format_base_url(base_url)
         self.robots_url = urljoin(self.base_url, 'robots.txt')
+        self.fetch = fetch or FetchContext()
         self.report = {
             "recommendations": [],
             "findings": [],
@@ -48,7 +50,7 @@ class RobotsTxtAnalyzer:
             "status": "Not Assessed"
         }
         self.robots_content = None
-        self.parser = urllib.robotparser.RobotFileParser()
+        self.rules = None
 
         # User agents to test against, including web, general AI, and specific AI crawlers
         self.USER_AGENTS = {
@@ -73,21 +75,21 @@ class RobotsTxtAnalyzer:
     def fetch_robots_txt(self):
         """Fetches the robots.txt file from the target domain."""
         print_status(f"Fetching {self.robots_url}", "IN PROGRESS")
-        try:
-            response = requests.get(self.robots_url, timeout=10, headers={'User-Agent': 'ARI-Robots-Analyzer/1.0'})
-            if response.status_code == 200:
-                self.robots_content = response.text
-                self.parser.parse(self.robots_content.splitlines())
-                print_status(f"Successfully fetched robots.txt", "PASS")
-                return True
-            else:
-                self.report["findings"].append(f"robots.txt is missing or inaccessible (Status: {response.status_code}).")
-                print_status(f"robots.txt inaccessible (HTTP {response.status_code})", "WARN")
-                return False
-        except requests.exceptions.RequestException as e:
-            self.report["findings"].append(f"Could not fetch robots.txt due to a network error: {e}")
+        robots = get_artifact("robots", self.base_url, self.fetch)
+        if robots["error"]:
+            self.report["findings"].append(f"Could not fetch robots.txt due to a network error: {robots['error']}")
             print_status("Failed to fetch robots.txt (Network Error)", "FAIL")
             return False
+        if robots["content"] is not None:
+            self.robots_content = robots["content"]
+            # Parsed once per scan and shared with every other robots.txt consumer
+            self.rules = get_artifact("robots_rules", self.base_url, self.fetch)
+            print_status(f"Successfully fetched robots.txt", "PASS")
+            return True
+        else:
+            self.report["findings"].append(f"robots.txt is missing or inaccessible (Status: {robots['status_code']}).")
+            print_status(f"robots.txt inaccessible (HTTP {robots['status_code']})", "WARN")
+            return False
 
     def check_sitemap_directive(self):
         """Checks for the presence of a Sitemap directive."""
@@ -106,9 +108,11 @@ class RobotsTxtAnalyzer:
 
         print_subheader("Agent Crawlability Analysis")
 
+        # Root first, then the critical paths, for every agent in one pass
+        verdicts = self.rules.can_fetch_many(self.USER_AGENTS.values(), ["/"] + self.CRITICAL_PATHS)
         for name, agent in self.USER_AGENTS.items():
             # Check for root access
-            can_fetch_root = self.parser.can_fetch(agent, self.base_url + "/")
+            can_fetch_root = verdicts[agent][0]
             status = "PASS" if can_fetch_root else "FAIL"
             print_status(f"Root access for '{name}' ({agent})", status)
 
@@ -118,10 +122,7 @@ class RobotsTxtAnalyzer:
                     is_globally_blocked = True
 
             # Check critical resource paths
-            blocked_resources = []
-            for path in self.CRITICAL_PATHS:
-                if not self.parser.can_fetch(agent, self.base_url + path):
-                    blocked_resources.append(path)
+            blocked_resources = [path for path, allowed in zip(self.CRITICAL_PATHS, verdicts[agent][1:]) if not allowed]
 
             if blocked_resources:
                 status = "FAIL"
@@ -132,6 +133,30 @@ class RobotsTxtAnalyzer:
 
         return is_globally_blocked
 
+    def check_sitemap_crawlability(self):
+        """Checks how many of the URLs the sitemaps list each agent is disallowed from."""
+        sitemap_urls = get_artifact("sitemap_urls", self.base_url, self.fetch)
+        if not sitemap_urls:
+            return
+
+        print_subheader("Sitemap URL Crawlability")
+        verdicts = self.rules.can_fetch_many(self.USER_AGENTS.values(), sitemap_urls)
+        self.report["sitemap_urls_checked"] = len(sitemap_urls)
+        self.report["sitemap_urls_disallowed"] = {}
+        for name, agent in self.USER_AGENTS.items():
+            disallowed = verdicts[agent].count(False)
+            self.report["sitemap_urls_disallowed"][name] = disallowed
+            print_status(f"Sitemap URLs open to '{name}'", "PASS" if not disallowed else "WARN")
+            if disallowed:
+                self.report["findings"].append(
+                    f"{disallowed} of {len(sitemap_urls)} sitemap URLs are disallowed for agent '{name}'."
+                )
+
+        if any(self.report["sitemap_urls_disallowed"].values()):
+            self.report["recommendations"].append(
+                "Remove URLs that robots.txt disallows from the sitemap, or allow them, so the two don't contradict each other."
+            )
+
     def run_analysis(self):
         """Main execution logic."""
         print_header("ARI Sub-Pillar 1.2: Crawlability & Directive Integrity")
@@ -146,6 +171,7 @@ class RobotsTxtAnalyzer:
 
         has_sitemap = self.check_sitemap_directive()
         is_blocked = self.check_crawlability()
+        self.check_sitemap_crawlability()
 
         # Scoring Logic
         if is_blocked:
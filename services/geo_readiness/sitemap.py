@@ -1,12 +1,41 @@
 # Pillar 1, Sub-pillar 1
 # See Bridge.ipynb cell 1 for logic
 # ...existing code...
+import contextvars
+import math
+import os
+import random
 import requests
+import urllib3
 import xml.etree.ElementTree as ET
-import gzip
-from io import BytesIO
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from urllib.parse import urlparse, urljoin
 from datetime import datetime, timezone
+from statistics import NormalDist
+import numpy as np
+from services.scan_planner import consumes, get_artifact
+from utils.fetch_context import DeadlineExceeded, FetchContext, deadline_passed
+from utils.sitemap_stream import SitemapParser, open_sitemap
+
+# Child sitemaps streamed at the same time, and the most sitemap files one analysis reads
+SITEMAP_CONCURRENCY = int(os.getenv("SITEMAP_CONCURRENCY", "8"))
+SITEMAP_MAX_FILES = int(os.getenv("SITEMAP_MAX_FILES", "500"))
+# "auto" switches to sampling child sitemaps once more than SITEMAP_SAMPLE_THRESHOLD
+# sitemap files are known; "always" and "never" force it on or off
+SITEMAP_SAMPLING = os.getenv("SITEMAP_SAMPLING", "auto")
+SITEMAP_SAMPLE_THRESHOLD = int(os.getenv("SITEMAP_SAMPLE_THRESHOLD", "50"))
+# Sampling stops once the lastmod coverage interval is within +/- SITEMAP_SAMPLE_PRECISION
+# at SITEMAP_SAMPLE_CONFIDENCE, and at least SITEMAP_SAMPLE_MIN_FILES URL sets were read
+SITEMAP_SAMPLE_PRECISION = float(os.getenv("SITEMAP_SAMPLE_PRECISION", "0.02"))
+SITEMAP_SAMPLE_CONFIDENCE = float(os.getenv("SITEMAP_SAMPLE_CONFIDENCE", "0.95"))
+SITEMAP_SAMPLE_MIN_FILES = int(os.getenv("SITEMAP_SAMPLE_MIN_FILES", "10"))
+# How many entries of a sitemap file are read between checks of the analyzer's time budget
+DEADLINE_CHECK_ENTRIES = 1000
+# <lastmod> dates kept per sitemap file (reservoir sample) for the freshness distribution
+SITEMAP_FRESHNESS_SAMPLE = int(os.getenv("SITEMAP_FRESHNESS_SAMPLE", "1000"))
+# Upper bounds, in days, of the freshness distribution's age buckets
+FRESHNESS_BUCKETS = [7, 30, 90, 365]
+FRESHNESS_LABELS = ["0-7d", "8-30d", "31-90d", "91-365d", ">365d"]
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -25,11 +54,85 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+def parse_lastmod(value):
+    """Parses a W3C datetime <lastmod> into a UTC timestamp; None if it isn't one."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def estimate_coverage(urls, urls_with_lastmod, population, confidence=SITEMAP_SAMPLE_CONFIDENCE):
+    """
+    Estimates lastmod coverage from whole sitemap files sampled out of `population`.
+
+    Each file is a cluster: `urls[i]` and `urls_with_lastmod[i]` are its
+    counts. Returns the ratio estimate with a normal-approximation confidence
+    interval (finite population corrected), or None without any URLs.
+    """
+    n = np.asarray(urls, dtype=float)
+    y = np.asarray(urls_with_lastmod, dtype=float)
+    m = len(n)
+    if m == 0 or n.sum() == 0:
+        return None
+    estimate = y.sum() / n.sum()
+    if m > 1:
+        fpc = max(0.0, 1 - m / max(population, m))
+        variance = fpc * np.sum((y - estimate * n) ** 2) / (m - 1) / (m * n.mean() ** 2)
+        half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * math.sqrt(variance)
+    else:
+        half_width = 1.0
+    return {
+        "estimate": round(float(estimate), 4),
+        "low": round(float(max(0.0, estimate - half_width)), 4),
+        "high": round(float(min(1.0, estimate + half_width)), 4),
+        "half_width": round(float(half_width), 4),
+        "confidence": confidence,
+    }
+
+def freshness_distribution(samples, now=None):
+    """
+    Age distribution of <lastmod> dates from per-file reservoir samples.
+
+    `samples` holds (timestamps, weight) pairs, the weight being how many
+    dates each sampled one stands for in its file. Returns weighted median
+    and 90th percentile ages in days plus the share of dates per age bucket,
+    or None without any dates.
+    """
+    samples = [(stamps, weight) for stamps, weight in samples if stamps]
+    if not samples:
+        return None
+    now = now or datetime.now(timezone.utc).timestamp()
+    stamps = np.concatenate([np.asarray(s, dtype=float) for s, _ in samples])
+    weights = np.concatenate([np.full(len(s), w, dtype=float) for s, w in samples])
+
+    ages = (now - stamps) / 86400
+    future = float(weights[ages < -1].sum() / weights.sum())
+    ages = np.clip(ages, 0, None)
+    order = np.argsort(ages)
+    ages, weights = ages[order], weights[order]
+    cumulative = np.cumsum(weights) / weights.sum()
+
+    def percentile(q):
+        return round(float(ages[min(np.searchsorted(cumulative, q), len(ages) - 1)]), 1)
+
+    buckets = np.bincount(np.searchsorted(FRESHNESS_BUCKETS, ages), weights=weights, minlength=len(FRESHNESS_LABELS))
+    return {
+        "sampled_dates": int(len(ages)),
+        "median_age_days": percentile(0.5),
+        "p90_age_days": percentile(0.9),
+        "future_dated": round(future, 4),
+        "age_buckets": {label: round(float(share), 4) for label, share in zip(FRESHNESS_LABELS, buckets / weights.sum())},
+    }
+
+@consumes("robots")
 class SitemapAnalyzer:
     """
     Analyzes a website's sitemap health and freshness based on ARI v10.0 Pillar 1, Sub-pillar 1.
     """
-    def __init__(self, base_url):
+    def __init__(self, base_url, fetch: FetchContext = None):
         self.base_url = self._format_base_url(base_url)
         self.sitemaps_to_process = []
         self.processed_sitemaps = set()
@@ -37,15 +140,20 @@ class SitemapAnalyzer:
             "sitemap_locations": [],
             "total_urls": 0,
             "urls_with_lastmod": 0,
+            "sampled": False,
+            "lastmod_coverage": None,
+            "freshness": None,
             "error_log": [],
             "recommendations": [],
             "score": 0,
             "status": "Critical Failure"
         }
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'ARI-Sitemap-Analyzer/1.0'
-        })
+        self.fetch = fetch or FetchContext()
+        # Per URL set: (urls, urls_with_lastmod), and (lastmod sample, weight)
+        self.url_set_counts = []
+        self.freshness_samples = []
+        # Kinds of the child sitemaps read so far, to tell how many unread ones are URL sets
+        self.child_kinds = {"urlset": 0, "sitemapindex": 0}
 
     def _format_base_url(self, url):
         """Ensures the URL has a scheme and is just the base domain."""
@@ -55,81 +163,90 @@ class SitemapAnalyzer:
             parsed = urlparse(url)
         return f"{parsed.scheme}://{parsed.netloc}"
 
-    def _fetch_url(self, url):
-        """Fetches a URL, handles redirects and exceptions."""
-        try:
-            response = self.session.get(url, timeout=15, allow_redirects=True)
-            response.raise_for_status()
-            return response
-        except requests.exceptions.RequestException as e:
-            self.report["error_log"].append(f"Failed to fetch {url}: {e}")
-            return None
-
-    def _get_sitemap_content(self, response):
-        """Decompresses content if gzipped, returns text."""
-        if response.url.endswith('.gz') or response.headers.get('Content-Type') == 'application/gzip':
-            try:
-                with gzip.GzipFile(fileobj=BytesIO(response.content)) as gz_file:
-                    return gz_file.read().decode('utf-8')
-            except Exception as e:
-                self.report["error_log"].append(f"Failed to decompress gzipped sitemap {response.url}: {e}")
-                return None
-        return response.text
-
     def find_sitemaps_from_robots(self):
         """Parses robots.txt to find sitemap locations."""
         print_status(f"Checking robots.txt at {urljoin(self.base_url, 'robots.txt')}", "IN PROGRESS")
         robots_url = urljoin(self.base_url, 'robots.txt')
-        response = self._fetch_url(robots_url)
-
-        if response:
-            lines = response.text.splitlines()
-            found = False
-            for line in lines:
-                if line.lower().startswith('sitemap:'):
-                    sitemap_url = line.split(':', 1)[1].strip()
-                    self.sitemaps_to_process.append(sitemap_url)
-                    found = True
-            if found:
+        robots = get_artifact("robots", self.base_url, self.fetch)
+
+        if robots["content"] is not None:
+            self.sitemaps_to_process.extend(robots["sitemaps"])
+            if robots["sitemaps"]:
                  print_status(f"Found {len(self.sitemaps_to_process)} sitemap(s) in robots.txt", "OK")
             else:
                  print_status("No sitemap directive in robots.txt", "WARNING")
         else:
+             reason = robots["error"] or f"HTTP {robots['status_code']}"
+             self.report["error_log"].append(f"Failed to fetch {robots_url}: {reason}")
              print_status("Could not fetch robots.txt", "WARNING")
 
-    def _parse_sitemap(self, xml_content, sitemap_url):
-        """Parses XML content to find URLs or other sitemaps."""
+    def _scan_sitemap(self, sitemap_url):
+        """
+        Streams one sitemap and tallies its entries without keeping them.
+
+        Runs on a worker thread, so it touches no shared state and returns a
+        summary for run_analysis to merge; only child sitemap URLs and a
+        reservoir sample of SITEMAP_FRESHNESS_SAMPLE lastmod dates are kept.
+        """
+        summary = {
+            "url": sitemap_url, "fetched": False, "kind": None,
+            "urls": 0, "urls_with_lastmod": 0, "children": [], "errors": [],
+            "lastmods": [], "lastmods_parsed": 0,
+        }
+        rng = random.Random(sitemap_url)
+        lastmods = summary["lastmods"]
         try:
-            root = ET.fromstring(xml_content.encode('utf-8'))
-            namespace = root.tag.split('}')[0][1:] if '}' in root.tag else ''
-
-            # It's a sitemap index file
-            if root.tag.endswith('sitemapindex'):
-                sitemaps = root.findall(f'{{{namespace}}}sitemap')
-                for sitemap in sitemaps:
-                    loc = sitemap.find(f'{{{namespace}}}loc')
-                    if loc is not None:
-                        new_sitemap_url = loc.text.strip()
-                        if new_sitemap_url not in self.processed_sitemaps:
-                            self.sitemaps_to_process.append(new_sitemap_url)
-                print_status(f"Parsed sitemap index: Found {len(sitemaps)} more sitemaps", "INFO")
-
-            # It's a URL set
-            elif root.tag.endswith('urlset'):
-                urls = root.findall(f'{{{namespace}}}url')
-                self.report["total_urls"] += len(urls)
-                for url in urls:
-                    lastmod = url.find(f'{{{namespace}}}lastmod')
-                    if lastmod is not None and lastmod.text:
-                        self.report["urls_with_lastmod"] += 1
-                print_status(f"Parsed URL set: Found {len(urls)} URLs", "INFO")
-
-            else:
-                 self.report["error_log"].append(f"Unknown root tag '{root.tag}' in {sitemap_url}")
-
+            with open_sitemap(self.fetch, sitemap_url) as (response, body):
+                summary["fetched"] = True
+                parser = SitemapParser(body)
+                for entries, (kind, loc, lastmod) in enumerate(parser, 1):
+                    if entries % DEADLINE_CHECK_ENTRIES == 0 and deadline_passed():
+                        raise DeadlineExceeded(f"Out of time reading {sitemap_url}")
+                    if kind == "sitemap":
+                        if loc:
+                            summary["children"].append(loc)
+                    else:
+                        summary["urls"] += 1
+                        if lastmod:
+                            summary["urls_with_lastmod"] += 1
+                            stamp = parse_lastmod(lastmod)
+                            if stamp is None:
+                                continue
+                            summary["lastmods_parsed"] += 1
+                            if len(lastmods) < SITEMAP_FRESHNESS_SAMPLE:
+                                lastmods.append(stamp)
+                            else:
+                                slot = rng.randrange(summary["lastmods_parsed"])
+                                if slot < SITEMAP_FRESHNESS_SAMPLE:
+                                    lastmods[slot] = stamp
+                summary["kind"] = parser.kind
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+            summary["errors"].append(f"Failed to fetch {sitemap_url}: {e}")
         except ET.ParseError as e:
-            self.report["error_log"].append(f"XML Parse Error in {sitemap_url}: {e}")
+            summary["errors"].append(f"XML Parse Error in {sitemap_url}: {e}")
+        except ValueError as e:
+            summary["errors"].append(f"{e} in {sitemap_url}")
+        except (OSError, EOFError) as e:
+            summary["errors"].append(f"Failed to decompress gzipped sitemap {sitemap_url}: {e}")
+        return summary
+
+    def _merge_summary(self, summary):
+        """Adds one sitemap's tallies to the report."""
+        self.report["error_log"].extend(summary["errors"])
+        if not summary["fetched"]:
+            print_status(f"Sitemap not found or inaccessible at {summary['url']}", "ERROR")
+            return
 
+        self.report["sitemap_locations"].append(summary["url"])
+        if summary["kind"] == "sitemapindex":
+            print_status(f"Parsed sitemap index: Found {len(summary['children'])} more sitemaps", "INFO")
+        elif summary["kind"] == "urlset":
+            self.report["total_urls"] += summary["urls"]
+            self.report["urls_with_lastmod"] += summary["urls_with_lastmod"]
+            self.url_set_counts.append((summary["urls"], summary["urls_with_lastmod"]))
+            if summary["lastmods"]:
+                self.freshness_samples.append((summary["lastmods"], summary["lastmods_parsed"] / len(summary["lastmods"])))
+            print_status(f"Parsed URL set: Found {summary['urls']} URLs", "INFO")
 
     def run_analysis(self):
         """Main execution logic."""
@@ -141,26 +258,65 @@ class SitemapAnalyzer:
             print_status("Falling back to default sitemap.xml location", "INFO")
             self.sitemaps_to_process.append(urljoin(self.base_url, 'sitemap.xml'))
 
-        # 2. Process all found sitemaps (including those discovered recursively)
+        # 2. Process all found sitemaps (including those discovered recursively),
+        # streaming up to SITEMAP_CONCURRENCY of them at a time. On large sites
+        # sitemap files are read in random order until the sample is precise enough.
         print_subheader("Processing Sitemaps")
-        while self.sitemaps_to_process:
-            sitemap_url = self.sitemaps_to_process.pop(0)
-            if sitemap_url in self.processed_sitemaps:
-                continue
-
-            self.processed_sitemaps.add(sitemap_url)
-            print(f"\n-> Fetching: {sitemap_url}")
-            response = self._fetch_url(sitemap_url)
-
-            if response:
-                self.report["sitemap_locations"].append(sitemap_url)
-                xml_content = self._get_sitemap_content(response)
-                if xml_content:
-                    self._parse_sitemap(xml_content, response.url)
-                else:
-                    print_status("Failed to get sitemap content", "ERROR")
-            else:
-                print_status(f"Sitemap not found or inaccessible at {sitemap_url}", "ERROR")
+        pending = list(dict.fromkeys(self.sitemaps_to_process))
+        queued = set(pending)
+        top_level = set(pending)
+        sampling = SITEMAP_SAMPLING == "always"
+        rng = random.Random(self.base_url)
+        skipped = 0
+        running = set()
+        with ThreadPoolExecutor(max_workers=SITEMAP_CONCURRENCY) as executor:
+            while pending or running:
+                if not sampling and SITEMAP_SAMPLING == "auto" and len(queued) > SITEMAP_SAMPLE_THRESHOLD:
+                    sampling = True
+                    print_status(f"More than {SITEMAP_SAMPLE_THRESHOLD} sitemap files, sampling them", "INFO")
+
+                while pending and len(running) < SITEMAP_CONCURRENCY:
+                    if deadline_passed():
+                        # Out of time: the scan has stopped waiting for this report
+                        skipped += len(pending)
+                        pending.clear()
+                        break
+                    if len(self.processed_sitemaps) >= SITEMAP_MAX_FILES:
+                        skipped += len(pending)
+                        pending.clear()
+                        break
+                    sitemap_url = pending.pop(rng.randrange(len(pending)) if sampling else 0)
+                    self.processed_sitemaps.add(sitemap_url)
+                    print(f"\n-> Fetching: {sitemap_url}")
+                    # The reader runs in this context, so it shares the analyzer's deadline
+                    running.add(executor.submit(contextvars.copy_context().run, self._scan_sitemap, sitemap_url))
+
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    summary = future.result()
+                    self._merge_summary(summary)
+                    if summary["url"] not in top_level and summary["kind"] in self.child_kinds:
+                        self.child_kinds[summary["kind"]] += 1
+                    for child in summary["children"]:
+                        if child not in queued:
+                            queued.add(child)
+                            pending.append(child)
+
+                if sampling and pending and self._sample_is_precise(len(pending) + len(running) + skipped):
+                    print_status(f"Sample precise enough after {len(self.url_set_counts)} URL sets", "INFO")
+                    break
+
+            # Files already being read still count towards the sample
+            for future in running:
+                self._merge_summary(future.result())
+
+        if sampling:
+            self._apply_sample_estimate(unread=len(pending) + skipped)
+        elif skipped:
+            self.report["error_log"].append(
+                f"Stopped after {SITEMAP_MAX_FILES} sitemap files; {skipped} more were not read."
+            )
+        self.report["freshness"] = freshness_distribution(self.freshness_samples)
 
         # 3. Generate Score and Recommendations
         self._generate_final_report()
@@ -168,6 +324,47 @@ class SitemapAnalyzer:
         # 4. Print Report
         self._print_final_report()
 
+    def _unread_url_sets(self, unread):
+        """
+        How many of `unread` sitemap files are expected to be URL sets.
+
+        Only URL sets are clusters of the sample; an unread file's kind is
+        unknown, so they are counted at the share of URL sets among the child
+        sitemaps read so far (all of them while none were read, as the
+        sitemaps protocol doesn't allow nested indexes).
+        """
+        children_read = sum(self.child_kinds.values())
+        if not children_read:
+            return unread
+        return unread * self.child_kinds["urlset"] / children_read
+
+    def _sample_is_precise(self, unread):
+        """Whether the URL sets read so far pin lastmod coverage down to SITEMAP_SAMPLE_PRECISION."""
+        if len(self.url_set_counts) < SITEMAP_SAMPLE_MIN_FILES:
+            return False
+        urls, with_lastmod = zip(*self.url_set_counts)
+        coverage = estimate_coverage(urls, with_lastmod, len(self.url_set_counts) + self._unread_url_sets(unread))
+        return coverage is not None and coverage["half_width"] <= SITEMAP_SAMPLE_PRECISION
+
+    def _apply_sample_estimate(self, unread):
+        """Replaces the counted totals with estimates for every sitemap file, read or not."""
+        self.report["sampled"] = True
+        self.report["sitemaps_read"] = len(self.url_set_counts)
+        self.report["urls_read"] = self.report["total_urls"]
+        self.report["sitemaps_unread"] = unread
+        if not self.url_set_counts:
+            return
+        population = len(self.url_set_counts) + self._unread_url_sets(unread)
+        urls, with_lastmod = zip(*self.url_set_counts)
+        coverage = estimate_coverage(urls, with_lastmod, population)
+        # URL sets, read or not, the estimates extrapolate to
+        self.report["sitemaps_estimated"] = round(population)
+        self.report["lastmod_coverage"] = coverage
+        if coverage is None:
+            return
+        self.report["total_urls"] = round(sum(urls) * population / len(urls))
+        self.report["urls_with_lastmod"] = round(coverage["estimate"] * self.report["total_urls"])
+
     def _generate_final_report(self):
         """Calculate final score and populate recommendations."""
         # Critical Failures (BLOCKER)
@@ -193,7 +390,10 @@ class SitemapAnalyzer:
         # Base score for having a valid sitemap
         score = 50
 
-        lastmod_percentage = self.report["urls_with_lastmod"] / self.report["total_urls"]
+        if self.report["lastmod_coverage"]:
+            lastmod_percentage = self.report["lastmod_coverage"]["estimate"]
+        else:
+            lastmod_percentage = self.report["urls_with_lastmod"] / self.report["total_urls"]
         score += 50 * lastmod_percentage # Up to 50 points for lastmod coverage
 
         self.report["score"] = int(score)
@@ -221,10 +421,21 @@ class SitemapAnalyzer:
 
         print_subheader("Summary")
         print(f"Discovered and processed {len(self.report['sitemap_locations'])} sitemap file(s).")
-        print(f"Found a total of {self.report['total_urls']} URLs.")
-        if self.report['total_urls'] > 0:
-            lastmod_percent = (self.report['urls_with_lastmod'] / self.report['total_urls']) * 100
-            print(f"{self.report['urls_with_lastmod']} URLs have a <lastmod> timestamp ({lastmod_percent:.2f}% coverage).")
+        coverage = self.report["lastmod_coverage"]
+        if self.report["sampled"] and coverage:
+            print(f"Sampled {self.report['sitemaps_read']} of ~{self.report['sitemaps_estimated']} URL sets ({self.report['urls_read']} URLs read).")
+            print(f"Estimated a total of {self.report['total_urls']} URLs.")
+            print(f"Estimated <lastmod> coverage: {coverage['estimate'] * 100:.2f}% "
+                  f"({coverage['confidence'] * 100:.0f}% CI {coverage['low'] * 100:.2f}-{coverage['high'] * 100:.2f}%).")
+        else:
+            print(f"Found a total of {self.report['total_urls']} URLs.")
+            if self.report['total_urls'] > 0:
+                lastmod_percent = (self.report['urls_with_lastmod'] / self.report['total_urls']) * 100
+                print(f"{self.report['urls_with_lastmod']} URLs have a <lastmod> timestamp ({lastmod_percent:.2f}% coverage).")
+        freshness = self.report["freshness"]
+        if freshness:
+            buckets = ", ".join(f"{label}: {share * 100:.1f}%" for label, share in freshness["age_buckets"].items())
+            print(f"<lastmod> age: median {freshness['median_age_days']} days, 90th percentile {freshness['p90_age_days']} days ({buckets}).")
 
         if self.report["recommendations"]:
             print_subheader("Recommendations (Based on ARI v10.0)")
@@ -1,10 +1,11 @@
 # Pillar 3, Sub-pillar 8
 # See Bridge.ipynb cell 28 for logic
 # ...existing code...
-import requests
-import json
 import re
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from .openapi_index import get_openapi_index
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -32,39 +33,30 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("openapi_index")
 class ApiControlsAnalyzer:
     """
     Analyzes an OpenAPI spec for pagination, filtering, and sorting controls.
     Based on ARI v10.0 Pillar 3, Sub-pillar 8.
     """
-    CONVENTIONAL_PATHS = ["/.well-known/openapi.json", "/openapi.json", "/api/docs.json", "/api.json"]
     PAGINATION_KEYS = {'cursor', 'after', 'next_token', 'limit', 'page_size', 'offset', 'page'}
     SORTING_KEYS = {'sort', 'sort_by', 'order', 'order_by'}
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         parsed_url = urlparse(target_url)
         self.base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         self.report = {"findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"}
         self.openapi_spec = None
-
-    def _get_json(self, url):
-        try:
-            res = requests.get(url, timeout=7)
-            res.raise_for_status()
-            return res.json()
-        except (requests.exceptions.RequestException, json.JSONDecodeError):
-            return None
+        self.openapi_index = None
+        self.fetch = fetch or FetchContext()
 
     def _find_openapi_spec(self):
-        """Finds the OpenAPI spec using standard discovery methods."""
-        for path in self.CONVENTIONAL_PATHS:
-            spec_data = self._get_json(urljoin(self.base_url, path))
-            if spec_data:
-                self.openapi_spec = spec_data
-                return True
-        return False
+        """Reads the spec from the scan's shared OpenAPI index (discovered once per scan)."""
+        self.openapi_index = get_openapi_index(self.base_url, self.fetch)
+        self.openapi_spec = self.openapi_index.spec
+        return self.openapi_index.found
 
     def run_analysis(self):
         print_header("ARI Sub-Pillar 3.8: Pagination, Filtering & Sorting Controls")
@@ -79,18 +71,16 @@ class ApiControlsAnalyzer:
 
     def _analyze_controls(self):
         """Analyzes GET operations on collections for control parameters."""
-        paths = self.openapi_spec.get("paths", {})
         collection_endpoints = 0
         pagination_supported = 0
         filtering_supported = 0
         sorting_supported = 0
 
-        for path, methods in paths.items():
+        for op in self.openapi_index.operations:
             # Heuristic: A collection endpoint doesn't end with a path parameter like /{id}
-            if 'get' in methods and not path.endswith('}'):
+            if op["method"] == 'get' and not op["path"].endswith('}'):
                 collection_endpoints += 1
-                op_details = methods['get']
-                params = op_details.get("parameters", [])
+                params = op["parameters"]
                 param_names = {p.get("name") for p in params if p.get("in") == "query"}
 
                 # Check for pagination
@@ -2,8 +2,10 @@
 # See Bridge.ipynb cell 21 for logic
 # ...existing code...
 import requests
-import json
 from urllib.parse import urlparse, urljoin
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from .openapi_index import get_openapi_index
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -31,25 +33,26 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("openapi_index")
 class ApiDiscoverabilityAnalyzer:
     """
     Checks for API discoverability and specification quality.
     Based on ARI v10.0 Pillar 3, Sub-pillar 1.
     """
-    CONVENTIONAL_PATHS = ["/.well-known/openapi.json", "/openapi.json", "/api/docs.json", "/api.json"]
     INTROSPECTION_QUERY = """ query IntrospectionQuery { __schema { queryType { name } mutationType { name } subscriptionType { name } types { ...FullType } directives { name description locations args { ...InputValue } } } } fragment FullType on __Type { kind name description fields(includeDeprecated: true) { name description args { ...InputValue } type { ...TypeRef } isDeprecated deprecationReason } inputFields { ...InputValue } interfaces { ...TypeRef } enumValues(includeDeprecated: true) { name description isDeprecated deprecationReason } possibleTypes { ...TypeRef } } fragment InputValue on __InputValue { name description type { ...TypeRef } defaultValue } fragment TypeRef on __Type { kind name ofType { kind name ofType { kind name ofType { kind name ofType { kind name ofType { kind name ofType { kind name ofType { kind name } } } } } } } } """
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         parsed_url = urlparse(target_url)
         self.base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         self.report = {"findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"}
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'ARI-ApiDiscoverability-Analyzer/1.0'})
+        self.fetch = fetch or FetchContext()
+        self.openapi_index = None
 
     def run_analysis(self):
         print_header("ARI Sub-Pillar 3.1: Endpoint Discoverability & Specification")
+        self.openapi_index = get_openapi_index(self.base_url, self.fetch)
         # Start with the highest priority discovery methods first
         if not self._check_agents_json():
             if not self._check_common_locations():
@@ -59,20 +62,10 @@ class ApiDiscoverabilityAnalyzer:
         self._generate_final_report()
         self._print_final_report()
 
-    def _get_json(self, url):
-        try:
-            res = self.session.get(url, timeout=7)
-            res.raise_for_status()
-            return res.json()
-        except (requests.exceptions.RequestException, json.JSONDecodeError):
-            return None
-
     def _check_agents_json(self):
         print_subheader("Path 1: Checking agents.json (Ideal Method)")
-        agents_url = urljoin(self.base_url, "/.well-known/agents.json")
-        agents_data = self._get_json(agents_url)
-        if agents_data and agents_data.get("api_spec_url"):
-            spec_url = urljoin(self.base_url, agents_data["api_spec_url"])
+        spec_url = self.openapi_index.agents_spec_url
+        if spec_url:
             print_status(f"Found api_spec_url in agents.json: {spec_url}", "PASS")
             self._validate_openapi_spec(spec_url, "agents.json")
             return True
@@ -81,21 +74,19 @@ class ApiDiscoverabilityAnalyzer:
 
     def _check_common_locations(self):
         print_subheader("Path 2: Checking Conventional OpenAPI Locations")
-        for path in self.CONVENTIONAL_PATHS:
-            spec_url = urljoin(self.base_url, path)
-            print_status(f"Checking for spec at {spec_url}", "IN PROGRESS")
-            spec_data = self._get_json(spec_url)
-            if spec_data:
-                print_status(f"Found potential spec at {spec_url}", "PASS")
-                self._validate_openapi_spec(spec_url, "conventional_path")
-                return True
+        # The conventional paths were already probed concurrently by the shared index
+        if self.openapi_index.source == "conventional_path":
+            spec_url = self.openapi_index.url
+            print_status(f"Found potential spec at {spec_url}", "PASS")
+            self._validate_openapi_spec(spec_url, "conventional_path")
+            return True
         return False
 
     def _check_graphql_introspection(self):
         print_subheader("Path 3: Checking for GraphQL Introspection")
         graphql_url = urljoin(self.base_url, "/graphql")
         try:
-            res = self.session.post(graphql_url, json={'query': self.INTROSPECTION_QUERY}, timeout=7)
+            res = self.fetch.post(graphql_url, json={'query': self.INTROSPECTION_QUERY}, timeout=7)
             if res.status_code == 200 and "data" in res.json() and "errors" not in res.json():
                 self.report["findings"]["graphql_introspection"] = True
                 print_status("GraphQL endpoint with introspection is enabled", "PASS")
@@ -108,7 +99,7 @@ class ApiDiscoverabilityAnalyzer:
             print_status("GraphQL introspection is not enabled or not found", "INFO")
 
     def _validate_openapi_spec(self, url, method):
-        spec = self._get_json(url)
+        spec = self.openapi_index.spec if self.openapi_index.source == method else None
         if not spec:
             self.report["findings"]["openapi_spec"] = {"method": method, "valid": False, "error": "FetchError"}
             return
@@ -122,14 +113,9 @@ class ApiDiscoverabilityAnalyzer:
             findings["version"] = "Unknown"
 
         # Calculate description coverage
-        paths = spec.get("paths", {})
-        total_endpoints = 0
-        endpoints_with_desc = 0
-        for path_methods in paths.values():
-            for method_details in path_methods.values():
-                total_endpoints += 1
-                if method_details.get("description"):
-                    endpoints_with_desc += 1
+        operations = self.openapi_index.operations
+        total_endpoints = len(operations)
+        endpoints_with_desc = sum(1 for op in operations if op["description"])
 
         findings["description_coverage"] = (endpoints_with_desc / total_endpoints) * 100 if total_endpoints > 0 else 0
         self.report["findings"]["openapi_spec"] = findings
@@ -1,9 +1,10 @@
 # Pillar 3, Sub-pillar 3
 # See Bridge.ipynb cell 23 for logic
 # ...existing code...
-import requests
-import json
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from .openapi_index import get_openapi_index
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -31,47 +32,33 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("openapi_index")
 class ApiDocumentationAnalyzer:
     """
     Analyzes the completeness of in-spec documentation within an OpenAPI file.
     Based on ARI v10.0 Pillar 3, Sub-pillar 3.
     """
-    CONVENTIONAL_PATHS = ["/.well-known/openapi.json", "/openapi.json", "/api/docs.json", "/api.json"]
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         parsed_url = urlparse(target_url)
         self.base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         self.report = {"findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"}
         self.openapi_spec = None
-
-    def _get_json(self, url):
-        try:
-            res = requests.get(url, timeout=7)
-            res.raise_for_status()
-            return res.json()
-        except (requests.exceptions.RequestException, json.JSONDecodeError):
-            return None
+        self.openapi_index = None
+        self.fetch = fetch or FetchContext()
 
     def _find_openapi_spec(self):
-        """Finds the OpenAPI spec using standard discovery methods."""
-        # This is a simplified version of the logic from sub-pillar 3.1
-        agents_url = urljoin(self.base_url, "/.well-known/agents.json")
-        agents_data = self._get_json(agents_url)
-        if agents_data and agents_data.get("api_spec_url"):
-            self.openapi_spec = self._get_json(urljoin(self.base_url, agents_data["api_spec_url"]))
-            return
-        for path in self.CONVENTIONAL_PATHS:
-            spec_data = self._get_json(urljoin(self.base_url, path))
-            if spec_data:
-                self.openapi_spec = spec_data
-                return
+        """Reads the spec from the scan's shared OpenAPI index (discovered once per scan)."""
+        self.openapi_index = get_openapi_index(self.base_url, self.fetch)
+        self.openapi_spec = self.openapi_index.spec
+        return self.openapi_index.found
 
     def _analyze_documentation_coverage(self):
         """Calculates the percentage of endpoints that have good documentation."""
-        paths = self.openapi_spec.get("paths", {})
-        if not paths:
+        operations = self.openapi_index.operations
+        if not operations:
             return
 
         total_endpoints = 0
@@ -80,26 +67,25 @@ class ApiDocumentationAnalyzer:
         responses_covered = 0
         examples_covered = 0
 
-        for path, methods in paths.items():
-            for method, details in methods.items():
-                total_endpoints += 1
-
-                # Operation description
-                if details.get("description") and len(details.get("description", "")) > 10:
-                    desc_covered += 1
-
-                # Parameter description
-                if all(p.get("description") for p in details.get("parameters", [])):
-                    params_covered +=1
-
-                # Response description and examples
-                responses = details.get("responses", {})
-                if responses and all(r.get("description") for r in responses.values()):
-                    responses_covered += 1
-                # Check for example in success response
-                success_response = responses.get("200", {}) or responses.get("201", {})
-                if success_response.get("content", {}).get("application/json", {}).get("example"):
-                    examples_covered += 1
+        for op in operations:
+            total_endpoints += 1
+
+            # Operation description
+            if len(op["description"]) > 10:
+                desc_covered += 1
+
+            # Parameter description
+            if all(p.get("description") for p in op["parameters"]):
+                params_covered +=1
+
+            # Response description and examples
+            responses = op["responses"]
+            if responses and all(isinstance(r, dict) and r.get("description") for r in responses.values()):
+                responses_covered += 1
+            # Check for example in success response
+            success_response = responses.get("200", {}) or responses.get("201", {})
+            if success_response.get("content", {}).get("application/json", {}).get("example"):
+                examples_covered += 1
 
         if total_endpoints > 0:
             self.report["findings"] = {
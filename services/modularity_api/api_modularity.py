@@ -1,10 +1,11 @@
 # Pillar 3, Sub-pillar 6
 # See Bridge.ipynb cell 26 for logic
 # ...existing code...
-import requests
-import json
 import numpy as np
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from .openapi_index import get_openapi_index
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -32,37 +33,28 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("openapi_index")
 class ApiModularityAnalyzer:
     """
     Analyzes the modularity and granularity of an API via its OpenAPI specification.
     Based on ARI v10.0 Pillar 3, Sub-pillar 6.
     """
-    CONVENTIONAL_PATHS = ["/.well-known/openapi.json", "/openapi.json", "/api/docs.json", "/api.json"]
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         parsed_url = urlparse(target_url)
         self.base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         self.report = {"findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"}
         self.openapi_spec = None
-
-    def _get_json(self, url):
-        try:
-            res = requests.get(url, timeout=7)
-            res.raise_for_status()
-            return res.json()
-        except (requests.exceptions.RequestException, json.JSONDecodeError):
-            return None
+        self.openapi_index = None
+        self.fetch = fetch or FetchContext()
 
     def _find_openapi_spec(self):
-        """Finds the OpenAPI spec using standard discovery methods."""
-        for path in self.CONVENTIONAL_PATHS:
-            spec_data = self._get_json(urljoin(self.base_url, path))
-            if spec_data:
-                self.openapi_spec = spec_data
-                return True
-        return False
+        """Reads the spec from the scan's shared OpenAPI index (discovered once per scan)."""
+        self.openapi_index = get_openapi_index(self.base_url, self.fetch)
+        self.openapi_spec = self.openapi_index.spec
+        return self.openapi_index.found
 
     def run_analysis(self):
         print_header("ARI Sub-Pillar 3.6: API Functional Modularity & Granularity")
@@ -77,8 +69,8 @@ class ApiModularityAnalyzer:
 
     def _analyze_modularity(self):
         """Analyzes tags and path structure to assess modularity."""
-        paths = self.openapi_spec.get("paths", {})
-        if not paths: return
+        operations = self.openapi_index.operations
+        if not operations: return
 
         # Tag Analysis
         tag_counts = {}
@@ -86,17 +78,16 @@ class ApiModularityAnalyzer:
         total_endpoints = 0
         top_level_resources = set()
 
-        for path, methods in paths.items():
+        for op in operations:
             # Resource Analysis
-            resource = path.strip('/').split('/')[0]
+            resource = op["path"].strip('/').split('/')[0]
             if resource: top_level_resources.add(resource)
 
-            for method, details in methods.items():
-                total_endpoints += 1
-                tags = details.get("tags", ["untagged"])
-                tagged_endpoints += 1 if "untagged" not in tags else 0
-                for tag in tags:
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
+            total_endpoints += 1
+            tags = op["tags"] or ["untagged"]
+            tagged_endpoints += 1 if "untagged" not in tags else 0
+            for tag in tags:
+                tag_counts[tag] = tag_counts.get(tag, 0) + 1
 
         self.report["findings"]["total_endpoints"] = total_endpoints
         self.report["findings"]["tag_coverage"] = (tagged_endpoints / total_endpoints) * 100 if total_endpoints > 0 else 0
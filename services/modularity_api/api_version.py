@@ -1,10 +1,11 @@
 # Pillar 3, Sub-pillar 7
 # See Bridge.ipynb cell 27 for logic
 # ...existing code...
-import requests
-import json
 import re
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from .openapi_index import get_openapi_index
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -32,39 +33,30 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("openapi_index")
 class ApiVersioningAnalyzer:
     """
     Analyzes the versioning and deprecation strategy of an API via its OpenAPI spec.
     Based on ARI v10.0 Pillar 3, Sub-pillar 7.
     """
-    CONVENTIONAL_PATHS = ["/.well-known/openapi.json", "/openapi.json", "/api/docs.json", "/api.json"]
     SEMVER_REGEX = re.compile(r'^\d+\.\d+\.\d+$')
     VERSION_IN_PATH_REGEX = re.compile(r'/v\d+/')
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         parsed_url = urlparse(target_url)
         self.base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         self.report = {"findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"}
         self.openapi_spec = None
-
-    def _get_json(self, url):
-        try:
-            res = requests.get(url, timeout=7)
-            res.raise_for_status()
-            return res.json()
-        except (requests.exceptions.RequestException, json.JSONDecodeError):
-            return None
+        self.openapi_index = None
+        self.fetch = fetch or FetchContext()
 
     def _find_openapi_spec(self):
-        """Finds the OpenAPI spec using standard discovery methods."""
-        for path in self.CONVENTIONAL_PATHS:
-            spec_data = self._get_json(urljoin(self.base_url, path))
-            if spec_data:
-                self.openapi_spec = spec_data
-                return True
-        return False
+        """Reads the spec from the scan's shared OpenAPI index (discovered once per scan)."""
+        self.openapi_index = get_openapi_index(self.base_url, self.fetch)
+        self.openapi_spec = self.openapi_index.spec
+        return self.openapi_index.found
 
     def run_analysis(self):
         print_header("ARI Sub-Pillar 3.7: API Versioning & Deprecation Strategy")
@@ -92,14 +84,9 @@ class ApiVersioningAnalyzer:
 
     def _analyze_deprecation(self):
         """Analyzes all operations for the 'deprecated: true' flag."""
-        paths = self.openapi_spec.get("paths", {})
-        total_endpoints = 0
-        deprecated_endpoints = 0
-        for path, methods in paths.items():
-            for method, details in methods.items():
-                total_endpoints += 1
-                if details.get("deprecated") is True:
-                    deprecated_endpoints += 1
+        operations = self.openapi_index.operations
+        total_endpoints = len(operations)
+        deprecated_endpoints = sum(1 for op in operations if op["deprecated"])
 
         self.report["findings"]["total_endpoints"] = total_endpoints
         self.report["findings"]["deprecated_endpoints_count"] = deprecated_endpoints
@@ -1,6 +1,7 @@
-import requests
-import json
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from .openapi_index import get_openapi_index
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -28,52 +29,34 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("openapi_index")
 class AuthAnalyzer:
     """
     Analyzes an OpenAPI specification for agent-friendly authentication schemes.
     Based on ARI v10.0 Pillar 3, Sub-pillar 2.
     """
-    CONVENTIONAL_PATHS = ["/.well-known/openapi.json", "/openapi.json", "/api/docs.json", "/api.json"]
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         parsed_url = urlparse(target_url)
         self.base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         self.report = {"findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"}
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'ARI-Auth-Analyzer/1.0'})
+        self.fetch = fetch or FetchContext()
         self.openapi_spec = None
-
-    def _get_json(self, url):
-        try:
-            res = self.session.get(url, timeout=7)
-            res.raise_for_status()
-            return res.json()
-        except (requests.exceptions.RequestException, json.JSONDecodeError):
-            return None
+        self.openapi_index = None
 
     def _find_openapi_spec(self):
-        """Leverages logic from 3.1 to find the spec. Simplified for this sub-pillar."""
+        """Reads the spec from the scan's shared OpenAPI index (discovered once per scan)."""
         print_subheader("Step 1: Discovering OpenAPI Specification")
-        # Path 1: agents.json
-        agents_url = urljoin(self.base_url, "/.well-known/agents.json")
-        agents_data = self._get_json(agents_url)
-        if agents_data and agents_data.get("api_spec_url"):
-            spec_url = urljoin(self.base_url, agents_data["api_spec_url"])
-            print_status(f"Found spec via agents.json: {spec_url}", "PASS")
-            self.openapi_spec = self._get_json(spec_url)
-            return
-
-        # Path 2: Conventional locations
-        for path in self.CONVENTIONAL_PATHS:
-            spec_url = urljoin(self.base_url, path)
-            spec_data = self._get_json(spec_url)
-            if spec_data:
-                print_status(f"Found spec via conventional path: {spec_url}", "PASS")
-                self.openapi_spec = spec_data
-                return
-        print_status("Could not discover an OpenAPI specification", "FAIL")
+        self.openapi_index = get_openapi_index(self.base_url, self.fetch)
+        self.openapi_spec = self.openapi_index.spec
+        if self.openapi_index.source == "agents.json":
+            print_status(f"Found spec via agents.json: {self.openapi_index.url}", "PASS")
+        elif self.openapi_index.found:
+            print_status(f"Found spec via conventional path: {self.openapi_index.url}", "PASS")
+        else:
+            print_status("Could not discover an OpenAPI specification", "FAIL")
 
     def _analyze_security_schemes(self):
         """Parses the components.securitySchemes object for auth types."""
@@ -1,10 +1,11 @@
 # Pillar 3, Sub-pillar 10
 # See Bridge.ipynb cell 30 for logic
 # ...existing code...
-import requests
-import json
 import re
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from .openapi_index import get_openapi_index
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -32,12 +33,12 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("openapi_index")
 class BusinessProcessApiAnalyzer:
     """
     Analyzes an OpenAPI spec for high-level, business process-oriented endpoints.
     Based on ARI v10.0 Pillar 3, Sub-pillar 10.
     """
-    CONVENTIONAL_PATHS = ["/.well-known/openapi.json", "/openapi.json", "/api/docs.json", "/api.json"]
     # Keywords indicating a business process or action
     ACTION_VERBS = [
         'approve', 'archive', 'cancel', 'capture', 'charge', 'complete', 'confirm',
@@ -47,30 +48,21 @@ class BusinessProcessApiAnalyzer:
         'schedule', 'send', 'start', 'submit', 'subscribe', 'suspend', 'transfer', 'verify'
     ]
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         parsed_url = urlparse(target_url)
         self.base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         self.report = {"findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"}
         self.openapi_spec = None
-
-    def _get_json(self, url):
-        try:
-            res = requests.get(url, timeout=7)
-            res.raise_for_status()
-            return res.json()
-        except (requests.exceptions.RequestException, json.JSONDecodeError):
-            return None
+        self.openapi_index = None
+        self.fetch = fetch or FetchContext()
 
     def _find_openapi_spec(self):
-        """Finds the OpenAPI spec using standard discovery methods."""
-        for path in self.CONVENTIONAL_PATHS:
-            spec_data = self._get_json(urljoin(self.base_url, path))
-            if spec_data:
-                self.openapi_spec = spec_data
-                return True
-        return False
+        """Reads the spec from the scan's shared OpenAPI index (discovered once per scan)."""
+        self.openapi_index = get_openapi_index(self.base_url, self.fetch)
+        self.openapi_spec = self.openapi_index.spec
+        return self.openapi_index.found
 
     def run_analysis(self):
         print_header("ARI Sub-Pillar 3.10: Business Process as an API")
@@ -85,35 +77,33 @@ class BusinessProcessApiAnalyzer:
 
     def _analyze_endpoints(self):
         """Analyzes all endpoints for signs of being a business process."""
-        paths = self.openapi_spec.get("paths", {})
         total_endpoints = 0
         process_endpoints = 0
         examples = []
 
-        for path, methods in paths.items():
-            for method, details in methods.items():
-                total_endpoints += 1
-                is_process = False
+        for op in self.openapi_index.operations:
+            total_endpoints += 1
+            is_process = False
 
-                # Heuristic 1: Action verb in the path
-                path_last_segment = path.strip('/').split('/')[-1]
-                if path_last_segment in self.ACTION_VERBS:
-                    is_process = True
+            # Heuristic 1: Action verb in the path
+            path_last_segment = op["path"].strip('/').split('/')[-1]
+            if path_last_segment in self.ACTION_VERBS:
+                is_process = True
 
-                # Heuristic 2: Action verb in the summary or description
-                summary = details.get("summary", "").lower()
-                description = details.get("description", "").lower()
-                operation_id = details.get("operationId", "").lower()
+            # Heuristic 2: Action verb in the summary or description
+            summary = op["summary"].lower()
+            description = op["description"].lower()
+            operation_id = op["operation_id"].lower()
 
-                for verb in self.ACTION_VERBS:
-                    if verb in summary or verb in description or verb in operation_id:
-                        is_process = True
-                        break
+            for verb in self.ACTION_VERBS:
+                if verb in summary or verb in description or verb in operation_id:
+                    is_process = True
+                    break
 
-                if is_process:
-                    process_endpoints += 1
-                    if len(examples) < 3:
-                        examples.append(f"{method.upper()} {path}")
+            if is_process:
+                process_endpoints += 1
+                if len(examples) < 3:
+                    examples.append(f"{op['method'].upper()} {op['path']}")
 
         self.report["findings"] = {
             "total_endpoints": total_endpoints,
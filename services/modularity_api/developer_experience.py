@@ -2,8 +2,10 @@
 # See Bridge.ipynb cell 25 for logic
 # ...existing code...
 import requests
-import json
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from .openapi_index import get_openapi_index
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -31,6 +33,7 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("openapi_index")
 class DeveloperExperienceAnalyzer:
     """
     Analyzes a website's developer experience and onboarding infrastructure.
@@ -38,7 +41,7 @@ class DeveloperExperienceAnalyzer:
     """
     DEV_SUBDOMAINS = ["developers", "developer", "docs", "api", "dev"]
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         parsed_url = urlparse(target_url)
@@ -46,22 +49,15 @@ class DeveloperExperienceAnalyzer:
         self.base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         self.report = {"findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"}
         self.openapi_spec = None
-
-    def _get_json(self, url):
-        try:
-            res = requests.get(url, timeout=7)
-            res.raise_for_status()
-            return res.json()
-        except (requests.exceptions.RequestException, json.JSONDecodeError):
-            return None
+        self.openapi_index = None
+        self.fetch = fetch or FetchContext()
 
     def _find_openapi_spec(self):
-        """Finds the OpenAPI spec using a simplified discovery method."""
-        spec_url = urljoin(self.base_url, "/.well-known/openapi.json")
-        self.openapi_spec = self._get_json(spec_url)
-        if not self.openapi_spec:
-             self.openapi_spec = self._get_json(urljoin(self.base_url, "/openapi.json"))
-        self.report["findings"]["openapi_spec_found"] = self.openapi_spec is not None
+        """Reads the spec from the scan's shared OpenAPI index (discovered once per scan)."""
+        self.openapi_index = get_openapi_index(self.base_url, self.fetch)
+        self.openapi_spec = self.openapi_index.spec
+        self.report["findings"]["openapi_spec_found"] = self.openapi_index.found
+        return self.openapi_index.found
 
     def run_analysis(self):
         print_header("ARI Sub-Pillar 3.5: Developer Experience & Onboarding")
@@ -78,7 +74,7 @@ class DeveloperExperienceAnalyzer:
         for sub in self.DEV_SUBDOMAINS:
             portal_url = f"https://{sub}.{self.domain}"
             try:
-                res = requests.head(portal_url, timeout=5, allow_redirects=True)
+                res = self.fetch.head(portal_url, timeout=5, allow_redirects=True)
                 if res.status_code == 200:
                     self.report["findings"]["dev_portal_found"] = True
                     self.report["findings"]["dev_portal_url"] = portal_url
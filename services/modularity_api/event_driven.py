@@ -4,6 +4,9 @@
 import requests
 import json
 from urllib.parse import urlparse, urljoin
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from .openapi_index import get_openapi_index
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -31,38 +34,37 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("openapi_index")
 class EventDrivenArchitectureAnalyzer:
     """
     Analyzes API specifications for support of event-driven architectures (Webhooks, AsyncAPI).
     Based on ARI v10.0 Pillar 3, Sub-pillar 4.
     """
-    CONVENTIONAL_PATHS = ["/.well-known/openapi.json", "/openapi.json"]
     ASYNCAPI_PATH = "/.well-known/asyncapi.json"
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         parsed_url = urlparse(target_url)
         self.base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         self.report = {"findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"}
         self.openapi_spec = None
+        self.openapi_index = None
+        self.fetch = fetch or FetchContext()
 
     def _get_json(self, url):
         try:
-            res = requests.get(url, timeout=7)
+            res = self.fetch.get(url, timeout=7)
             res.raise_for_status()
             return res.json()
         except (requests.exceptions.RequestException, json.JSONDecodeError):
             return None
 
     def _find_openapi_spec(self):
-        """Finds the OpenAPI spec using standard discovery methods."""
-        for path in self.CONVENTIONAL_PATHS:
-            spec_data = self._get_json(urljoin(self.base_url, path))
-            if spec_data:
-                self.openapi_spec = spec_data
-                return True
-        return False
+        """Reads the spec from the scan's shared OpenAPI index (discovered once per scan)."""
+        self.openapi_index = get_openapi_index(self.base_url, self.fetch)
+        self.openapi_spec = self.openapi_index.spec
+        return self.openapi_index.found
 
     def run_analysis(self):
         print_header("ARI Sub-Pillar 3.4: Event-Driven Architecture")
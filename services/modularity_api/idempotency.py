@@ -1,10 +1,11 @@
 # Pillar 3, Sub-pillar 9
 # See Bridge.ipynb cell 29 for logic
 # ...existing code...
-import requests
-import json
 import re
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
+from .openapi_index import get_openapi_index
 
 # Helper to print colored and formatted text for better readability
 def print_header(text):
@@ -32,38 +33,29 @@ def print_status(message, status):
 def print_recommendation(rec):
     print(f"  - {rec}")
 
+@consumes("openapi_index")
 class IdempotencyAnalyzer:
     """
     Analyzes an OpenAPI spec for correct HTTP method usage and idempotency patterns.
     Based on ARI v10.0 Pillar 3, Sub-pillar 9.
     """
-    CONVENTIONAL_PATHS = ["/.well-known/openapi.json", "/openapi.json", "/api/docs.json", "/api.json"]
     IDEMPOTENCY_HEADERS = {'idempotency-key', 'x-request-id', 'x-idempotency-key'}
 
-    def __init__(self, target_url):
+    def __init__(self, target_url, fetch: FetchContext = None):
         if not target_url.startswith('http'):
             target_url = 'https://' + target_url
         parsed_url = urlparse(target_url)
         self.base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         self.report = {"findings": {}, "recommendations": [], "score": 0, "status": "Not Assessed"}
         self.openapi_spec = None
-
-    def _get_json(self, url):
-        try:
-            res = requests.get(url, timeout=7)
-            res.raise_for_status()
-            return res.json()
-        except (requests.exceptions.RequestException, json.JSONDecodeError):
-            return None
+        self.openapi_index = None
+        self.fetch = fetch or FetchContext()
 
     def _find_openapi_spec(self):
-        """Finds the OpenAPI spec using standard discovery methods."""
-        for path in self.CONVENTIONAL_PATHS:
-            spec_data = self._get_json(urljoin(self.base_url, path))
-            if spec_data:
-                self.openapi_spec = spec_data
-                return True
-        return False
+        """Reads the spec from the scan's shared OpenAPI index (discovered once per scan)."""
+        self.openapi_index = get_openapi_index(self.base_url, self.fetch)
+        self.openapi_spec = self.openapi_index.spec
+        return self.openapi_index.found
 
     def run_analysis(self):
         print_header("ARI Sub-Pillar 3.9: Idempotency & Safe Method Usage")
@@ -78,39 +70,36 @@ class IdempotencyAnalyzer:
 
     def _analyze_methods(self):
         """Analyzes the usage patterns of HTTP verbs across all paths."""
-        paths = self.openapi_spec.get("paths", {})
         findings = {
             "violations": [], "post_uses_idempotency_key": False,
             "total_gets": 0, "total_posts": 0, "total_puts": 0, "total_deletes": 0
         }
 
-        for path, methods in paths.items():
+        for op in self.openapi_index.operations:
+            path = op["path"]
             is_resource_path = bool(re.search(r'\{.*\}', path))
-
-            for method, details in methods.items():
-                method_upper = method.upper()
-
-                if method_upper == "GET":
-                    findings["total_gets"] += 1
-                    if "requestBody" in details:
-                        findings["violations"].append(f"Safety Violation: GET on '{path}' has a requestBody.")
-
-                elif method_upper == "POST":
-                    findings["total_posts"] += 1
-                    params = details.get("parameters", [])
-                    header_names = {p.get("name", "").lower() for p in params if p.get("in") == "header"}
-                    if self.IDEMPOTENCY_HEADERS.intersection(header_names):
-                        findings["post_uses_idempotency_key"] = True
-
-                elif method_upper == "PUT":
-                    findings["total_puts"] += 1
-                    if not is_resource_path:
-                        findings["violations"].append(f"Idempotency Warning: PUT used on collection path '{path}'.")
-
-                elif method_upper == "DELETE":
-                    findings["total_deletes"] += 1
-                    if not is_resource_path:
-                         findings["violations"].append(f"Idempotency Violation: DELETE used on collection path '{path}'.")
+            method_upper = op["method"].upper()
+
+            if method_upper == "GET":
+                findings["total_gets"] += 1
+                if op["request_body"] is not None:
+                    findings["violations"].append(f"Safety Violation: GET on '{path}' has a requestBody.")
+
+            elif method_upper == "POST":
+                findings["total_posts"] += 1
+                header_names = {p.get("name", "").lower() for p in op["parameters"] if p.get("in") == "header"}
+                if self.IDEMPOTENCY_HEADERS.intersection(header_names):
+                    findings["post_uses_idempotency_key"] = True
+
+            elif method_upper == "PUT":
+                findings["total_puts"] += 1
+                if not is_resource_path:
+                    findings["violations"].append(f"Idempotency Warning: PUT used on collection path '{path}'.")
+
+            elif method_upper == "DELETE":
+                findings["total_deletes"] += 1
+                if not is_resource_path:
+                     findings["violations"].append(f"Idempotency Violation: DELETE used on collection path '{path}'.")
 
         self.report["findings"] = findings
 
@@ -8,6 +8,10 @@ from .business_process import BusinessProcessApiAnalyzer
 from .developer_experience import DeveloperExperienceAnalyzer
 from .event_driven import EventDrivenArchitectureAnalyzer
 from .idempotency import IdempotencyAnalyzer
+from functools import partial
+from utils.analyzer_pool import run_analyzers
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
 
 __all__ = [
     'ApiControlsAnalyzer',
@@ -23,6 +27,7 @@ __all__ = [
     'ModularityApiAnalyzer'
 ]
 
+@consumes("openapi_index")
 class ModularityApiAnalyzer:
     """
     Aggregates a suite of API analyzers and computes a weighted overall report.
@@ -41,8 +46,11 @@ class ModularityApiAnalyzer:
         'idempotency': 0.05,
     }
 
-    def __init__(self, base_url, weights=None):
+    def __init__(self, base_url, weights=None, fetch=None, max_workers=None, analyzer_timeout=None):
         self.base_url = base_url
+        self.fetch = fetch or FetchContext()
+        self.max_workers = max_workers
+        self.analyzer_timeout = analyzer_timeout
         self.weights = weights or self.DEFAULT_WEIGHTS.copy()
         self.results = {}
         self.recommendations = []
@@ -64,14 +72,13 @@ class ModularityApiAnalyzer:
             'idempotency': IdempotencyAnalyzer,
         }
 
-        for key, cls in analyzer_map.items():
-            try:
-                analyzer = cls(self.base_url)
-                analyzer.run_analysis()
-                report = getattr(analyzer, 'report', {})
-            except Exception as ex:
-                report = {'score': 0, 'status': 'error', 'error': str(ex)}
-
+        reports = run_analyzers(
+            {key: partial(self._run_analyzer, cls) for key, cls in analyzer_map.items()},
+            max_workers=self.max_workers,
+            timeout=self.analyzer_timeout,
+        )
+        # Aggregate in declaration order, not completion order
+        for key, report in reports.items():
             self.results[key] = report
             for rec in report.get('recommendations', [])[:2]:
                 self.recommendations.append(f"[{key}] {rec}")
@@ -103,3 +110,8 @@ class ModularityApiAnalyzer:
             },
             'top_recommendations': self.recommendations[:5]
         }
+
+    def _run_analyzer(self, cls):
+        analyzer = cls(self.base_url, fetch=self.fetch)
+        analyzer.run_analysis()
+        return getattr(analyzer, 'report', {})
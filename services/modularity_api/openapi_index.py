@@ -0,0 +1,162 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urljoin
+
+import requests
+
+from utils.fetch_context import FetchContext
+
+AGENTS_JSON_PATH = "/.well-known/agents.json"
+CONVENTIONAL_PATHS = ["/.well-known/openapi.json", "/openapi.json", "/api/docs.json", "/api.json"]
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+
+class OpenApiIndex:
+    """
+    A discovered OpenAPI/Swagger spec plus a flattened, ref-resolved view of its operations.
+
+    Built once per scan by `get_openapi_index` and shared by every API analyzer, so the
+    spec is fetched, parsed and walked a single time regardless of how many analyzers
+    read it.
+
+    Attributes:
+        spec (dict): The raw spec, or None if none was found
+        url (str): Where the spec was fetched from
+        source (str): "agents.json" or "conventional_path"
+        agents_json (dict): The parsed agents.json manifest, if any
+        agents_spec_url (str): The api_spec_url declared in agents.json, if any
+        operations (list): One dict per operation with path, method, summary,
+            description, operation_id, tags, parameters, request_body, responses,
+            security, deprecated and the raw operation object under "details"
+    """
+
+    def __init__(self, spec=None, url=None, source=None, agents_json=None, agents_spec_url=None):
+        self.spec = spec
+        self.url = url
+        self.source = source
+        self.agents_json = agents_json
+        self.agents_spec_url = agents_spec_url
+        self.operations = self._build_operations() if spec else []
+
+    @property
+    def found(self):
+        return self.spec is not None
+
+    def _resolve(self, node, _seen=None):
+        """Follows local `$ref` pointers (e.g. #/components/parameters/Limit) one node deep."""
+        _seen = _seen or set()
+        while isinstance(node, dict) and isinstance(node.get("$ref"), str):
+            ref = node["$ref"]
+            if not ref.startswith("#/") or ref in _seen:
+                return node
+            _seen.add(ref)
+            target = self.spec
+            for part in ref[2:].split("/"):
+                part = part.replace("~1", "/").replace("~0", "~")
+                if not isinstance(target, dict) or part not in target:
+                    return node
+                target = target[part]
+            node = target
+        return node
+
+    def _build_operations(self):
+        operations = []
+        paths = self.spec.get("paths") or {}
+        if not isinstance(paths, dict):
+            return operations
+
+        global_security = self.spec.get("security")
+        for path, path_item in paths.items():
+            path_item = self._resolve(path_item)
+            if not isinstance(path_item, dict):
+                continue
+            shared_params = [self._resolve(p) for p in path_item.get("parameters", []) or []]
+
+            for method in HTTP_METHODS:
+                details = path_item.get(method)
+                if not isinstance(details, dict):
+                    continue
+
+                # Operation-level parameters override path-level ones with the same name/location
+                params = {(p.get("name"), p.get("in")): p for p in shared_params if isinstance(p, dict)}
+                for p in details.get("parameters", []) or []:
+                    p = self._resolve(p)
+                    if isinstance(p, dict):
+                        params[(p.get("name"), p.get("in"))] = p
+
+                responses = details.get("responses") or {}
+                if isinstance(responses, dict):
+                    responses = {str(code): self._resolve(r) for code, r in responses.items()}
+
+                operations.append({
+                    "path": path,
+                    "method": method,
+                    "summary": details.get("summary") or "",
+                    "description": details.get("description") or "",
+                    "operation_id": details.get("operationId") or "",
+                    "tags": details.get("tags") or [],
+                    "parameters": list(params.values()),
+                    "request_body": self._resolve(details.get("requestBody")),
+                    "responses": responses if isinstance(responses, dict) else {},
+                    "security": details.get("security", global_security),
+                    "deprecated": details.get("deprecated") is True,
+                    "details": details,
+                })
+        return operations
+
+    def operations_by_path(self):
+        """Groups operations by path, preserving spec order."""
+        grouped = {}
+        for op in self.operations:
+            grouped.setdefault(op["path"], []).append(op)
+        return grouped
+
+
+def _get_json(fetch, url):
+    try:
+        res = fetch.get(url, timeout=7)
+        res.raise_for_status()
+        data = res.json()
+        return data if isinstance(data, dict) and data else None
+    except (requests.exceptions.RequestException, json.JSONDecodeError, ValueError):
+        return None
+
+
+def discover_openapi_spec(base_url, fetch: FetchContext):
+    """
+    Runs the spec discovery chain once and builds the index.
+
+    agents.json and every conventional path are probed concurrently, but the winner is
+    picked in priority order: the spec declared by agents.json first, then
+    CONVENTIONAL_PATHS in the order listed.
+    """
+    agents_url = urljoin(base_url, AGENTS_JSON_PATH)
+    candidate_urls = [urljoin(base_url, path) for path in CONVENTIONAL_PATHS]
+
+    with ThreadPoolExecutor(max_workers=len(candidate_urls) + 1) as pool:
+        agents_future = pool.submit(_get_json, fetch, agents_url)
+        candidate_futures = [pool.submit(_get_json, fetch, url) for url in candidate_urls]
+
+        agents_json = agents_future.result()
+        agents_spec_url = None
+        if agents_json and agents_json.get("api_spec_url"):
+            agents_spec_url = urljoin(base_url, agents_json["api_spec_url"])
+            spec = _get_json(fetch, agents_spec_url)
+            if spec:
+                return OpenApiIndex(spec, agents_spec_url, "agents.json", agents_json, agents_spec_url)
+
+        for url, future in zip(candidate_urls, candidate_futures):
+            spec = future.result()
+            if spec:
+                return OpenApiIndex(spec, url, "conventional_path", agents_json, agents_spec_url)
+
+    return OpenApiIndex(agents_json=agents_json, agents_spec_url=agents_spec_url)
+
+
+def get_openapi_index(target_url, fetch: FetchContext) -> OpenApiIndex:
+    """Returns the scan-wide OpenApiIndex for the target's origin, discovering it on first use."""
+    if not target_url.startswith('http'):
+        target_url = 'https://' + target_url
+    parsed_url = urlparse(target_url)
+    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+    return fetch.memo(("openapi_index", base_url), lambda: discover_openapi_spec(base_url, fetch))
@@ -0,0 +1,343 @@
+import asyncio
+import queue
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, Tuple
+from urllib.parse import urlparse, urljoin
+
+import httpx
+import requests
+import urllib3
+
+from core.scan_artifacts import scan_artifacts
+from services.modularity_api.openapi_index import OpenApiIndex, get_openapi_index
+from utils.fetch_context import Deadline, DeadlineExceeded, FetchContext, current_deadline, deadline_passed
+from utils.host_cache import TLS_CACHE_EXPIRY_MARGIN, TLS_CACHE_MAX_AGE, host_cache
+from utils.http_fetcher import FetchResult
+from utils.page import Page, get_page
+from utils.robots_rules import RobotsRules
+from utils.sitemap_stream import SitemapParser, open_sitemap
+
+# Cap on page URLs collected from sitemaps for the shared sitemap_urls artifact
+MAX_SITEMAP_URLS = 1000
+MAX_SITEMAP_FILES = 20
+# Time budget of the TLS/HTTPS probe behind the tls_info artifact
+TLS_PROBE_TIMEOUT = 5
+
+# name -> (producer, requires, scope); scope "origin" artifacts are shared by every
+# URL on the same scheme://host, "page" artifacts are per URL
+ARTIFACTS: Dict[str, Tuple[Callable, Tuple[str, ...], str]] = {}
+# name -> (encode, decode) for artifacts read by more than one pillar; a scan's
+# pillars share these through core.scan_artifacts instead of each producing them
+SHARED: Dict[str, Tuple[Callable, Callable]] = {}
+
+
+def _as_is(value):
+    return value
+
+
+def artifact(name: str, requires: Tuple[str, ...] = (), scope: str = "origin",
+             shared: bool = False, encode: Callable = _as_is, decode: Callable = _as_is):
+    """
+    Registers the producer of a shared scan input.
+
+    `shared` artifacts are produced once per scan rather than once per pillar;
+    `encode`/`decode` convert them to and from JSON-serializable values.
+    """
+    def register(produce):
+        ARTIFACTS[name] = (produce, tuple(requires), scope)
+        if shared:
+            SHARED[name] = (encode, decode)
+        return produce
+    return register
+
+
+def consumes(*names: str):
+    """Declares which shared artifacts a check (auditor class or function) reads."""
+    unknown = set(names) - set(ARTIFACTS)
+    if unknown:
+        raise ValueError(f"Unknown scan artifact(s): {', '.join(sorted(unknown))}")
+
+    def mark(check):
+        check.CONSUMES = tuple(names)
+        return check
+    return mark
+
+
+def consumed_by(*checks) -> Tuple[str, ...]:
+    """Union of the artifacts declared by `checks`, in first-seen order."""
+    names = []
+    for check in checks:
+        names.extend(n for n in getattr(check, "CONSUMES", ()) if n not in names)
+    return tuple(names)
+
+
+def _origin(url: str) -> str:
+    if not url.startswith('http'):
+        url = 'https://' + url
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def get_artifact(name: str, url: str, fetch: FetchContext):
+    """
+    Returns a shared scan input, producing it (and its own inputs) on first use.
+
+    Results are memoized on the scan's fetch context, so every artifact is produced
+    once per pillar no matter how many checks ask for it or when. SHARED ones
+    are produced once per scan when the context carries a scan_id: the other
+    pillars read them from core.scan_artifacts. One whose producer ran out of
+    time (utils.fetch_context.Deadline) may be built from refused requests, so
+    it raises DeadlineExceeded instead of being shared.
+    """
+    produce, requires, scope = ARTIFACTS[name]
+    if not url.startswith('http'):
+        url = 'https://' + url
+    key_url = _origin(url) if scope == "origin" else url
+
+    def build():
+        inputs = {dep: get_artifact(dep, url, fetch) for dep in requires}
+        result = produce(key_url, fetch, **inputs)
+        if deadline_passed():
+            raise DeadlineExceeded(f"Out of time producing {name} for {key_url}")
+        return result
+
+    if name in SHARED and fetch.scan_id:
+        encode, decode = SHARED[name]
+        return fetch.memo(("artifact", name, key_url), lambda: scan_artifacts.get_or_produce(
+            fetch.scan_id, name, key_url, build, encode, decode))
+    return fetch.memo(("artifact", name, key_url), build)
+
+
+# --------------------------------------------------------------------- artifacts
+
+@artifact("robots", shared=True)
+def _produce_robots(origin: str, fetch: FetchContext) -> dict:
+    """robots.txt as fetched: status, text (None unless 200) and declared sitemaps."""
+    robots = {"url": urljoin(origin, "/robots.txt"), "status_code": None, "content": None, "sitemaps": [], "error": None}
+    try:
+        response = fetch.get(robots["url"], timeout=10)
+    except requests.exceptions.RequestException as e:
+        robots["error"] = str(e)
+        return robots
+
+    robots["status_code"] = response.status_code
+    if response.status_code == 200:
+        robots["content"] = response.text
+        for line in response.text.splitlines():
+            if line.lower().startswith('sitemap:'):
+                robots["sitemaps"].append(line.split(':', 1)[1].strip())
+    return robots
+
+
+@artifact("robots_rules", requires=("robots",))
+def _produce_robots_rules(origin: str, fetch: FetchContext, robots: dict) -> RobotsRules:
+    """robots.txt compiled for bulk allow/deny queries; allows everything when there is none."""
+    return RobotsRules.parse(robots["content"] or "")
+
+
+@artifact("sitemap_urls", requires=("robots",), shared=True)
+def _produce_sitemap_urls(origin: str, fetch: FetchContext, robots: dict) -> list:
+    """Page URLs listed in the site's sitemaps (robots.txt directives, else /sitemap.xml)."""
+    pending = list(robots["sitemaps"]) or [urljoin(origin, "/sitemap.xml")]
+    seen, urls = set(), []
+    while pending and len(seen) < MAX_SITEMAP_FILES and len(urls) < MAX_SITEMAP_URLS:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+        try:
+            # Streamed, and closed as soon as enough URLs were read
+            with open_sitemap(fetch, sitemap_url) as (response, body):
+                for kind, loc, _ in SitemapParser(body):
+                    if not loc:
+                        continue
+                    if kind == "sitemap":
+                        pending.append(loc)
+                    else:
+                        urls.append(loc)
+                        if len(urls) >= MAX_SITEMAP_URLS:
+                            break
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, OSError, EOFError,
+                ET.ParseError, ValueError):
+            continue
+    return urls
+
+
+def _encode_page(page: Page) -> dict:
+    response = page.response
+    return {"url": page.url, "html": page.html, "status_code": response.status_code,
+            "final_url": response.url, "headers": list(response.headers.multi_items()),
+            "http_version": response.http_version}
+
+
+def _decode_page(data: dict) -> Page:
+    response = FetchResult(data["url"], status_code=data["status_code"], headers=httpx.Headers(data["headers"]),
+                           url=data["final_url"], content=data["html"].encode("utf-8"), encoding="utf-8",
+                           http_version=data["http_version"])
+    return Page(data["url"], data["html"], response=response)
+
+
+@artifact("homepage", scope="page", shared=True, encode=_encode_page, decode=_decode_page)
+def _produce_homepage(url: str, fetch: FetchContext):
+    return get_page(url, fetch)
+
+
+def _encode_openapi_index(index: OpenApiIndex) -> dict:
+    return {"spec": index.spec, "url": index.url, "source": index.source,
+            "agents_json": index.agents_json, "agents_spec_url": index.agents_spec_url}
+
+
+@artifact("openapi_index", shared=True, encode=_encode_openapi_index, decode=lambda data: OpenApiIndex(**data))
+def _produce_openapi_index(origin: str, fetch: FetchContext):
+    return get_openapi_index(origin, fetch)
+
+
+@artifact("tls_info")
+def _produce_tls_info(origin: str, fetch: FetchContext) -> dict:
+    """
+    Verified HTTPS request to the host's home page (port 443): the TLS
+    protocol, cipher and certificate expiry of the connection, plus the
+    response headers, all from that one connection.
+
+    Only the headers are read, never the body. A host's certificate metadata
+    is cached across scans until shortly before the certificate expires
+    (utils.host_cache), under the host the redirects ended on, since that is
+    the connection it describes. The probe may be answered by the HTTP cache;
+    such a response carries no handshake, so without cached metadata for its
+    final host the request is sent again past the HTTP cache.
+    """
+    host = urlparse(origin).hostname
+    info = {"host": host, "valid": False, "not_after": None, "protocol": None, "cipher": None,
+            "headers": None, "url": None, "error": None}
+    probe_url = f"https://{host}/"
+    result = asyncio.run(fetch.afetch(probe_url, timeout=TLS_PROBE_TIMEOUT, max_bytes=0))
+    cached = None
+    if not result.error and result.tls is None and urlparse(result.url).scheme == "https":
+        cached = host_cache.get("tls", urlparse(result.url).hostname)
+        if cached is None:
+            result = asyncio.run(fetch.afetch(probe_url, cache=False, timeout=TLS_PROBE_TIMEOUT, max_bytes=0))
+    if result.error:
+        info["error"] = result.error
+        info["unreachable"] = result.connection_failed and "SSL" not in result.error
+        return info
+
+    fetch.count("tls_cache_hits" if cached is not None else "tls_handshakes")
+    tls = cached or result.tls or {}
+    info["valid"] = bool(tls.get("not_after"))
+    info["not_after"] = datetime.strptime(tls["not_after"], '%b %d %H:%M:%S %Y %Z') if info["valid"] else None
+    info["protocol"] = tls.get("protocol")
+    info["cipher"] = tls.get("cipher")
+    info["headers"] = result.headers
+    info["url"] = result.url
+    if not info["valid"]:
+        info["error"] = "No verified certificate on the final HTTPS connection"
+    elif cached is None:
+        expires_in = info["not_after"].replace(tzinfo=timezone.utc).timestamp() - time.time()
+        host_cache.set("tls", urlparse(result.url).hostname, tls,
+                       min(TLS_CACHE_MAX_AGE, expires_in - TLS_CACHE_EXPIRY_MARGIN))
+    return info
+
+
+# ----------------------------------------------------------------------- planner
+
+class ScanPlanner:
+    """
+    Runs a scan's checks as a DAG over the shared artifacts they consume.
+
+    Every artifact needed by any check starts right away on its own thread;
+    artifacts that depend on others (e.g. sitemap_urls on robots) simply block
+    on the memoized input. A check is started as soon as all the artifacts it
+    declares are ready, so independent work runs fully in parallel and every
+    shared input is produced exactly once.
+    """
+
+    def __init__(self, url: str, fetch: FetchContext, max_workers: int = None):
+        self.url = url
+        self.fetch = fetch
+        self.max_workers = max_workers
+
+    def _required(self, names) -> list:
+        """Transitive closure of artifact names, dependencies first."""
+        ordered = []
+
+        def visit(name):
+            if name in ordered:
+                return
+            for dep in ARTIFACTS[name][1]:
+                visit(dep)
+            ordered.append(name)
+
+        for name in names:
+            visit(name)
+        return ordered
+
+    def run(self, checks: Dict[str, Tuple[Callable[[], object], Tuple[str, ...]]],
+            prefetch: Tuple[str, ...] = ()) -> Iterator[Tuple[str, object]]:
+        """
+        Runs `checks` ({name: (callable, consumes)}) and yields (name, result) as each finishes.
+
+        `prefetch` names artifacts that nested checks read on their own threads
+        (e.g. a pillar's sub-analyzers): they are started with the rest but do
+        not hold back any check. An exception raised by a check is re-raised from the iterator; checks not
+        started yet are then cancelled. Artifact failures never fail the scan:
+        the consuming check runs and handles the missing input itself. Once the
+        checks are done, artifacts still being produced are cancelled (their
+        requests are refused) and waited for, so none outlives the call.
+        """
+        artifacts = self._required(list(prefetch) + [a for _, consumed in checks.values() for a in consumed])
+        artifact_pool = ThreadPoolExecutor(max_workers=max(1, len(artifacts)))
+        check_pool = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers or len(checks), len(checks))))
+        finished = queue.Queue()
+        lock = threading.Lock()
+        stopped = threading.Event()
+        artifacts_deadline = Deadline()
+
+        def produce(name):
+            token = current_deadline.set(artifacts_deadline)
+            try:
+                return get_artifact(name, self.url, self.fetch)
+            finally:
+                current_deadline.reset(token)
+
+        try:
+            artifact_futures = {name: artifact_pool.submit(produce, name) for name in artifacts}
+
+            def start(name):
+                func, _ = checks[name]
+                with lock:
+                    if stopped.is_set():
+                        return
+                    future = check_pool.submit(func)
+                future.add_done_callback(lambda f: finished.put((name, f)))
+
+            for name, (_, consumed) in checks.items():
+                waiting = [artifact_futures[a] for a in set(consumed)]
+                if not waiting:
+                    start(name)
+                    continue
+                remaining = {"count": len(waiting)}
+
+                def on_ready(_, name=name, remaining=remaining):
+                    with lock:
+                        remaining["count"] -= 1
+                        ready = remaining["count"] == 0
+                    if ready:
+                        start(name)
+
+                for future in waiting:
+                    future.add_done_callback(on_ready)
+
+            for _ in range(len(checks)):
+                name, future = finished.get()
+                yield name, future.result()
+        finally:
+            with lock:
+                stopped.set()
+            check_pool.shutdown(wait=True, cancel_futures=True)
+            # No check is left to read them: stop prefetches nobody consumed
+            artifacts_deadline.cancel()
+            artifact_pool.shutdown(wait=True, cancel_futures=True)
@@ -1,17 +1,15 @@
 from typing import Tuple, List
-from bs4 import BeautifulSoup
+from utils.page import Page
 # ---------- Content Formatting Check ----------
 
-def check_content_formatting(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_content_formatting(page: Page) -> Tuple[int, List[str], List[str]]:
     issues = []
     recommendations = []
     score = 0
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
-
         # 1. Paragraphs
-        paragraphs = soup.find_all("p")
+        paragraphs = page.find_all("p")
         if len(paragraphs) >= 3:
             score += 3
         else:
@@ -20,9 +18,9 @@ def check_content_formatting(url: str, html: str) -> Tuple[int, List[str], List[
             recommendations.append("Use <p> elements to mark up readable text blocks.")
 
         # 2. Lists
-        ul = soup.find_all("ul")
-        ol = soup.find_all("ol")
-        dl = soup.find_all("dl")
+        ul = page.find_all("ul")
+        ol = page.find_all("ol")
+        dl = page.find_all("dl")
         if len(ul) + len(ol) + len(dl) > 0:
             score += 2
         else:
@@ -30,7 +28,7 @@ def check_content_formatting(url: str, html: str) -> Tuple[int, List[str], List[
             recommendations.append("Use semantic HTML list tags for structured information.")
 
         # 3. Tables
-        tables = soup.find_all("table")
+        tables = page.find_all("table")
         good_tables = 0
         for table in tables:
             if table.find("th") and table.find("tr") and table.find("td"):
@@ -42,8 +40,8 @@ def check_content_formatting(url: str, html: str) -> Tuple[int, List[str], List[
             recommendations.append("Use <th>, <td>, <thead>, and <tbody> inside tables.")
 
         # 4. Avoids text-in-image misuse
-        images_with_text = [img for img in soup.find_all("img") if img.get("alt") and len(img["alt"].split()) >= 5]
-        buttons_with_text = [btn for btn in soup.find_all("button") if btn.text and len(btn.text.split()) >= 5]
+        images_with_text = [img for img in page.find_all("img") if img.get("alt") and len(img["alt"].split()) >= 5]
+        buttons_with_text = [btn for btn in page.find_all("button") if btn.text and len(btn.text.split()) >= 5]
         if len(images_with_text) > 5 or len(buttons_with_text) > 10:
             issues.append("Too much descriptive text inside <img> alt or <button>.")
             recommendations.append("Avoid encoding full content in alt tags or button labels.")
@@ -51,7 +49,7 @@ def check_content_formatting(url: str, html: str) -> Tuple[int, List[str], List[
             score += 2
 
         # 5. Quote/code formatting
-        if soup.find("pre") or soup.find("code") or soup.find("blockquote"):
+        if page.find("pre") or page.find("code") or page.find("blockquote"):
             score += 1
         else:
             issues.append("No semantic formatting for quotes or code.")
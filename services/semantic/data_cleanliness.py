@@ -1,20 +1,18 @@
 from typing import Tuple, List
-from bs4 import BeautifulSoup
+from utils.page import Page
 
 # ---------- Data Payload Cleanliness Check ----------
 
-def check_data_payload_cleanliness(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_data_payload_cleanliness(page: Page) -> Tuple[int, List[str], List[str]]:
     issues = []
     recommendations = []
     score = 20  # Start with max, subtract penalties
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
-
         # --- 1. Text-to-HTML ratio ---
-        text = soup.get_text(separator=' ', strip=True)
+        text = page.text
         text_length = len(text)
-        html_length = len(html)
+        html_length = len(page.html)
         ratio = text_length / html_length if html_length else 0
 
         if ratio < 0.1:
@@ -23,9 +21,9 @@ def check_data_payload_cleanliness(url: str, html: str) -> Tuple[int, List[str],
             recommendations.append("Reduce clutter and increase visible, extractable text.")
 
         # --- 2. Script & Style Tag Noise ---
-        script_tags = soup.find_all("script")
-        style_tags = soup.find_all("style")
-        iframe_tags = soup.find_all("iframe")
+        script_tags = page.find_all("script")
+        style_tags = page.find_all("style")
+        iframe_tags = page.find_all("iframe")
 
         if len(script_tags) > 30:
             score -= 4
@@ -47,7 +45,7 @@ def check_data_payload_cleanliness(url: str, html: str) -> Tuple[int, List[str],
             "googletagmanager", "doubleclick", "facebook", "fb:", "analytics", "adsbygoogle",
             "cookieconsent", "optanon", "gpt-ad"
         ]
-        clutter_matches = sum(1 for pat in clutter_patterns if pat in html.lower())
+        clutter_matches = sum(1 for pat in clutter_patterns if pat in page.html_lower)
 
         if clutter_matches > 3:
             score -= 3
@@ -55,9 +53,9 @@ def check_data_payload_cleanliness(url: str, html: str) -> Tuple[int, List[str],
             recommendations.append("Minimize 3rd-party scripts and tracking overhead.")
 
         # --- 4. Div Soup & Inline CSS ---
-        div_count = len(soup.find_all("div"))
-        span_count = len(soup.find_all("span"))
-        inline_styles = len(soup.select("[style]"))
+        div_count = len(page.find_all("div"))
+        span_count = len(page.find_all("span"))
+        inline_styles = sum(1 for tag in page.elements if tag.has_attr("style"))
 
         if div_count > 150 or span_count > 100:
             score -= 3
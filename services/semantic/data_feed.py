@@ -1,22 +1,23 @@
-import requests
-from urllib.parse import urljoin
 from typing import Tuple, List
-from bs4 import BeautifulSoup
+from utils.page import Page
 import re
+from utils.fetch_context import FetchContext
+from services.scan_planner import get_artifact
 
 
 # ---------- Data Feed Availability Check ----------
 
-def check_data_feed_availability(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_data_feed_availability(page: Page, fetch: FetchContext = None) -> Tuple[int, List[str], List[str]]:
     issues = []
     recommendations = []
     score = 0
+    fetch = fetch or FetchContext()
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = page.soup
 
-        base_url = re.match(r"https?://[^/]+", url)
-        base_url = base_url.group(0) if base_url else url
+        base_url = re.match(r"https?://[^/]+", page.url)
+        base_url = base_url.group(0) if base_url else page.url
 
         # 1. Look for RSS or Atom feeds
         feed_links = soup.find_all("link", type=re.compile("application/(rss|atom)\\+xml"))
@@ -27,25 +28,25 @@ def check_data_feed_availability(url: str, html: str) -> Tuple[int, List[str], L
             recommendations.append("Add <link rel='alternate' type='application/rss+xml'> in <head>.")
 
         # 2. Structured data presence (proxy for validity)
-        if soup.find("script", type="application/ld+json"):
+        if page.json_ld_scripts:
             score += 1
         else:
             issues.append("No embedded structured data found.")
             recommendations.append("Use JSON-LD or Microdata to publish content in machine-readable form.")
 
         # 3. robots.txt contains sitemap or feed URLs
-        try:
-            robots_url = urljoin(base_url, "/robots.txt")
-            robots_txt = requests.get(robots_url, timeout=5).text.lower()
+        robots = get_artifact("robots", base_url, fetch)
+        if not robots["error"]:
+            robots_txt = (robots["content"] or "").lower()
             if "sitemap:" in robots_txt or "rss" in robots_txt or "atom" in robots_txt:
                 score += 1
-        except Exception:
+        else:
             issues.append("robots.txt could not be retrieved.")
             recommendations.append("Ensure robots.txt exists and includes sitemap or feed references.")
 
         # 4. Public API endpoint check (common patterns)
         api_keywords = ["/api", "/feeds", "/openapi", "/wp-json", "/graphql"]
-        if any(keyword in html.lower() for keyword in api_keywords):
+        if any(keyword in page.html_lower for keyword in api_keywords):
             score += 1
         else:
             issues.append("No API or feed endpoint references found.")
@@ -1,21 +1,16 @@
 from typing import Tuple, List
-from bs4 import BeautifulSoup
+from utils.page import Page
 
 # ---------- Heading Hierarchy Check ----------
 
-def check_heading_hierarchy(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_heading_hierarchy(page: Page) -> Tuple[int, List[str], List[str]]:
     issues = []
     recommendations = []
     score = 0
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
-
-        headings = []
-        for level in range(1, 7):
-            tags = soup.find_all(f"h{level}")
-            for tag in tags:
-                headings.append((level, tag.text.strip()))
+        # Grouped by level (all h1s, then all h2s, ...), as the checks below expect
+        headings = sorted(page.headings, key=lambda h: h[0])
 
         if not headings:
             issues.append("No heading tags found on the page.")
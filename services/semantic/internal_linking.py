@@ -1,28 +1,28 @@
 from urllib.parse import urlparse, urljoin
 from typing import Tuple, List
-from bs4 import BeautifulSoup
+from utils.page import Page
 import re
 
 # ---------- Internal Linking Check ----------
 
-def check_internal_linking(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_internal_linking(page: Page) -> Tuple[int, List[str], List[str]]:
     issues = []
     recommendations = []
     score = 0
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        parsed = urlparse(url)
+        soup = page.soup
+        parsed = urlparse(page.url)
         domain = parsed.netloc
 
         # 1. Internal anchor tags
         internal_links = []
         descriptive_links = []
 
-        for a in soup.find_all("a", href=True):
+        for a in page.links:
             href = a["href"]
             anchor_text = a.get_text(strip=True)
-            full_url = urljoin(url, href)
+            full_url = urljoin(page.url, href)
             if domain in urlparse(full_url).netloc:
                 internal_links.append(full_url)
                 if len(anchor_text.split()) >= 5:
@@ -43,7 +43,7 @@ def check_internal_linking(url: str, html: str) -> Tuple[int, List[str], List[st
             recommendations.append("Use meaningful anchor text (5+ words) for clarity and relevance.")
 
         # 2. Navigation structure
-        if soup.find("nav") or soup.find("ul", class_=re.compile("menu|nav", re.I)):
+        if page.find("nav") or soup.find("ul", class_=re.compile("menu|nav", re.I)):
             score += 1
         else:
             issues.append("No navigation or menu structure detected.")
@@ -51,7 +51,7 @@ def check_internal_linking(url: str, html: str) -> Tuple[int, List[str], List[st
 
         # 3. Lateral/hierarchical signals (breadcrumbs, related)
         patterns = ["breadcrumb", "related", "next", "prev", "sidebar", "section"]
-        if any(re.search(pat, html, re.I) for pat in patterns):
+        if any(re.search(pat, page.html, re.I) for pat in patterns):
             score += 1
         else:
             issues.append("No hierarchical or lateral linking patterns found.")
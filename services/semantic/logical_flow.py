@@ -1,19 +1,17 @@
 from typing import Tuple, List
-from bs4 import BeautifulSoup
+from utils.page import Page
 import re
 
 # ---------- Logical Content Flow Check ----------
 
-def check_logical_content_flow(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_logical_content_flow(page: Page) -> Tuple[int, List[str], List[str]]:
     issues = []
     recommendations = []
     score = 0
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
-
         # 1. Heading followed by paragraph sequence
-        content_blocks = soup.find_all(["h1", "h2", "h3", "p"])
+        content_blocks = page.find_all("h1", "h2", "h3", "p")
         has_good_flow = False
         for i in range(len(content_blocks) - 1):
             if content_blocks[i].name.startswith("h") and content_blocks[i + 1].name == "p":
@@ -26,7 +24,7 @@ def check_logical_content_flow(url: str, html: str) -> Tuple[int, List[str], Lis
             recommendations.append("Ensure each section begins with a heading followed by content.")
 
         # 2. Top-loaded content
-        body = soup.find("body")
+        body = page.find("body")
         early_text = body.get_text(strip=True)[:500] if body else ""
         if len(early_text.split()) >= 30:
             score += 1
@@ -36,14 +34,14 @@ def check_logical_content_flow(url: str, html: str) -> Tuple[int, List[str], Lis
 
         # 3. Disruptive interjections (ads, overlays)
         disruptive_keywords = ["popup", "subscribe", "ad-", "cookie", "banner"]
-        if any(re.search(k, html, re.I) for k in disruptive_keywords):
+        if any(re.search(k, page.html, re.I) for k in disruptive_keywords):
             issues.append("Potential interruptions found (ads, popups, modals).")
             recommendations.append("Avoid disrupting the main content flow with overlays or interstitials.")
         else:
             score += 1
 
         # 4. Visual/semantic grouping
-        if soup.find("section") or soup.find("hr") or soup.find("article"):
+        if page.find("section") or page.find("hr") or page.find("article"):
             score += 1
         else:
             issues.append("No semantic grouping or content segmentation.")
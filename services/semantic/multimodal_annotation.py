@@ -1,18 +1,18 @@
 from typing import Tuple, List
-from bs4 import BeautifulSoup
+from utils.page import Page
 
 # ---------- Multimodal Annotation Check ----------
 
-def check_multimodal_annotation(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_multimodal_annotation(page: Page) -> Tuple[int, List[str], List[str]]:
     issues = []
     recommendations = []
     score = 0
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = page.soup
 
         # 1. Alt text on images
-        img_tags = soup.find_all("img")
+        img_tags = page.find_all("img")
         well_annotated = [img for img in img_tags if img.get("alt") and len(img["alt"].split()) >= 5]
         if len(well_annotated) >= 3:
             score += 2
@@ -21,7 +21,7 @@ def check_multimodal_annotation(url: str, html: str) -> Tuple[int, List[str], Li
             recommendations.append("Add meaningful alt text to images (≥5 words).")
 
         # 2. <track> in <video>/<audio>
-        has_tracks = any(tag.find("track") for tag in soup.find_all(["video", "audio"]))
+        has_tracks = any(tag.find("track") for tag in page.find_all("video", "audio"))
         if has_tracks:
             score += 1
         else:
@@ -29,7 +29,7 @@ def check_multimodal_annotation(url: str, html: str) -> Tuple[int, List[str], Li
             recommendations.append("Use <track> for subtitles/captions in <video> and <audio> tags.")
 
         # 3. <figure> + <figcaption>
-        figures = soup.find_all("figure")
+        figures = page.find_all("figure")
         with_caption = [fig for fig in figures if fig.find("figcaption")]
         if with_caption:
             score += 1
@@ -1,25 +1,12 @@
 from typing import Tuple, List
-import json
-from bs4 import BeautifulSoup
+from utils.page import Page
 
-def check_schema_org_depth(url: str, html: str) -> Tuple[int, List[str], List[str]]:
+def check_schema_org_depth(page: Page) -> Tuple[int, List[str], List[str]]:
     issues, recommendations = [], []
     score = 0
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        scripts = soup.find_all("script", type="application/ld+json")
-
-        jsonld_data = []
-        for tag in scripts:
-            try:
-                parsed = json.loads(tag.string)
-                if isinstance(parsed, list):
-                    jsonld_data.extend(parsed)
-                else:
-                    jsonld_data.append(parsed)
-            except Exception:
-                continue
+        jsonld_data = page.json_ld
 
         if not jsonld_data:
             issues.append("No JSON-LD structured data found.")
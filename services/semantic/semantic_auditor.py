@@ -1,3 +1,4 @@
+from functools import partial
 from .schema_org import check_schema_org_depth
 from .data_cleanliness import check_data_payload_cleanliness
 from .semantic_html import check_semantic_html_fidelity
@@ -7,7 +8,9 @@ from .multimodal_annotation import check_multimodal_annotation
 from .data_feed import check_data_feed_availability
 from .internal_linking import check_internal_linking
 from .logical_flow import check_logical_content_flow
-from utils.featcher import fetch_html_selenium
+from utils.featcher import fetch_page
+from services.scan_planner import consumes
+from utils.fetch_context import FetchContext
 
 __all__ = [
     "check_schema_org_depth",
@@ -21,14 +24,16 @@ __all__ = [
     "check_logical_content_flow",
 ]
 
+@consumes("homepage")
 class SemanticAuditor:
     """
     Orchestrates semantic checks for web content.
     """
 
-    def __init__(self, base_url: str, timeout: float = 15.0) -> None:
+    def __init__(self, base_url: str, timeout: float = 15.0, fetch: FetchContext = None) -> None:
         self.base_url = base_url
         self.timeout = timeout
+        self.fetch = fetch or FetchContext()
 
     def run_all(self) -> dict:
         """
@@ -47,18 +52,19 @@ class SemanticAuditor:
             'heading_hierarchy': check_heading_hierarchy,
             'content_formatting': check_content_formatting,
             'multimodal_annotation': check_multimodal_annotation,
-            'data_feed_availability': check_data_feed_availability,
+            'data_feed_availability': partial(check_data_feed_availability, fetch=self.fetch),
             'internal_linking': check_internal_linking,
             'logical_content_flow': check_logical_content_flow,
         }
 
         try:
 
-            html = fetch_html_selenium(self.base_url)
+            # Parsed once and shared with every check (and with the other pillars)
+            page = fetch_page(self.base_url, fetch=self.fetch)
 
             for key, check_func in check_map.items():
                 try:
-                    score, issues, recommendations = check_func(self.base_url, html)
+                    score, issues, recommendations = check_func(page)
                     results[key] = {'score': score, 'issues': issues, 'recommendations': recommendations}
                     overall_score += score
                     recommendations.extend(recommendations)
@@ -1,65 +1,202 @@
-import asyncio
+import os
+import time
 from datetime import datetime
 import uuid
 import json
 import re
-from typing import Dict, Any
-from celery_app import celery_app
+from typing import Dict, Any, List
+from celery import chord
+import redis
+from celery_app import celery_app, REDIS_URL
 from services.axo.axo_auditor import AxoAuditor
 from services.automation.automation_auditor import AutomationAuditor
 from services.geo_readiness.geo_auditor import GeoReadinessAnalyzer
 from services.modularity_api.modularity_auditor import ModularityApiAnalyzer
 from services.semantic.semantic_auditor import SemanticAuditor
-from utils.featcher import fetch_html_selenium
+from services.scan_planner import ScanPlanner
+from utils.fetch_context import FetchContext
+from utils.circuit_breaker import HostUnreachable, circuit_breaker, preflight
 from core.scan_service import scan_service
+from core.scan_events import scan_events
+from core.scan_registry import scan_registry, normalize_url
+from core.scan_artifacts import scan_artifacts
 import google.generativeai as genai
 
+# Pillars in report order, mapping to auditor classes
+PILLARS = {
+    "Agent Experience": AxoAuditor,
+    "GEO Readiness & Governance": GeoReadinessAnalyzer,
+    "API Readiness": ModularityApiAnalyzer,
+    "Performance & Reliability": AutomationAuditor,
+    "Structural & Semantic": SemanticAuditor,
+}
+
+# Pillar subtasks of one scan may finish on different workers; the set of
+# finished pillars lives in Redis so each one can report overall progress.
+PROGRESS_KEY = "scan:{scan_id}:pillars_done"
+_redis = redis.Redis.from_url(REDIS_URL)
+
+# How many pillars of one scan may run at the same time (1 = the old sequential behaviour)
+PILLAR_CONCURRENCY = int(os.getenv("SCAN_PILLAR_CONCURRENCY", "5"))
+# Seconds a pillar waits in the queue before trying again for one of its scan's slots
+PILLAR_SLOT_RETRY = int(os.getenv("SCAN_PILLAR_SLOT_RETRY", "5"))
+
+
+def _get_model(api_key: str):
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-2.5-flash')
+
+
+def _run_pillar(AuditorCls, url: str, model, fetch: FetchContext):
+    """Runs one pillar's auditor and returns (report, elapsed_seconds)."""
+    started = time.monotonic()
+    if AuditorCls is AxoAuditor:
+        rpt = AuditorCls(base_url=url, model=model, fetch=fetch).run_all()
+    else:
+        rpt = AuditorCls(base_url=url, fetch=fetch).run_all()
+    return rpt, round(time.monotonic() - started, 2)
+
+
+def _mark_pillar_done(scan_id: str, name: str) -> List[str]:
+    """Records `name` as finished and returns every finished pillar of the scan so far."""
+    key = PROGRESS_KEY.format(scan_id=scan_id)
+    pipe = _redis.pipeline()
+    pipe.rpush(key, name)
+    pipe.expire(key, celery_app.conf.result_expires)
+    pipe.lrange(key, 0, -1)
+    return [n.decode() for n in pipe.execute()[-1]]
+
+
+def _audience(scan_id: str) -> List[str]:
+    """The scan plus every scan that joined it while it was in flight."""
+    return [scan_id] + scan_registry.followers(scan_id)
+
+
 @celery_app.task(bind=True)
-def run_audit(self, scan_id: str, url: str, api_key: str) -> Dict[str, Any]:
+def run_audit(self, scan_id: str, url: str, api_key: str, url_key: str = None) -> Dict[str, Any]:
     """
     Run a comprehensive audit based on the provided URL and API key.
+
+    The scan is fanned out as a chord: one `run_pillar` subtask per pillar, which
+    can land on any worker, and `finalize_audit` once all of them have finished.
+    `url_key` is the normalized URL the scan is registered under in the scan
+    registry; its outcome is copied to any scan that joined it.
+
+    A target that doesn't resolve or accept connections fails the scan as
+    unreachable right away, instead of every check waiting out its timeouts.
+    If the chord can't be dispatched the scan fails too, so the registry stops
+    offering it to new requests.
     """
     if not url or not scan_id:
         raise ValueError("URL and Scan ID are required")
+    url_key = url_key or normalize_url(url)
+
+    with scan_registry.keep_alive(url_key, scan_id):
+        try:
+            unreachable = preflight(url)
+            if unreachable:
+                circuit_breaker.trip(url)
+                mark_audit_failed(None, HostUnreachable(unreachable), None, scan_id=scan_id, url_key=url_key)
+                return {"status": "unreachable", "scan_id": scan_id, "error": unreachable}
+
+            _redis.delete(PROGRESS_KEY.format(scan_id=scan_id))
+            scan_events.publish(scan_id, "progress", {"current": 0, "total": len(PILLARS), "last_completed": None, "completed": []})
+            header = [
+                run_pillar.s(scan_id=scan_id, url=url, pillar=name, api_key=api_key, url_key=url_key)
+                for name in PILLARS
+            ]
+            callback = finalize_audit.s(
+                scan_id=scan_id, api_key=api_key, started_at=datetime.now().isoformat(), url_key=url_key
+            ).on_error(mark_audit_failed.s(scan_id=scan_id, url_key=url_key))
+            result = chord(header)(callback)
+        except Exception as e:
+            # Nothing is left to finish this scan or tell its followers
+            mark_audit_failed(None, e, None, scan_id=scan_id, url_key=url_key)
+            raise
+    return {"status": "dispatched", "scan_id": scan_id, "chord_id": result.id}
+
+
+@celery_app.task(bind=True)
+def run_pillar(self, scan_id: str, url: str, pillar: str, api_key: str, url_key: str = None) -> Dict[str, Any]:
+    """
+    Runs a single pillar of a scan and reports progress.
+
+    The pillar gets its own fetch context; the planner still produces the shared
+    inputs its analyzers declare once and ahead of the checks that need them, and
+    the ones other pillars read too (homepage, robots.txt, sitemap URLs, OpenAPI
+    index) once per scan, through core.scan_artifacts.
+    While it runs it keeps the scan in flight in the scan registry. With
+    PILLAR_CONCURRENCY below the number of pillars, it first takes one of the
+    scan's slots, going back to the queue while they are all held.
+    """
+    limited = PILLAR_CONCURRENCY < len(PILLARS)
+    if limited:
+        try:
+            slot_taken = scan_registry.take_pillar_slot(scan_id, pillar, PILLAR_CONCURRENCY)
+        except redis.RedisError as e:
+            print(f"⚠️ Could not take a pillar slot for scan {scan_id}, running unlimited: {e}")
+            slot_taken, limited = True, False
+        if not slot_taken:
+            raise self.retry(countdown=PILLAR_SLOT_RETRY, max_retries=None)
+
+    AuditorCls = PILLARS[pillar]
+    model = _get_model(api_key) if AuditorCls is AxoAuditor else None
+    fetch = FetchContext(scan_id=scan_id)
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-
-        reports = {}
-        # Pillars in order, mapping to auditor classes
-        pillars = [
-            ("Agent Experience",   AxoAuditor),
-            ("GEO Readiness & Governance", GeoReadinessAnalyzer),
-            ("API Readiness",      ModularityApiAnalyzer),
-            ("Performance & Reliability", AutomationAuditor),
-            ("Structural & Semantic", SemanticAuditor),
-        ]
-        start = datetime.now()
-
-        for idx, (name, AuditorCls) in enumerate(pillars, start=1):
-            # update progress
-            self.update_state(
-                state="PROGRESS",
-                meta={"current": idx, "total": len(pillars), "last_completed": name}
-            )
-
-            # run each auditor
-            if AuditorCls is AxoAuditor:
-                rpt = AuditorCls(base_url=url, model=model).run_all()
-            else:
-                rpt = AuditorCls(base_url=url).run_all()
-            reports[name] = rpt
-
-            asyncio.run(scan_service.update_scan_from_task(
-                scan_id=scan_id,
-                result={"current": idx, "total": len(pillars), "last_completed": name}, # Store the partial results
-                status="PROGRESS"
-            ))
-            
-
-        # combine via your aggregate_scans logic
+        with scan_registry.keep_alive(url_key, scan_id, pillar if limited else None):
+            planner = ScanPlanner(url, fetch)
+            checks = {pillar: (lambda: _run_pillar(AuditorCls, url, model, fetch), getattr(AuditorCls, "CONSUMES", ()))}
+            report, seconds = dict(planner.run(checks, prefetch=getattr(AuditorCls, "PREFETCH", ())))[pillar]
+        metrics = fetch.metrics()
+        unreachable_hosts = fetch.unreachable_hosts()
+        if unreachable_hosts:
+            # Checks against these hosts were cut short, not scored on real responses
+            report["unreachable_hosts"] = unreachable_hosts
+    finally:
+        fetch.close()
+        if limited:
+            try:
+                scan_registry.release_pillar_slot(scan_id, pillar)
+            except redis.RedisError as e:
+                print(f"⚠️ Could not release the pillar slot of scan {scan_id}: {e}")
+
+    completed = _mark_pillar_done(scan_id, pillar)
+    progress = {
+        "current": len(completed),
+        "total": len(PILLARS),
+        "last_completed": pillar,
+        "completed": completed,
+    }
+    for target_id in _audience(scan_id):
+        scan_events.publish(target_id, "pillar_completed", {
+            "pillar": pillar, "score": report.get("overall_score"), "seconds": seconds,
+        })
+        scan_events.publish(target_id, "progress", progress)
+        scan_service.update_scan_from_task(
+            scan_id=target_id,
+            result=progress, # Store the partial results
+            status="PROGRESS",
+            wait=False,
+        )
+    return {"pillar": pillar, "report": report, "seconds": seconds, "metrics": metrics}
+
+
+@celery_app.task(bind=True)
+def finalize_audit(self, pillar_results: List[Dict[str, Any]], scan_id: str, api_key: str, started_at: str,
+                   url_key: str = None) -> Dict[str, Any]:
+    """
+    Chord callback: aggregates the pillar reports and stores the final result.
+
+    Failures here or in any pillar are recorded by `mark_audit_failed`.
+    """
+    reports = {r["pillar"]: r["report"] for r in pillar_results}
+    # Every pillar is done with the scan's shared inputs
+    scan_artifacts.clear(scan_id)
+
+    # combine via your aggregate_scans logic
+    with scan_registry.keep_alive(url_key, scan_id):
         final = aggregate_scans(
-            model,
+            _get_model(api_key),
             reports["Agent Experience"],
             reports["GEO Readiness & Governance"],
             reports["API Readiness"],
@@ -67,26 +204,49 @@ def run_audit(self, scan_id: str, url: str, api_key: str) -> Dict[str, Any]:
             reports["Structural & Semantic"],
         )
 
-        end = datetime.now()
-        final["duration_minutes"] = round((end - start).total_seconds() / 60, 2)
-        final["assessed_on"] = start.strftime("%Y-%m-%d")
+    start = datetime.fromisoformat(started_at)
+    end = datetime.now()
+    final["duration_minutes"] = round((end - start).total_seconds() / 60, 2)
+    final["assessed_on"] = start.strftime("%Y-%m-%d")
+    scan_metrics = {}
+    for r in pillar_results:
+        for k, v in r["metrics"].items():
+            scan_metrics[k] = scan_metrics.get(k, 0) + v
+    scan_metrics["pillar_seconds"] = {r["pillar"]: r["seconds"] for r in pillar_results}
+    final["scan_metrics"] = scan_metrics
 
-        asyncio.run(scan_service.update_scan_from_task(
-            scan_id=scan_id,
-            result=final,
-            status="completed"
-        ))
+    scan_service.update_scan_from_task(
+        scan_id=scan_id,
+        result=final,
+        status="completed"
+    )
+    # Stored first, so the scan is complete by the time it's offered for reuse
+    followers = scan_registry.finish(url_key, scan_id, succeeded=True) if url_key else []
+    for target_id in followers:
+        scan_service.update_scan_from_task(scan_id=target_id, result=final, status="completed")
+    for target_id in [scan_id] + followers:
+        scan_events.publish(target_id, "completed", {"scan_id": target_id, "duration_minutes": final["duration_minutes"]})
+    _redis.delete(PROGRESS_KEY.format(scan_id=scan_id))
 
-        return {"status": "completed", "scan_id": scan_id}
-    
-    except Exception as e:
-        error_report = {"error": str(e)}
-        asyncio.run(scan_service.update_scan_from_task(
-            scan_id=scan_id, 
-            result=error_report, 
+    return {"status": "completed", "scan_id": scan_id}
+
+
+@celery_app.task
+def mark_audit_failed(request, exc, traceback, scan_id: str, url_key: str = None):
+    """Chord errback: a pillar (or the callback itself) failed, so the scan failed."""
+    error_report = {"error": str(exc)}
+    if isinstance(exc, HostUnreachable):
+        error_report["status"] = "unreachable"
+    followers = scan_registry.finish(url_key, scan_id, succeeded=False) if url_key else []
+    for target_id in [scan_id] + followers:
+        scan_service.update_scan_from_task(
+            scan_id=target_id,
+            result=error_report,
             status="failed"
-        ))
-        raise e
+        )
+        scan_events.publish(target_id, "failed", error_report)
+    _redis.delete(PROGRESS_KEY.format(scan_id=scan_id))
+    scan_artifacts.clear(scan_id)
 
 
 def aggregate_scans(model, axo_report: dict, geo_report: dict, modular_report: dict, automation_report: dict, semantic_report: dict) -> dict:
@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict
+
+from utils.circuit_breaker import HostUnreachable
+from utils.fetch_context import Deadline, current_deadline
+
+# Parallelism and per-analyzer time budget for the pillar auditors' sub-analyzers
+ANALYZER_CONCURRENCY = int(os.getenv("SCAN_ANALYZER_CONCURRENCY", "10"))
+ANALYZER_TIMEOUT = float(os.getenv("SCAN_ANALYZER_TIMEOUT", "90"))
+# Budget of the sub-analyzers that crawl the site in bulk (sitemap files, the
+# canonical tag sweep); at the crawl rate limit they need more than the default
+CRAWL_ANALYZER_TIMEOUT = float(os.getenv("SCAN_CRAWL_ANALYZER_TIMEOUT", "300"))
+
+
+def run_analyzers(tasks: Dict[str, Callable[[], dict]], max_workers: int = None, timeout: float = None,
+                  timeouts: Dict[str, float] = None) -> Dict[str, dict]:
+    """
+    Runs each sub-analyzer task on a bounded thread pool and returns their reports.
+
+    Every task gets its own time budget, `timeouts[key]` or else `timeout`,
+    counted from when it actually starts running. A task that raises or
+    overruns gets an error report in its slot instead of blocking the others;
+    one that gave up because its host's circuit is open is reported as
+    unreachable. An overrunning task's requests are refused from then on
+    (utils.fetch_context.Deadline), and it is waited for before returning, so
+    no analyzer outlives the call and the caller may close its FetchContext.
+    The returned dict always has the keys of `tasks` in their original order,
+    so aggregation stays deterministic regardless of completion order.
+    """
+    max_workers = max(1, min(max_workers or ANALYZER_CONCURRENCY, len(tasks) or 1))
+    timeout = timeout or ANALYZER_TIMEOUT
+    budgets = {key: (timeouts or {}).get(key, timeout) for key in tasks}
+    deadlines = {}
+    lock = threading.Lock()
+
+    def run(key, task):
+        deadline = Deadline(budgets[key])
+        with lock:
+            deadlines[key] = deadline
+        token = current_deadline.set(deadline)
+        try:
+            return task()
+        finally:
+            current_deadline.reset(token)
+
+    reports = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        pending = {executor.submit(run, key, task): key for key, task in tasks.items()}
+        while pending:
+            now = time.monotonic()
+            with lock:
+                due = [deadlines[k].at for k in pending.values() if k in deadlines]
+            wait_for = max(0.0, min(due) - now) if due else timeout
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                key = pending.pop(future)
+                try:
+                    reports[key] = future.result()
+                except HostUnreachable as e:
+                    reports[key] = {'score': 0, 'status': 'unreachable', 'error': str(e)}
+                except Exception as e:
+                    reports[key] = {'score': 0, 'status': 'error', 'error': str(e)}
+
+            for future, key in list(pending.items()):
+                with lock:
+                    deadline = deadlines.get(key)
+                if deadline is not None and deadline.passed():
+                    # The worker thread can't be interrupted; its requests are refused
+                    # from now on and its result is abandoned
+                    del pending[future]
+                    reports[key] = {'score': 0, 'status': 'error', 'error': f"timed out after {budgets[key]:g}s"}
+    finally:
+        with lock:
+            for deadline in deadlines.values():
+                deadline.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return {key: reports[key] for key in tasks}
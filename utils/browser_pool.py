@@ -0,0 +1,334 @@
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+# Browsers a worker process keeps (and may lease out at the same time)
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+# Browsers launched up front when the worker starts
+BROWSER_POOL_WARM = int(os.getenv("BROWSER_POOL_WARM", "1"))
+# A browser is retired after this many seconds or leases, whichever comes first
+BROWSER_MAX_LIFETIME = float(os.getenv("BROWSER_MAX_LIFETIME", "600"))
+BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", "25"))
+# How long a check may wait for a free browser, and hold one, before giving up
+BROWSER_LEASE_WAIT = float(os.getenv("BROWSER_LEASE_WAIT", "60"))
+BROWSER_MAX_LEASE = float(os.getenv("BROWSER_MAX_LEASE", "120"))
+BROWSER_PAGE_LOAD_TIMEOUT = float(os.getenv("BROWSER_PAGE_LOAD_TIMEOUT", "30"))
+# Upper bound for wait_for_page_ready, and how long a page must be quiet to count as ready
+BROWSER_READY_TIMEOUT = float(os.getenv("BROWSER_READY_TIMEOUT", "6"))
+BROWSER_QUIET_PERIOD = float(os.getenv("BROWSER_QUIET_PERIOD", "0.5"))
+
+# Profile directories are named PROFILE_PREFIX + "<owner pid>-..."; processes
+# referencing the profile of a worker that no longer exists are orphans
+PROFILE_PREFIX = "ari-browser-"
+
+
+class _Browser:
+    """One Chrome (plus its chromedriver) with a private, throwaway profile."""
+
+    def __init__(self):
+        self.profile_dir = tempfile.mkdtemp(prefix=f"{PROFILE_PREFIX}{os.getpid()}-")
+        options = Options()
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument(f"--user-data-dir={self.profile_dir}")
+        # chromedriver and the Chrome processes it spawns share a new process
+        # group, so the whole tree can be killed at once if it hangs. Logging
+        # into the profile puts its path on chromedriver's command line too.
+        service = Service(
+            log_output=os.path.join(self.profile_dir, "chromedriver.log"),
+            popen_kw={"start_new_session": True},
+        )
+        try:
+            self.driver = webdriver.Chrome(options=options, service=service)
+        except Exception:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            raise
+        self.driver.set_page_load_timeout(BROWSER_PAGE_LOAD_TIMEOUT)
+        self.pgid = os.getpgid(service.process.pid)
+        self.created = time.monotonic()
+        self.uses = 0
+        self.leased_at: Optional[float] = None
+
+    @property
+    def expired(self) -> bool:
+        return self.uses >= BROWSER_MAX_USES or time.monotonic() - self.created >= BROWSER_MAX_LIFETIME
+
+    def reset(self):
+        """Wipes everything a lease left behind so the next one starts clean."""
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+        self.driver.execute_cdp_cmd("Emulation.setScriptExecutionDisabled", {"value": False})
+        origin = self.driver.execute_script("return window.location.origin")
+        if origin and origin != "null":
+            self.driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        self.driver.get("about:blank")
+        self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        self.driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+
+    def kill(self):
+        """Quits gracefully if possible, then hard-kills the process group and drops the profile."""
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        try:
+            os.killpg(self.pgid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class BrowserPool:
+    """
+    Worker-level pool of warm headless Chrome instances for the browser-based checks.
+
+    Checks lease a browser with `with browser_pool.lease() as driver:` instead of
+    launching their own. The lease is always returned, even when the check
+    raises; a browser that errored, outlived BROWSER_MAX_LIFETIME or served
+    BROWSER_MAX_USES leases is killed rather than reused. A watchdog hard-kills
+    any browser leased for longer than BROWSER_MAX_LEASE, and Chrome processes
+    orphaned by a previous worker are killed when the pool starts.
+    """
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: List[_Browser] = []
+        self._leased: List[_Browser] = []
+        self._watchdog: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        self._pid = os.getpid()
+
+    # ------------------------------------------------------------ lifecycle
+
+    def start(self, warm: int = BROWSER_POOL_WARM):
+        """Kills orphaned browsers and launches `warm` browsers ahead of the first lease."""
+        self._adopt_process()
+        kill_orphaned_browsers()
+        self._closed.clear()
+        for _ in range(min(warm, self.size)):
+            try:
+                browser = _Browser()
+            except Exception as e:
+                print(f"⚠️ Could not pre-launch browser: {e}")
+                break
+            with self._lock:
+                self._idle.append(browser)
+
+    def shutdown(self):
+        """Kills every browser, leased or not."""
+        self._closed.set()
+        with self._lock:
+            browsers, self._idle, self._leased = self._idle + self._leased, [], []
+        for browser in browsers:
+            browser.kill()
+
+    # --------------------------------------------------------------- leases
+
+    @contextmanager
+    def lease(self, javascript: bool = True, wait: float = BROWSER_LEASE_WAIT):
+        """
+        Leases a browser for the duration of the `with` block and yields its driver.
+
+        With `javascript=False`, script execution is disabled for the lease.
+        """
+        if not self._slots.acquire(timeout=wait):
+            raise TimeoutError(f"No browser became available within {wait:g}s")
+        browser = None
+        healthy = False
+        try:
+            browser = self._checkout()
+            if not javascript:
+                browser.driver.execute_cdp_cmd("Emulation.setScriptExecutionDisabled", {"value": True})
+            yield browser.driver
+            healthy = True
+        finally:
+            if browser is not None:
+                self._checkin(browser, healthy)
+            self._slots.release()
+
+    def _adopt_process(self):
+        """Forgets browsers inherited through fork; they belong to the parent process."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._idle, self._leased, self._watchdog = [], [], None
+
+    def _checkout(self) -> _Browser:
+        self._adopt_process()
+        self._ensure_watchdog()
+        browser = None
+        expired = []
+        with self._lock:
+            while self._idle:
+                candidate = self._idle.pop()
+                if candidate.expired:
+                    expired.append(candidate)
+                else:
+                    browser = candidate
+                    break
+        for old in expired:
+            old.kill()
+
+        browser = browser or _Browser()
+        browser.uses += 1
+        browser.leased_at = time.monotonic()
+        with self._lock:
+            self._leased.append(browser)
+        return browser
+
+    def _checkin(self, browser: _Browser, healthy: bool):
+        with self._lock:
+            if browser not in self._leased:
+                # Already killed by the watchdog or by shutdown
+                return
+            self._leased.remove(browser)
+            browser.leased_at = None
+
+        if healthy and not browser.expired and not self._closed.is_set():
+            try:
+                browser.reset()
+                with self._lock:
+                    self._idle.append(browser)
+                return
+            except Exception:
+                pass
+        browser.kill()
+
+    # ------------------------------------------------------------- watchdog
+
+    def _ensure_watchdog(self):
+        with self._lock:
+            if self._watchdog is None or not self._watchdog.is_alive():
+                self._watchdog = threading.Thread(target=self._watch, name="browser-pool-watchdog", daemon=True)
+                self._watchdog.start()
+
+    def _watch(self):
+        while not self._closed.wait(5):
+            now = time.monotonic()
+            with self._lock:
+                stuck = [b for b in self._leased if b.leased_at and now - b.leased_at > BROWSER_MAX_LEASE]
+                for browser in stuck:
+                    self._leased.remove(browser)
+            for browser in stuck:
+                print(f"⚠️ Killing browser held for more than {BROWSER_MAX_LEASE:g}s")
+                browser.kill()
+
+
+# Installs a DOM mutation observer on first call and reports the page's activity
+_READINESS_PROBE = """
+var state = window.__ariReadiness;
+if (!state) {
+    state = window.__ariReadiness = {mutatedAt: 0};
+    new MutationObserver(function () { state.mutatedAt = performance.now(); })
+        .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+}
+var resources = performance.getEntriesByType('resource');
+var lastResponse = 0;
+for (var i = 0; i < resources.length; i++) {
+    lastResponse = Math.max(lastResponse, resources[i].responseEnd);
+}
+return {
+    readyState: document.readyState,
+    now: performance.now(),
+    lastActivity: Math.max(state.mutatedAt, lastResponse),
+    resources: resources.length
+};
+"""
+
+
+def wait_for_page_ready(driver, timeout: float = BROWSER_READY_TIMEOUT, quiet_period: float = BROWSER_QUIET_PERIOD,
+                        poll_interval: float = 0.1) -> bool:
+    """
+    Waits until the current page has settled, for at most `timeout` seconds.
+
+    A page is settled once document.readyState is "complete", no resource has
+    finished loading and the DOM hasn't changed for `quiet_period` seconds, and
+    the resource count held steady across two consecutive polls. Returns False
+    if the timeout was hit first. Pages that can't run the probe or give back
+    no usable result (e.g. scripts disabled) count as settled: driver.get
+    already waited for their load event.
+    """
+    deadline = time.monotonic() + timeout
+    previous = None
+    while True:
+        try:
+            state = driver.execute_script(_READINESS_PROBE)
+            quiet = (
+                state["readyState"] == "complete"
+                and state["now"] - state["lastActivity"] >= quiet_period * 1000
+            )
+            steady = quiet and previous is not None and previous["resources"] == state["resources"]
+        except Exception:
+            # The probe didn't run or returned nothing usable (None, a non-object)
+            return True
+
+        if steady:
+            return True
+        previous = state if quiet else None
+
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(poll_interval)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def kill_orphaned_browsers():
+    """
+    Hard-kills chromedriver/Chrome processes left behind by pool browsers whose
+    worker process died without cleaning up, and removes their profiles.
+    """
+    tmp = tempfile.gettempdir()
+    orphaned = []
+    for name in os.listdir(tmp):
+        if not name.startswith(PROFILE_PREFIX):
+            continue
+        owner = name[len(PROFILE_PREFIX):].split("-", 1)[0]
+        if owner.isdigit() and not _pid_alive(int(owner)):
+            orphaned.append(os.path.join(tmp, name))
+    if not orphaned:
+        return
+
+    # Process command lines are only readable through /proc (Linux)
+    if os.path.isdir("/proc"):
+        markers = [p.encode() for p in orphaned]
+        for pid in filter(str.isdigit, os.listdir("/proc")):
+            try:
+                with open(f"/proc/{pid}/cmdline", "rb") as f:
+                    cmdline = f.read()
+            except OSError:
+                continue
+            if any(m in cmdline for m in markers):
+                try:
+                    os.kill(int(pid), signal.SIGKILL)
+                except (ProcessLookupError, PermissionError):
+                    pass
+    for path in orphaned:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,133 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from utils.host_limiter import host_of
+
+# Consecutive connect failures/timeouts after which a host is cut off
+HOST_BREAKER_THRESHOLD = int(os.getenv("HOST_BREAKER_THRESHOLD", "3"))
+# How long a tripped host stays cut off before one request may try it again
+HOST_BREAKER_COOLDOWN = float(os.getenv("HOST_BREAKER_COOLDOWN", "60"))
+# Time budget of the reachability check run before a scan is dispatched
+PREFLIGHT_TIMEOUT = float(os.getenv("SCAN_PREFLIGHT_TIMEOUT", "8"))
+
+
+class HostUnreachable(requests.ConnectionError):
+    """A request was refused locally because its host's circuit is open."""
+
+
+class _Circuit:
+    def __init__(self):
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker for outbound requests.
+
+    After HOST_BREAKER_THRESHOLD consecutive connect failures or timeouts to a
+    host, its circuit opens and further requests fail immediately with
+    HostUnreachable instead of each waiting out its own timeout. After
+    HOST_BREAKER_COOLDOWN seconds a single trial request is let through: a
+    response closes the circuit, another failure re-opens it. Any HTTP
+    response, whatever its status, counts as the host being reachable.
+    """
+
+    def __init__(self, threshold: int = HOST_BREAKER_THRESHOLD, cooldown: float = HOST_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _Circuit] = {}
+
+    def allow(self, url: str) -> bool:
+        """Whether a request to `url` may go out; False while its host's circuit is open."""
+        with self._lock:
+            circuit = self._circuits.get(host_of(url))
+            if circuit is None or circuit.opened_at is None:
+                return True
+            if time.monotonic() - circuit.opened_at < self.cooldown:
+                return False
+            # Half-open: one trial request per cooldown period
+            circuit.opened_at = time.monotonic()
+            return True
+
+    def check(self, url: str):
+        """Raises HostUnreachable if a request to `url` may not go out."""
+        if not self.allow(url):
+            raise HostUnreachable(f"{host_of(url)} is unreachable (circuit open after repeated connection failures)")
+
+    def record(self, url: str, reachable: bool):
+        host = host_of(url)
+        with self._lock:
+            if reachable:
+                self._circuits.pop(host, None)
+                return
+            circuit = self._circuits.setdefault(host, _Circuit())
+            circuit.failures += 1
+            if circuit.failures >= self.threshold or circuit.opened_at is not None:
+                if circuit.opened_at is None:
+                    print(f"⚠️ {host} failed {circuit.failures} times in a row; short-circuiting its requests")
+                circuit.opened_at = time.monotonic()
+
+    def trip(self, url: str):
+        """Opens `url`'s host circuit right away (e.g. after a failed preflight)."""
+        with self._lock:
+            circuit = self._circuits.setdefault(host_of(url), _Circuit())
+            circuit.failures = max(circuit.failures, self.threshold)
+            circuit.opened_at = time.monotonic()
+
+    def open_hosts(self) -> List[str]:
+        with self._lock:
+            return [host for host, c in self._circuits.items() if c.opened_at is not None]
+
+
+def preflight(url: str, timeout: float = PREFLIGHT_TIMEOUT) -> Optional[str]:
+    """
+    Checks that `url`'s host resolves and accepts TCP connections.
+
+    Returns None if it does, otherwise a short reason. Only the connection is
+    tested; HTTP-level problems are left for the checks to report.
+    """
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    host = parsed.hostname
+    if not host:
+        return f"Invalid URL: {url}"
+    port = parsed.port or (80 if parsed.scheme == "http" else 443)
+
+    deadline = time.monotonic() + timeout
+    # getaddrinfo takes no timeout, so it runs in a worker that is left behind
+    # if the resolver outlasts the budget
+    resolver = ThreadPoolExecutor(max_workers=1)
+    try:
+        addresses = resolver.submit(socket.getaddrinfo, host, port, type=socket.SOCK_STREAM).result(timeout=timeout)
+    except FutureTimeout:
+        return f"{host} could not be resolved (timed out after {timeout:g}s)"
+    except socket.gaierror as e:
+        return f"{host} could not be resolved ({e.strerror})"
+    finally:
+        resolver.shutdown(wait=False)
+
+    last_error = None
+    for family, socktype, proto, _, address in addresses:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            with socket.socket(family, socktype, proto) as sock:
+                sock.settimeout(remaining)
+                sock.connect(address)
+            return None
+        except OSError as e:
+            last_error = e
+    reason = "timed out" if last_error is None or isinstance(last_error, socket.timeout) else str(last_error)
+    return f"{host}:{port} is not accepting connections ({reason})"
+
+
+circuit_breaker = CircuitBreaker()
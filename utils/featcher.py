@@ -1,20 +1,27 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, WebDriverException
-import requests
+from utils.fetch_context import FetchContext
+from utils.page import Page, get_page
 
-def fetch_html_selenium(url: str) -> str:
-    # Try fallback using requests
+def fetch_page(url: str, fetch: FetchContext = None) -> Page:
+    """
+    Returns the scan's shared, parse-once Page for `url`.
+
+    A non-200 page comes back empty but keeps its response, so callers can tell
+    an error status (`page.response.status_code`) from a fetch that failed
+    outright (`page.response` is None).
+    """
+    fetch = fetch or FetchContext()
     try:
-        response = requests.get(url, timeout=10, headers={
-            "User-Agent": "Mozilla/5.0"
-        })
-        if response.status_code == 200:
-            print("✅ HTML fetched successfully via requests fallback")
-            return response.text
+        page = get_page(url, fetch)
+        if page.response.status_code == 200:
+            print("✅ HTML fetched successfully")
+            return page
         else:
-            print(f"⚠️ requests.get() failed with status {response.status_code}")
-    except Exception as fallback_error:
-        print(f"❌ requests fallback failed: {fallback_error}")
-    
-    return ""
+            print(f"⚠️ Fetching the page failed with status {page.response.status_code}")
+            return Page(url, "", response=page.response)
+    except Exception as fetch_error:
+        print(f"❌ Fetching the page failed: {fetch_error}")
+
+    return Page(url, "")
+
+def fetch_html_selenium(url: str, fetch: FetchContext = None) -> str:
+    return fetch_page(url, fetch).html
@@ -0,0 +1,421 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.http_cache import http_cache
+from utils.http_fetcher import FetchResult, check_url, http_fetcher, is_unresolvable
+from utils.host_limiter import host_limiter, host_of
+from utils.circuit_breaker import HostUnreachable, circuit_breaker
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; ARI-Scanner/1.0)"
+
+# Headers that never change what the server sends back, so they are left out
+# of the memo key. Every other request header is significant.
+IGNORED_HEADERS = {"accept-encoding", "connection", "keep-alive", "cache-control", "pragma", "referer"}
+
+# Session defaults the HTTP/2 client negotiates itself (it offers zstd and br,
+# requests only gzip/deflate/br), so they aren't passed on to it
+CLIENT_MANAGED_HEADERS = {"accept-encoding", "connection"}
+
+# Only safe methods are memoized; POST & co. always hit the network.
+CACHEABLE_METHODS = {"GET", "HEAD"}
+
+
+class DeadlineExceeded(requests.Timeout):
+    """A request was refused locally because the work that made it ran out of time."""
+
+
+class Deadline:
+    """
+    Cut-off for the requests of one piece of work, e.g. a sub-analyzer.
+
+    Set it with `current_deadline.set(...)`; threads and asyncio tasks started
+    from that context inherit it (ThreadPoolExecutor workers only when the
+    context is handed over, see contextvars.copy_context). Once it has passed,
+    or was cancelled, FetchContext refuses the work's requests with
+    DeadlineExceeded, so work nobody waits for any more winds down quickly.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.at = time.monotonic() + seconds if seconds is not None else None
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def passed(self) -> bool:
+        return self._cancelled or (self.at is not None and time.monotonic() >= self.at)
+
+
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+
+def deadline_passed() -> bool:
+    """Whether the work running in this context is out of time; long loops check it between steps."""
+    deadline = current_deadline.get()
+    return deadline is not None and deadline.passed()
+
+
+def _check_deadline(url: str):
+    if deadline_passed():
+        raise DeadlineExceeded(f"Out of time; not requesting {url}")
+
+
+class FetchContext:
+    """
+    Scan-scoped HTTP client shared by every auditor and analyzer of one scan.
+
+    GET/HEAD responses are memoized by (method, URL, redirect policy, significant
+    headers), and concurrent identical requests are merged so only the first
+    caller touches the network while the others wait for its result. Failures
+    are memoized too: a host that timed out once is not retried by every check.
+
+    Cacheable GETs also go through the cross-scan HTTP cache (utils.http_cache),
+    so a later scan of the same site revalidates instead of re-downloading.
+    Every request that does go out is paced per host by utils.host_limiter,
+    and refused outright while the host's circuit (utils.circuit_breaker) is open.
+
+    A context built for one pillar of a scan carries the scan's `scan_id`, so
+    services.scan_planner can share artifacts with the scan's other pillars.
+    """
+
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT, timeout: float = 10.0, pool_size: int = 32,
+                 scan_id: Optional[str] = None):
+        self.timeout = timeout
+        self.scan_id = scan_id
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": user_agent,
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+        # Analyzers used to get a fresh session each; keep them isolated by never
+        # persisting cookies between requests (redirect chains still carry them).
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._entries: Dict[Any, Future] = {}
+        self._stats = {
+            "requests_sent": 0, "responses_reused": 0, "cache_hits": 0, "cache_revalidated": 0,
+            "requests_throttled": 0, "throttle_wait_seconds": 0.0, "requests_short_circuited": 0,
+            "dns_lookups": 0, "dns_cache_hits": 0, "tls_handshakes": 0, "tls_cache_hits": 0,
+        }
+        self._unreachable_hosts = set()
+
+    # ------------------------------------------------------------------ keys
+
+    def _request_key(self, method: str, url: str, headers: Optional[dict], allow_redirects: bool):
+        merged = {k.lower(): v for k, v in self.session.headers.items()}
+        merged.update({k.lower(): v for k, v in (headers or {}).items()})
+        significant = tuple(sorted((k, v) for k, v in merged.items() if k not in IGNORED_HEADERS))
+        return ("http", method, url, allow_redirects, significant)
+
+    # ------------------------------------------------------------ single flight
+
+    def memo(self, key, factory: Callable[[], Any]):
+        """
+        Compute `factory()` once per scan for `key` and share the result.
+
+        Concurrent callers with the same key block on the first caller's result
+        instead of computing it again. Exceptions are shared the same way,
+        except DeadlineExceeded: only the caller that ran out of time is
+        refused, and the next caller computes the value afresh.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._entries[key] = Future()
+            elif key[0] == "http":
+                self._stats["responses_reused"] += 1
+
+        if owner:
+            try:
+                entry.set_result(factory())
+            except BaseException as e:
+                self._forget_refused(key, e)
+                entry.set_exception(e)
+        try:
+            return entry.result()
+        except DeadlineExceeded:
+            if owner or deadline_passed():
+                raise
+            return self.memo(key, factory)
+
+    async def amemo(self, key, factory: Callable[[], Any]):
+        """Async variant of `memo`: `factory` returns an awaitable, and waiting doesn't block the loop."""
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._entries[key] = Future()
+            elif key[0] == "afetch":
+                self._stats["responses_reused"] += 1
+
+        if owner:
+            try:
+                entry.set_result(await factory())
+            except BaseException as e:
+                self._forget_refused(key, e)
+                entry.set_exception(e)
+        try:
+            return await asyncio.wrap_future(entry)
+        except DeadlineExceeded:
+            if owner or deadline_passed():
+                raise
+            return await self.amemo(key, factory)
+
+    def _forget_refused(self, key, error: BaseException):
+        """Drops a memo entry whose computation ran out of time, so it isn't shared."""
+        if isinstance(error, DeadlineExceeded):
+            with self._lock:
+                self._entries.pop(key, None)
+
+    def _peek(self, key):
+        """Returns a finished memo entry's result without blocking, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or not entry.done() or entry.exception() is not None:
+            return None
+        return entry.result()
+
+    # ------------------------------------------------------------------ HTTP
+
+    def _record_wait(self, waited: float):
+        with self._lock:
+            self._stats["requests_sent"] += 1
+            # Waits this short are just lock and scheduling noise
+            if waited >= 0.01:
+                self._stats["requests_throttled"] += 1
+                self._stats["throttle_wait_seconds"] += waited
+
+    def _short_circuited(self, url: str):
+        with self._lock:
+            self._stats["requests_short_circuited"] += 1
+            self._unreachable_hosts.add(host_of(url))
+
+    @contextmanager
+    def _outbound(self, url: str, crawl: bool = False):
+        """
+        Admits one request to `url` for the `with` block: refuses it while the
+        host's circuit is open, paces it per host (on the bulk crawl budget
+        with `crawl`), and reports to the circuit breaker whether the host
+        answered. Requests made after the caller's deadline are refused.
+        """
+        _check_deadline(url)
+        try:
+            circuit_breaker.check(url)
+        except HostUnreachable:
+            self._short_circuited(url)
+            raise
+        with host_limiter.slot(url, crawl=crawl) as waited:
+            # The deadline may have passed while waiting for the slot
+            _check_deadline(url)
+            self._record_wait(waited)
+            reachable = True
+            try:
+                yield
+            except (requests.exceptions.SSLError, DeadlineExceeded):
+                # A bad certificate still means the host answered, and running
+                # out of time while reading says nothing about it
+                raise
+            except (requests.ConnectionError, requests.Timeout):
+                reachable = False
+                raise
+            finally:
+                circuit_breaker.record(url, reachable=reachable)
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        with self._outbound(url):
+            return self.session.request(method, url, **kwargs)
+
+    @contextmanager
+    def stream(self, url: str, headers: Optional[dict] = None, crawl: bool = False, **kwargs):
+        """
+        GETs `url` without reading the body and yields the response, for callers
+        that consume large bodies incrementally (`response.raw`).
+
+        Never memoized or cached. The host's request slot is held until the
+        block exits, and the response is closed then. Bulk crawls pass
+        `crawl=True` to be paced on the host's crawl budget.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        with self._outbound(url, crawl=crawl):
+            response = self.session.get(url, headers=headers, stream=True, **kwargs)
+            try:
+                yield response
+            finally:
+                response.close()
+
+    def count(self, stat: str):
+        """Adds one to a scan metric; checks use it to report work they saved or did."""
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _get_through_cache(self, url: str, headers: Optional[dict], allow_redirects: bool, **kwargs) -> requests.Response:
+        """GET via the shared HTTP cache: fresh entries are served, stale ones revalidated."""
+        key = http_cache.key_for(self._request_key("GET", url, headers, allow_redirects))
+        entry = http_cache.lookup(key)
+        if entry is not None and entry.fresh:
+            self.count("cache_hits")
+            if entry.unresolved:
+                raise requests.ConnectionError(f"Could not resolve host for {url} (cached)")
+            return entry.to_response()
+
+        validators = entry.validators if entry is not None and not entry.unresolved else {}
+        try:
+            response = self._send("GET", url, headers={**(headers or {}), **validators},
+                                  allow_redirects=allow_redirects, **kwargs)
+        except requests.ConnectionError as e:
+            if is_unresolvable(e):
+                http_cache.store_unresolved(key, url)
+            raise
+        if response.status_code == 304 and validators:
+            self.count("cache_revalidated")
+            return http_cache.refresh(key, entry, response.headers).to_response()
+        if not any(r.cookies for r in response.history):
+            http_cache.store(key, url, response.status_code, response.headers, response.content, response.url,
+                             response.encoding)
+        return response
+
+    def request(self, method: str, url: str, headers: Optional[dict] = None, allow_redirects: bool = True,
+                cache: bool = True, **kwargs) -> requests.Response:
+        """
+        Sends a request through the scan's shared session.
+
+        Pass `cache=False` for requests whose repetition is the point of the
+        check (e.g. rate-limit bursts); non-GET/HEAD requests are never cached.
+        """
+        method = method.upper()
+        send = lambda: self._send(method, url, headers=headers, allow_redirects=allow_redirects, **kwargs)
+        if not cache or method not in CACHEABLE_METHODS or kwargs.get("data") or kwargs.get("json"):
+            return send()
+
+        key = self._request_key(method, url, headers, allow_redirects)
+        if method == "HEAD":
+            # A finished GET for the same resource already answers a HEAD.
+            cached_get = self._peek(self._request_key("GET", url, headers, allow_redirects))
+            if cached_get is not None:
+                with self._lock:
+                    self._stats["responses_reused"] += 1
+                return cached_get
+        else:
+            send = lambda: self._get_through_cache(url, headers, allow_redirects, **kwargs)
+        return self.memo(key, send)
+
+    def get(self, url: str, headers: Optional[dict] = None, allow_redirects: bool = True, **kwargs) -> requests.Response:
+        return self.request("GET", url, headers=headers, allow_redirects=allow_redirects, **kwargs)
+
+    def head(self, url: str, headers: Optional[dict] = None, allow_redirects: bool = False, **kwargs) -> requests.Response:
+        return self.request("HEAD", url, headers=headers, allow_redirects=allow_redirects, **kwargs)
+
+    def post(self, url: str, headers: Optional[dict] = None, **kwargs) -> requests.Response:
+        return self.request("POST", url, headers=headers, **kwargs)
+
+    # ------------------------------------------------------------ async API
+
+    async def arequest(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Async variant for the asyncio-based analyzers; shares the same store."""
+        return await asyncio.to_thread(self.request, method, url, **kwargs)
+
+    async def aget(self, url: str, **kwargs) -> requests.Response:
+        return await self.arequest("GET", url, **kwargs)
+
+    async def afetch(self, url: str, method: str = "GET", headers: Optional[dict] = None, allow_redirects: bool = True,
+                     cache: bool = True, crawl: bool = False, **kwargs) -> FetchResult:
+        """
+        Fetches through the worker's shared HTTP/2 client (utils.http_fetcher).
+
+        Sends the scan's headers, memoizes like `request` and returns a
+        FetchResult: transport failures come back as `result.error` rather than
+        as exceptions, and bodies are capped in size. With `summarize=True` the
+        body is only summarized (FetchResult.summary), and such results bypass
+        the HTTP cache. Bulk crawls pass `crawl=True` to be paced on the host's
+        crawl budget.
+        """
+        try:
+            check_url(url)
+        except (httpx.InvalidURL, ValueError) as e:
+            # Before the host limiter and circuit breaker, which need the host
+            return FetchResult(url, error=f"{type(e).__name__}: {e}")
+        method = method.upper()
+        merged = {k: v for k, v in self.session.headers.items() if k.lower() not in CLIENT_MANAGED_HEADERS}
+        merged.update(headers or {})
+        kwargs.setdefault("timeout", self.timeout)
+
+        async def send(extra_headers: Optional[dict] = None):
+            _check_deadline(url)
+            if not circuit_breaker.allow(url):
+                self._short_circuited(url)
+                return FetchResult(url, error=f"HostUnreachable: {host_of(url)} is unreachable (circuit open)",
+                                   connection_failed=True)
+            async with host_limiter.aslot(url, crawl=crawl) as waited:
+                _check_deadline(url)
+                self._record_wait(waited)
+                result = await http_fetcher.fetch(url, method=method, headers={**merged, **(extra_headers or {})},
+                                                  follow_redirects=allow_redirects, **kwargs)
+            circuit_breaker.record(url, reachable=not result.connection_failed)
+            return result
+
+        try:
+            if not cache or method not in CACHEABLE_METHODS or kwargs.get("data") or kwargs.get("json"):
+                return await send()
+            # A body cut short by a smaller max_bytes, or only summarized, must not be served to other callers
+            key = ("afetch",) + self._request_key(method, url, headers, allow_redirects)[1:] + (
+                kwargs.get("max_bytes"), kwargs.get("summarize", False))
+            if method == "GET" and not kwargs.get("summarize"):
+                return await self.amemo(key, lambda: self._afetch_through_cache(url, headers, allow_redirects, send))
+            return await self.amemo(key, send)
+        except DeadlineExceeded as e:
+            return FetchResult(url, error=f"DeadlineExceeded: {e}")
+
+    async def _afetch_through_cache(self, url: str, headers: Optional[dict], allow_redirects: bool, send) -> FetchResult:
+        """Async counterpart of `_get_through_cache`; shares its cache entries."""
+        key = http_cache.key_for(self._request_key("GET", url, headers, allow_redirects))
+        entry = await asyncio.to_thread(http_cache.lookup, key)
+        if entry is not None and entry.fresh:
+            self.count("cache_hits")
+            if entry.unresolved:
+                return FetchResult(url, error=f"Could not resolve host for {url} (cached)", unresolved=True)
+            return entry.to_fetch_result(url)
+
+        validators = entry.validators if entry is not None and not entry.unresolved else {}
+        result = await send(validators)
+        if result.unresolved:
+            await asyncio.to_thread(http_cache.store_unresolved, key, url)
+        elif result.status_code == 304 and validators:
+            self.count("cache_revalidated")
+            entry = await asyncio.to_thread(http_cache.refresh, key, entry, result.headers)
+            return entry.to_fetch_result(url)
+        elif not result.error and not result.truncated:
+            await asyncio.to_thread(http_cache.store, key, url, result.status_code, result.headers, result.content,
+                                    result.url, result.encoding)
+        return result
+
+    # --------------------------------------------------------------- metrics
+
+    def unreachable_hosts(self) -> list:
+        """Hosts whose requests were short-circuited during this scan."""
+        with self._lock:
+            return sorted(self._unreachable_hosts)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["throttle_wait_seconds"] = round(stats["throttle_wait_seconds"], 3)
+        return stats
+
+    def close(self):
+        self.session.close()
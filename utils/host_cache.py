@@ -0,0 +1,107 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import redis
+
+from celery_app import REDIS_URL
+
+HOST_CACHE_ENABLED = os.getenv("HOST_CACHE_ENABLED", "1") == "1"
+# Entries kept in each worker process in front of Redis
+HOST_CACHE_LRU_SIZE = int(os.getenv("HOST_CACHE_LRU_SIZE", "4096"))
+# How long a DNS name without the record (NXDOMAIN/no answer) is remembered
+DNS_NEGATIVE_TTL = int(os.getenv("DNS_NEGATIVE_TTL", "300"))
+# Certificate metadata is kept until this long before the certificate expires,
+# and never longer than TLS_CACHE_MAX_AGE, in case it is replaced early
+TLS_CACHE_EXPIRY_MARGIN = int(os.getenv("TLS_CACHE_EXPIRY_MARGIN", str(3 * 86400)))
+TLS_CACHE_MAX_AGE = int(os.getenv("TLS_CACHE_MAX_AGE", str(7 * 86400)))
+# After a Redis error only the in-process tier is used for this many seconds
+REDIS_RETRY_AFTER = 30
+
+CACHE_KEY = "hostcache:{kind}:{key}"
+
+
+class HostCache:
+    """
+    Per-host facts shared by every scan: DNS answers and TLS certificate
+    metadata, so domains that are scanned again don't pay for them again.
+
+    An in-process LRU of HOST_CACHE_LRU_SIZE entries sits in front of Redis.
+    Every entry has its own lifetime, chosen by the caller (the record TTL for
+    DNS, time to near expiry for certificates), which both tiers honor. Like
+    the HTTP cache it fails open: while Redis is unreachable only the
+    in-process tier is used.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL, enabled: bool = HOST_CACHE_ENABLED,
+                 lru_size: int = HOST_CACHE_LRU_SIZE):
+        self.enabled = enabled
+        self.lru_size = lru_size
+        self._client = redis.Redis.from_url(redis_url)
+        self._lock = threading.Lock()
+        # key -> (expires_at, value), least recently used first
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self._down_until = 0.0
+
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _redis_failed(self, e: Exception):
+        with self._lock:
+            if time.monotonic() >= self._down_until:
+                print(f"⚠️ Host cache unavailable, using the in-process tier for {REDIS_RETRY_AFTER}s: {e}")
+            self._down_until = time.monotonic() + REDIS_RETRY_AFTER
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        with self._lock:
+            self._local[key] = (expires_at, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.lru_size:
+                self._local.popitem(last=False)
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        """The cached value for `key` of `kind` ("dns", "tls"), or None on a miss."""
+        if not self.enabled:
+            return None
+        name = CACHE_KEY.format(kind=kind, key=key.lower())
+        with self._lock:
+            entry = self._local.get(name)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._local.move_to_end(name)
+                    return entry[1]
+                del self._local[name]
+
+        if not self._redis_available():
+            return None
+        try:
+            raw = self._client.get(name)
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return None
+        if raw is None:
+            return None
+        stored = json.loads(raw)
+        self._remember(name, stored["expires_at"], stored["value"])
+        return stored["value"]
+
+    def set(self, kind: str, key: str, value: Any, ttl: float):
+        """Caches a JSON-serializable `value` for `ttl` seconds; nothing is stored for ttl <= 0."""
+        ttl = int(ttl)
+        if not self.enabled or ttl <= 0:
+            return
+        name = CACHE_KEY.format(kind=kind, key=key.lower())
+        expires_at = time.time() + ttl
+        self._remember(name, expires_at, value)
+        if not self._redis_available():
+            return
+        try:
+            self._client.set(name, json.dumps({"expires_at": expires_at, "value": value}), ex=ttl)
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+
+host_cache = HostCache()
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import redis
+
+from celery_app import REDIS_URL
+
+# Sustained requests per second to one host, and how many may go out back to back
+HOST_RATE_LIMIT = float(os.getenv("HOST_RATE_LIMIT", "5"))
+HOST_BURST = int(os.getenv("HOST_BURST", "10"))
+# Requests to one host that may be waiting on a response at the same time
+HOST_MAX_IN_FLIGHT = int(os.getenv("HOST_MAX_IN_FLIGHT", "6"))
+# Bulk crawls of the scanned site (sitemap files, the canonical tag sweep) are
+# paced by a budget of their own. With the limits above a 120-file sitemap took
+# ~22s and one pillar spent ~988s waiting in total, and the crawl's requests
+# held up every other check's. The trade-off: a host may now see both budgets
+# at once, up to HOST_RATE_LIMIT + HOST_CRAWL_RATE_LIMIT requests per second
+# and HOST_MAX_IN_FLIGHT + HOST_CRAWL_MAX_IN_FLIGHT open requests. Lower these
+# for sites that answer bursts with 429s or are known to be fragile.
+HOST_CRAWL_RATE_LIMIT = float(os.getenv("HOST_CRAWL_RATE_LIMIT", "20"))
+HOST_CRAWL_BURST = int(os.getenv("HOST_CRAWL_BURST", "40"))
+HOST_CRAWL_MAX_IN_FLIGHT = int(os.getenv("HOST_CRAWL_MAX_IN_FLIGHT", "16"))
+# Share each host's token bucket between all workers through Redis
+HOST_LIMITER_REDIS = os.getenv("HOST_LIMITER_REDIS", "0") == "1"
+# After a Redis error the in-process bucket is used for this many seconds
+REDIS_RETRY_AFTER = 30
+
+BUCKET_KEY = "ratelimit:{host}"
+CRAWL_BUCKET_KEY = "ratelimit:crawl:{host}"
+
+# Takes one token from a host's bucket if there is one; returns the seconds to
+# wait for the next token otherwise (0 when a token was taken). Uses the Redis
+# clock so workers with skewed clocks agree.
+TAKE_TOKEN = """
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+else
+    tokens = tokens - 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+# How often a request blocked on the in-flight cap checks for a free slot
+IN_FLIGHT_POLL = 0.05
+
+
+def host_of(url: str) -> str:
+    parsed = urlparse(url)
+    return (parsed.netloc or parsed.path).lower()
+
+
+class _Bucket:
+    def __init__(self, burst: int):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.in_flight = 0
+
+    def refill(self, rate: float, burst: int):
+        now = time.monotonic()
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+
+class HostLimiter:
+    """
+    Per-host token bucket plus a cap on requests in flight, so the checks of a
+    scan (and of concurrent scans) don't hammer the site they audit.
+
+    Each outbound request holds a slot for as long as it runs. Requests made
+    with `crawl=True` (bulk crawls) draw on a separate, larger budget per host,
+    so they neither queue behind nor starve the scan's other requests. With
+    HOST_LIMITER_REDIS the token buckets live in Redis and are shared by every
+    worker; the in-flight cap is always per process. Callers get back how long
+    they waited, which FetchContext reports in the scan metrics.
+    """
+
+    def __init__(self, rate: float = HOST_RATE_LIMIT, burst: int = HOST_BURST, max_in_flight: int = HOST_MAX_IN_FLIGHT,
+                 crawl_rate: float = HOST_CRAWL_RATE_LIMIT, crawl_burst: int = HOST_CRAWL_BURST,
+                 crawl_max_in_flight: int = HOST_CRAWL_MAX_IN_FLIGHT,
+                 use_redis: bool = HOST_LIMITER_REDIS, redis_url: str = REDIS_URL):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.crawl_rate = crawl_rate
+        self.crawl_burst = crawl_burst
+        self.crawl_max_in_flight = crawl_max_in_flight
+        self._lock = threading.Lock()
+        # (host, crawl) -> bucket
+        self._buckets: Dict[Tuple[str, bool], _Bucket] = {}
+        self._client = redis.Redis.from_url(redis_url) if use_redis else None
+        self._take_token = self._client.register_script(TAKE_TOKEN) if use_redis else None
+        self._redis_down_until = 0.0
+
+    # ------------------------------------------------------------ accounting
+
+    def _limits(self, crawl: bool) -> Tuple[float, int, int]:
+        """(rate, burst, max in flight) of the crawl budget or the default one."""
+        if crawl:
+            return self.crawl_rate, self.crawl_burst, self.crawl_max_in_flight
+        return self.rate, self.burst, self.max_in_flight
+
+    def _shared_token_wait(self, host: str, crawl: bool) -> Optional[float]:
+        """Seconds until the shared bucket has a token (0 if one was taken), or None to use the local bucket."""
+        if self._take_token is None or time.monotonic() < self._redis_down_until:
+            return None
+        rate, burst, _ = self._limits(crawl)
+        key = (CRAWL_BUCKET_KEY if crawl else BUCKET_KEY).format(host=host)
+        try:
+            return float(self._take_token(keys=[key], args=[rate, burst]))
+        except redis.RedisError as e:
+            print(f"⚠️ Shared rate limiter unavailable, limiting per process for {REDIS_RETRY_AFTER}s: {e}")
+            self._redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+            return None
+
+    def _try_acquire(self, host: str, crawl: bool) -> float:
+        """
+        Takes an in-flight slot and a token for `host` and returns 0, or returns
+        how long to wait before trying again if either isn't available.
+        """
+        rate, burst, max_in_flight = self._limits(crawl)
+        with self._lock:
+            bucket = self._buckets.setdefault((host, crawl), _Bucket(burst))
+            if bucket.in_flight >= max_in_flight:
+                return IN_FLIGHT_POLL
+            bucket.in_flight += 1
+
+        wait = self._shared_token_wait(host, crawl)
+        with self._lock:
+            if wait is None:
+                bucket.refill(rate, burst)
+                if bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    wait = 0.0
+                else:
+                    wait = (1 - bucket.tokens) / rate
+            if wait > 0:
+                bucket.in_flight -= 1
+            return wait
+
+    def _release(self, host: str, crawl: bool):
+        rate, burst, _ = self._limits(crawl)
+        with self._lock:
+            bucket = self._buckets[(host, crawl)]
+            bucket.in_flight -= 1
+            if bucket.in_flight == 0:
+                bucket.refill(rate, burst)
+                if bucket.tokens >= burst:
+                    # Idle with a full bucket: no different from a new one
+                    del self._buckets[(host, crawl)]
+
+    # ----------------------------------------------------------------- slots
+
+    @contextmanager
+    def slot(self, url: str, crawl: bool = False):
+        """
+        Holds a request slot for `url`'s host for the `with` block; yields the
+        seconds waited for it. `crawl` draws on the bulk crawl budget.
+        """
+        host = host_of(url)
+        started = time.monotonic()
+        while True:
+            wait = self._try_acquire(host, crawl)
+            if not wait:
+                break
+            time.sleep(wait)
+        try:
+            yield time.monotonic() - started
+        finally:
+            self._release(host, crawl)
+
+    @asynccontextmanager
+    async def aslot(self, url: str, crawl: bool = False):
+        """Async variant of `slot`; waiting doesn't block the event loop."""
+        host = host_of(url)
+        started = time.monotonic()
+        while True:
+            if self._take_token:
+                wait = await asyncio.to_thread(self._try_acquire, host, crawl)
+            else:
+                wait = self._try_acquire(host, crawl)
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+        try:
+            yield time.monotonic() - started
+        finally:
+            self._release(host, crawl)
+
+
+host_limiter = HostLimiter()
@@ -0,0 +1,255 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from http.client import responses as REASONS
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+import httpx
+import redis
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from celery_app import REDIS_URL
+from utils.http_fetcher import FetchResult
+
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "1") == "1"
+# Entries that have validators are kept this long after they go stale, so a
+# later scan can revalidate them instead of downloading them again
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "86400"))
+# How long a missing well-known resource (404/410 or unresolvable host) is remembered
+HTTP_CACHE_NEGATIVE_TTL = int(os.getenv("HTTP_CACHE_NEGATIVE_TTL", "600"))
+# Larger bodies are never stored
+HTTP_CACHE_MAX_BODY = int(os.getenv("HTTP_CACHE_MAX_BODY", str(2 * 1024 * 1024)))
+# After a Redis error the cache is bypassed for this many seconds
+REDIS_RETRY_AFTER = 30
+
+CACHE_KEY = "httpcache:{digest}"
+
+# Resources every scan probes for, whose absence is worth remembering
+WELL_KNOWN_PATHS = {
+    "/robots.txt", "/sitemap.xml", "/llms.txt", "/llms-full.txt", "/llm.txt",
+    "/openapi.json", "/api.json", "/api/docs.json",
+}
+WELL_KNOWN_PREFIX = "/.well-known/"
+
+# Statuses a cache may store without explicit freshness information (RFC 9111 §4.2.2)
+HEURISTICALLY_CACHEABLE = {200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501}
+# Body-framing headers describe the bytes on the wire, not the decoded body we store
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+# Headers a 304 may update on the stored response
+REFRESHED_HEADERS = {"cache-control", "date", "expires", "etag", "last-modified", "age", "vary"}
+
+
+def is_well_known(url: str) -> bool:
+    path = urlparse(url).path or "/"
+    return path in WELL_KNOWN_PATHS or path.startswith(WELL_KNOWN_PREFIX)
+
+
+def _cache_control(headers: Mapping[str, str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in (headers.get("cache-control") or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(status: int, headers: Mapping[str, str]) -> Optional[int]:
+    """
+    Seconds a response stays fresh, per Cache-Control/Expires or the
+    Last-Modified heuristic; None if it must not be stored at all.
+    """
+    directives = _cache_control(headers)
+    if "no-store" in directives or headers.get("vary", "").strip() == "*":
+        return None
+    if "no-cache" in directives:
+        return 0
+
+    age = int(headers.get("age", "0")) if headers.get("age", "").isdigit() else 0
+    for name in ("s-maxage", "max-age"):
+        value = directives.get(name)
+        if value is not None and value.isdigit():
+            return max(0, int(value) - age)
+
+    date = _http_date(headers.get("date")) or time.time()
+    expires = headers.get("expires")
+    if expires is not None:
+        # An invalid Expires (e.g. "0") means already expired
+        expires_at = _http_date(expires)
+        return max(0, int(expires_at - date) - age) if expires_at else 0
+
+    last_modified = _http_date(headers.get("last-modified"))
+    if status in HEURISTICALLY_CACHEABLE and last_modified and last_modified < date:
+        return min(int((date - last_modified) / 10), HTTP_CACHE_MAX_AGE)
+    return 0
+
+
+class CachedEntry:
+    """A stored response: its metadata plus the decoded body."""
+
+    def __init__(self, meta: Dict[str, Any], body: bytes):
+        self.meta = meta
+        self.body = body
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.meta["fresh_until"]
+
+    @property
+    def unresolved(self) -> bool:
+        """The entry records that the host didn't resolve rather than a response."""
+        return self.meta.get("unresolved", False)
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers that revalidate this entry."""
+        headers = CaseInsensitiveDict(self.meta.get("headers", {}))
+        conditional = {}
+        if headers.get("etag"):
+            conditional["If-None-Match"] = headers["etag"]
+        if headers.get("last-modified"):
+            conditional["If-Modified-Since"] = headers["last-modified"]
+        return conditional
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.meta["status"]
+        response.reason = REASONS.get(response.status_code, "")
+        response.headers = CaseInsensitiveDict(self.meta["headers"])
+        response.url = self.meta["url"]
+        response.encoding = self.meta.get("encoding")
+        response._content = self.body
+        return response
+
+    def to_fetch_result(self, requested_url: str) -> FetchResult:
+        return FetchResult(
+            requested_url,
+            status_code=self.meta["status"],
+            headers=httpx.Headers(self.meta["headers"]),
+            url=self.meta["url"],
+            content=self.body,
+            encoding=self.meta.get("encoding"),
+        )
+
+
+class HttpCache:
+    """
+    Redis-backed HTTP cache shared by every scan.
+
+    Honors Cache-Control/Expires (falling back to the Last-Modified heuristic),
+    keeps stale entries that carry an ETag or Last-Modified so they can be
+    revalidated with If-None-Match/If-Modified-Since, and stores bodies zlib
+    compressed. 404/410 responses and unresolvable hosts for well-known paths
+    (robots.txt, llms.txt, /.well-known/*, ...) are cached for
+    HTTP_CACHE_NEGATIVE_TTL seconds.
+
+    The cache fails open: while Redis is unreachable every lookup is a miss.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL, enabled: bool = HTTP_CACHE_ENABLED):
+        self.enabled = enabled
+        self._client = redis.Redis.from_url(redis_url)
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+
+    @staticmethod
+    def key_for(request_key) -> str:
+        return CACHE_KEY.format(digest=hashlib.sha256(repr(request_key).encode()).hexdigest())
+
+    def _available(self) -> bool:
+        return self.enabled and time.monotonic() >= self._down_until
+
+    def _redis_failed(self, e: Exception):
+        with self._lock:
+            if time.monotonic() >= self._down_until:
+                print(f"⚠️ HTTP cache unavailable, bypassing it for {REDIS_RETRY_AFTER}s: {e}")
+            self._down_until = time.monotonic() + REDIS_RETRY_AFTER
+
+    # --------------------------------------------------------------- reads
+
+    def lookup(self, key: str) -> Optional[CachedEntry]:
+        if not self._available():
+            return None
+        try:
+            stored = self._client.hgetall(key)
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return None
+        if not stored or b"meta" not in stored:
+            return None
+        body = stored.get(b"body")
+        return CachedEntry(json.loads(stored[b"meta"]), zlib.decompress(body) if body else b"")
+
+    # -------------------------------------------------------------- writes
+
+    def _write(self, key: str, meta: Dict[str, Any], body: bytes, ttl: int):
+        if not self._available() or ttl <= 0:
+            return
+        try:
+            pipe = self._client.pipeline()
+            pipe.delete(key)
+            pipe.hset(key, mapping={"meta": json.dumps(meta), "body": zlib.compress(body, 6)})
+            pipe.expire(key, ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    def store(self, key: str, requested_url: str, status: int, headers: Mapping[str, str], body: bytes,
+              final_url: str, encoding: Optional[str] = None) -> bool:
+        """Stores a response if it may be cached; returns whether it was."""
+        if len(body) > HTTP_CACHE_MAX_BODY or headers.get("set-cookie"):
+            # Responses that set cookies are per-visitor; never share them
+            return False
+
+        if status in (404, 410) and is_well_known(requested_url):
+            fresh_for = max(freshness_lifetime(status, headers) or 0, HTTP_CACHE_NEGATIVE_TTL)
+            ttl = fresh_for
+        else:
+            fresh_for = freshness_lifetime(status, headers)
+            if fresh_for is None or status not in HEURISTICALLY_CACHEABLE:
+                return False
+            has_validators = bool(headers.get("etag") or headers.get("last-modified"))
+            ttl = max(fresh_for, HTTP_CACHE_MAX_AGE) if has_validators else fresh_for
+
+        meta = {
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS},
+            "url": final_url,
+            "encoding": encoding,
+            "fresh_until": time.time() + fresh_for,
+        }
+        self._write(key, meta, body, ttl)
+        return ttl > 0
+
+    def refresh(self, key: str, entry: CachedEntry, headers: Mapping[str, str]) -> CachedEntry:
+        """Applies a 304's headers to a stored entry, re-stores it and returns it."""
+        merged = CaseInsensitiveDict(entry.meta["headers"])
+        for name, value in headers.items():
+            if name.lower() in REFRESHED_HEADERS:
+                merged[name] = value
+        fresh_for = freshness_lifetime(entry.meta["status"], merged) or 0
+        meta = dict(entry.meta, headers=dict(merged), fresh_until=time.time() + fresh_for)
+        refreshed = CachedEntry(meta, entry.body)
+        self._write(key, meta, entry.body, max(fresh_for, HTTP_CACHE_MAX_AGE))
+        return refreshed
+
+    def store_unresolved(self, key: str, requested_url: str):
+        """Remembers that a well-known resource's host didn't resolve."""
+        if is_well_known(requested_url):
+            meta = {"unresolved": True, "url": requested_url, "fresh_until": time.time() + HTTP_CACHE_NEGATIVE_TTL}
+            self._write(key, meta, b"", HTTP_CACHE_NEGATIVE_TTL)
+
+
+http_cache = HttpCache()
@@ -0,0 +1,335 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import socket
+import ssl
+import threading
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import httpx
+import requests
+
+# Bodies are cut off (and flagged as truncated) past this many decoded bytes
+MAX_BODY_BYTES = int(os.getenv("FETCH_MAX_BODY_BYTES", str(5 * 1024 * 1024)))
+DEFAULT_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "10"))
+# Connections kept open per worker process, and for how long an idle one is kept
+MAX_CONNECTIONS = int(os.getenv("FETCH_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.getenv("FETCH_MAX_KEEPALIVE", "32"))
+KEEPALIVE_EXPIRY = float(os.getenv("FETCH_KEEPALIVE_EXPIRY", "30"))
+# Leading bytes of a summarized body that are kept verbatim
+SUMMARY_HEAD_BYTES = 500
+
+START_TAG = re.compile(rb"<([A-Za-z][A-Za-z0-9:-]*)")
+# A "<" this close to the end of a chunk may start a tag name the next chunk finishes
+TAG_CARRY_BYTES = 64
+
+# httpx logs every request at INFO; the analyzers log their own outcomes
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def _causes(exc: BaseException):
+    """`exc` and every exception it was raised from or wraps, each once."""
+    seen = set()
+    stack = [exc]
+    while stack:
+        current = stack.pop()
+        if current is None or id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        stack.extend([current.__cause__, current.__context__])
+        # urllib3 keeps the cause in .reason or args; on ssl errors .reason is a string
+        linked = [getattr(current, "reason", None), *getattr(current, "args", ())]
+        stack.extend(e for e in linked if isinstance(e, BaseException))
+
+
+def is_unresolvable(exc: BaseException) -> bool:
+    """True if `exc` (from requests or httpx) was caused by the host name not resolving."""
+    for cause in _causes(exc):
+        if isinstance(cause, socket.gaierror):
+            return cause.errno in (socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME))
+    return False
+
+
+def is_tls_failure(exc: BaseException) -> bool:
+    """
+    True if `exc` (from requests or httpx) is a failed TLS handshake, e.g. a
+    bad certificate. The host did answer, so it isn't a connection failure.
+    """
+    return any(isinstance(cause, ssl.SSLError) for cause in _causes(exc))
+
+
+def check_url(url: str):
+    """
+    Raises httpx.InvalidURL or ValueError for a URL that can't be requested at
+    all: control characters, a bad host or an invalid or out-of-range port.
+    """
+    httpx.URL(url)
+    urlparse(url).port
+
+
+def _tls_details(response: httpx.Response) -> Optional[dict]:
+    """Protocol, cipher and certificate of the TLS connection `response` came over; None for plain HTTP."""
+    stream = response.extensions.get("network_stream")
+    ssl_object = stream.get_extra_info("ssl_object") if stream is not None else None
+    if ssl_object is None:
+        return None
+    # Only verified certificates are decoded; the client always verifies
+    cert = ssl_object.getpeercert() or {}
+    cipher = ssl_object.cipher()
+    return {
+        "protocol": ssl_object.version(),
+        "cipher": cipher[0] if cipher else None,
+        "not_after": cert.get("notAfter"),
+        "issuer": dict(field for rdn in cert.get("issuer", ()) for field in rdn).get("organizationName"),
+    }
+
+
+class BodySummary:
+    """
+    Summary of a body built while it streams in, so the body itself is never
+    held in memory: byte length, SHA-256, the first SUMMARY_HEAD_BYTES bytes
+    and a structural fingerprint (hash of the start tag name sequence, i.e.
+    the markup without its text). Everything runs on raw bytes at C speed,
+    since it runs on the fetcher's shared loop.
+    """
+
+    def __init__(self):
+        self.length = 0
+        self.head = bytearray()
+        self.tags = 0
+        self._sha256 = hashlib.sha256()
+        self._structure = hashlib.sha1()
+        self._carry = b""
+
+    def _scan_tags(self, data: bytes):
+        names = START_TAG.findall(data)
+        if names:
+            self.tags += len(names)
+            self._structure.update(b"/".join(names).lower() + b"/")
+
+    def update(self, chunk: bytes):
+        self.length += len(chunk)
+        if len(self.head) < SUMMARY_HEAD_BYTES:
+            self.head += chunk[:SUMMARY_HEAD_BYTES - len(self.head)]
+        self._sha256.update(chunk)
+
+        data = self._carry + chunk
+        cut = data.rfind(b"<", max(0, len(data) - TAG_CARRY_BYTES))
+        if cut == -1:
+            self._carry = b""
+            self._scan_tags(data)
+        else:
+            self._carry = data[cut:]
+            self._scan_tags(data[:cut])
+
+    def as_dict(self) -> dict:
+        self._scan_tags(self._carry)
+        self._carry = b""
+        return {
+            "length": self.length,
+            "sha256": self._sha256.hexdigest(),
+            "structure": self._structure.hexdigest()[:16],
+            "tag_count": self.tags,
+            "head": self.head.decode("utf-8", errors="replace"),
+        }
+
+
+class FetchResult:
+    """
+    Outcome of one fetch, with the same reading surface as a requests.Response
+    (status_code, headers, url, content, text, json()).
+
+    When no response arrived at all, `error` says why and `status_code` is
+    None, so a failed fetch can't be mistaken for an empty page.
+    `connection_failed` marks connect errors and timeouts (the host didn't
+    answer), and `unresolved` a host that doesn't exist. `tls` describes the
+    TLS connection the final response came over (protocol, cipher,
+    certificate expiry and issuer), if any. Summarized fetches carry a
+    BodySummary dict in `summary` and no `content`.
+    """
+
+    def __init__(self, requested_url: str, status_code: Optional[int] = None, headers: Optional[httpx.Headers] = None,
+                 url: Optional[str] = None, content: bytes = b"", encoding: Optional[str] = None,
+                 http_version: Optional[str] = None, elapsed: float = 0.0, ttfb: float = 0.0,
+                 truncated: bool = False, error: Optional[str] = None, connection_failed: bool = False,
+                 unresolved: bool = False, tls: Optional[dict] = None, summary: Optional[dict] = None):
+        self.requested_url = requested_url
+        self.status_code = status_code
+        self.headers = headers if headers is not None else httpx.Headers()
+        self.url = url or requested_url
+        self.content = content
+        self.encoding = encoding
+        self.http_version = http_version
+        self.elapsed = elapsed
+        self.ttfb = ttfb
+        self.truncated = truncated
+        self.error = error
+        self.connection_failed = connection_failed or unresolved
+        self.unresolved = unresolved
+        self.tls = tls
+        self.summary = summary
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status_code is not None and self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        """Like requests' raise_for_status: raises for a failed fetch or a 4xx/5xx status."""
+        if self.error is not None:
+            raise requests.ConnectionError(f"Failed to fetch {self.requested_url}: {self.error}")
+        if self.status_code >= 400:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.HTTPError(f"{self.status_code} {kind} Error for url: {self.url}")
+
+    def __repr__(self):
+        return f"<FetchResult {self.status_code or self.error} {self.url}>"
+
+
+class HttpFetcher:
+    """
+    Worker-lifetime async HTTP client (httpx, HTTP/2, keep-alive).
+
+    One `httpx.AsyncClient` lives on a dedicated event loop thread for as long
+    as the worker process runs, so every analyzer, whatever thread or loop it
+    runs on, reuses the same connection pool. gzip, br and zstd bodies are
+    decoded transparently, and reading stops after `max_bytes`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._thread = None
+        self._client = None
+
+    # ------------------------------------------------------------ lifecycle
+
+    def start(self):
+        """Starts the loop thread and client; a no-op if already running in this process."""
+        with self._lock:
+            # A forked pool child inherits the object but not the loop thread
+            if self._loop is not None and self._pid == os.getpid():
+                return
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="http-fetcher", daemon=True)
+            thread.start()
+
+            self._pid = os.getpid()
+            self._loop, self._thread = loop, thread
+            self._client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+                # Scans must not leak cookies into each other
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            )
+
+    def stop(self):
+        """Closes the client's connections and stops the loop thread."""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            loop, thread, client = self._loop, self._thread, self._client
+            self._loop = self._thread = self._client = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+
+    # --------------------------------------------------------------- access
+
+    async def fetch(self, url: str, method: str = "GET", headers: Optional[dict] = None, follow_redirects: bool = True,
+                    timeout: float = DEFAULT_TIMEOUT, max_bytes: int = MAX_BODY_BYTES, summarize: bool = False,
+                    **kwargs) -> FetchResult:
+        """
+        Fetches `url` from any event loop. Never raises for network errors; see FetchResult.error.
+
+        With `summarize`, the body is reduced to a BodySummary as it streams
+        in instead of being kept; `max_bytes` still bounds how much is read.
+        """
+        return await asyncio.wrap_future(
+            self._submit(method, url, headers, follow_redirects, timeout, max_bytes, summarize, kwargs)
+        )
+
+    def fetch_sync(self, url: str, method: str = "GET", headers: Optional[dict] = None, follow_redirects: bool = True,
+                   timeout: float = DEFAULT_TIMEOUT, max_bytes: int = MAX_BODY_BYTES, summarize: bool = False,
+                   **kwargs) -> FetchResult:
+        """Blocking variant of `fetch` for code that isn't async."""
+        return self._submit(method, url, headers, follow_redirects, timeout, max_bytes, summarize, kwargs).result()
+
+    def _submit(self, method, url, headers, follow_redirects, timeout, max_bytes, summarize, kwargs):
+        self.start()
+        with self._lock:
+            loop, client = self._loop, self._client
+        coro = self._fetch(client, method, url, headers, follow_redirects, timeout, max_bytes, summarize, kwargs)
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    @staticmethod
+    async def _fetch(client: httpx.AsyncClient, method: str, url: str, headers: Optional[dict], follow_redirects: bool,
+                     timeout: float, max_bytes: int, summarize: bool, kwargs: dict) -> FetchResult:
+        started = time.monotonic()
+        try:
+            check_url(url)
+            async with client.stream(method, url, headers=headers, follow_redirects=follow_redirects,
+                                     timeout=timeout, **kwargs) as response:
+                ttfb = time.monotonic() - started
+                tls = _tls_details(response)
+                body = bytearray()
+                summary = BodySummary() if summarize else None
+                truncated = False
+                async for chunk in response.aiter_bytes():
+                    if summary is not None:
+                        remaining = max_bytes - summary.length
+                        summary.update(chunk[:remaining])
+                        if len(chunk) > remaining:
+                            truncated = True
+                            break
+                        continue
+                    body += chunk
+                    if len(body) > max_bytes:
+                        del body[max_bytes:]
+                        truncated = True
+                        break
+                return FetchResult(
+                    url,
+                    status_code=response.status_code,
+                    headers=response.headers,
+                    url=str(response.url),
+                    content=bytes(body),
+                    encoding=response.charset_encoding,
+                    http_version=response.http_version,
+                    elapsed=round(time.monotonic() - started, 3),
+                    ttfb=round(ttfb, 3),
+                    truncated=truncated,
+                    tls=tls,
+                    summary=summary.as_dict() if summary is not None else None,
+                )
+        except (httpx.HTTPError, httpx.InvalidURL, ValueError) as e:
+            # InvalidURL and ValueError: see check_url
+            return FetchResult(url, elapsed=round(time.monotonic() - started, 3), error=f"{type(e).__name__}: {e}",
+                               connection_failed=(isinstance(e, (httpx.ConnectError, httpx.TimeoutException))
+                                                  and not is_tls_failure(e)),
+                               unresolved=is_unresolvable(e))
+
+
+http_fetcher = HttpFetcher()
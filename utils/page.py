@@ -0,0 +1,149 @@
+import asyncio
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from utils.fetch_context import DeadlineExceeded, FetchContext, deadline_passed
+
+
+class Page:
+    """
+    Parse-once view of a fetched HTML document.
+
+    The tree, lowercased markup, visible text and tag indexes are built lazily on
+    first access and then shared by every check that receives the page, so a
+    document is parsed a single time per scan no matter how many checks read it.
+    """
+
+    def __init__(self, url: str, html: str, response=None, parser: str = "lxml"):
+        self.url = url
+        self.html = html or ""
+        self.response = response
+        self.parser = parser
+        self._lock = threading.RLock()
+        self._soup = None
+        self._html_lower = None
+        self._text = None
+        self._elements = None
+        self._by_name: Optional[Dict[str, list]] = None
+        self._json_ld = None
+
+    # ------------------------------------------------------------ raw views
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        with self._lock:
+            if self._soup is None:
+                self._soup = BeautifulSoup(self.html, self.parser)
+            return self._soup
+
+    @property
+    def html_lower(self) -> str:
+        if self._html_lower is None:
+            self._html_lower = self.html.lower()
+        return self._html_lower
+
+    @property
+    def text(self) -> str:
+        """Visible text of the document, whitespace-joined."""
+        with self._lock:
+            if self._text is None:
+                self._text = self.soup.get_text(separator=' ', strip=True)
+            return self._text
+
+    # ------------------------------------------------------------ tag index
+
+    def _build_index(self):
+        with self._lock:
+            if self._by_name is None:
+                elements = self.soup.find_all(True)
+                by_name = {}
+                for tag in elements:
+                    by_name.setdefault(tag.name, []).append(tag)
+                self._elements = elements
+                self._by_name = by_name
+
+    @property
+    def elements(self) -> list:
+        """Every element of the document in document order."""
+        self._build_index()
+        return self._elements
+
+    def find_all(self, *names: str) -> list:
+        """Elements with any of the given tag names, in document order."""
+        self._build_index()
+        if len(names) == 1:
+            return list(self._by_name.get(names[0], []))
+        wanted = set(names)
+        return [tag for tag in self._elements if tag.name in wanted]
+
+    def find(self, name: str):
+        """First element with the given tag name, or None."""
+        self._build_index()
+        tags = self._by_name.get(name)
+        return tags[0] if tags else None
+
+    def count(self, name: str) -> int:
+        self._build_index()
+        return len(self._by_name.get(name, []))
+
+    @property
+    def links(self) -> list:
+        """All <a> elements that carry an href."""
+        return [a for a in self.find_all("a") if a.has_attr("href")]
+
+    @property
+    def images(self) -> list:
+        return self.find_all("img")
+
+    @property
+    def forms(self) -> list:
+        return self.find_all("form")
+
+    @property
+    def headings(self) -> List[Tuple[int, str]]:
+        """(level, text) for every <h1>-<h6>, in document order."""
+        return [(int(tag.name[1]), tag.text.strip()) for tag in self.find_all("h1", "h2", "h3", "h4", "h5", "h6")]
+
+    @property
+    def json_ld_scripts(self) -> list:
+        return [s for s in self.find_all("script") if s.get("type") == "application/ld+json"]
+
+    @property
+    def json_ld(self) -> list:
+        """Parsed JSON-LD entities from every ld+json script; top-level arrays are flattened."""
+        with self._lock:
+            if self._json_ld is None:
+                entities = []
+                for tag in self.json_ld_scripts:
+                    try:
+                        parsed = json.loads(tag.string)
+                    except Exception:
+                        continue
+                    if isinstance(parsed, list):
+                        entities.extend(parsed)
+                    else:
+                        entities.append(parsed)
+                self._json_ld = entities
+            return self._json_ld
+
+
+def get_page(url: str, fetch: FetchContext, timeout: float = 10) -> Page:
+    """
+    Fetches `url` through the scan's fetch context and returns its shared Page.
+
+    The response (a FetchResult) is not status-checked; callers that care use
+    `page.response`. A fetch that got no response at all raises
+    requests.ConnectionError.
+    """
+    def load():
+        response = asyncio.run(fetch.afetch(url, timeout=timeout))
+        if response.error is not None:
+            if deadline_passed():
+                # Not shared with other checks: only this caller ran out of time
+                raise DeadlineExceeded(response.error)
+            response.raise_for_status()
+        return Page(url, response.text, response=response)
+    return fetch.memo(("page", url), load)
@@ -0,0 +1,139 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlparse
+
+# Characters left as-is when paths and rule patterns are normalized for comparison
+SAFE_PATH_CHARS = "/?=&:@!$'()*+,;~"
+
+
+def _normalize(path: str) -> str:
+    """Percent-encodes a path or pattern the same way, so %7E and ~ compare equal."""
+    return quote(unquote(path), safe=SAFE_PATH_CHARS)
+
+
+def _path_of(url: str) -> str:
+    parsed = urlparse(url)
+    path = parsed.path or "/"
+    if parsed.query:
+        path += "?" + parsed.query
+    return _normalize(path)
+
+
+def product_token(user_agent: str) -> str:
+    """The crawler name robots.txt groups are matched on: "GPTBot/1.0 (...)" -> "gptbot"."""
+    return user_agent.strip().split("/", 1)[0].split(" ", 1)[0].lower()
+
+
+class _RuleSet:
+    """
+    One group's Allow/Disallow rules, compiled for matching.
+
+    Plain prefix rules go into a character trie, so a path is matched against
+    all of them in one walk; rules with `*` or a trailing `$` become regexes.
+    The longest matching pattern wins and Allow wins ties (RFC 9309).
+    """
+
+    # Trie key holding the verdict of a rule ending at that node; can't clash with a character
+    _END = ""
+
+    def __init__(self, rules: List[Tuple[bool, str]]):
+        self._trie: dict = {}
+        self._patterns: List[Tuple[int, bool, re.Pattern]] = []
+        for allow, pattern in rules:
+            if "*" in pattern or pattern.endswith("$"):
+                anchored = pattern.endswith("$")
+                body = pattern[:-1] if anchored else pattern
+                regex = ".*".join(re.escape(part) for part in body.split("*")) + ("$" if anchored else "")
+                self._patterns.append((len(pattern), allow, re.compile(regex)))
+                continue
+            node = self._trie
+            for char in pattern:
+                node = node.setdefault(char, {})
+            # Allow wins over a Disallow of the same path
+            node[self._END] = node.get(self._END, False) or allow
+
+    def allowed(self, path: str) -> bool:
+        # (length of the longest matching pattern, its verdict); True > False breaks ties
+        best = (-1, True)
+        node = self._trie
+        for depth, char in enumerate(path, 1):
+            node = node.get(char)
+            if node is None:
+                break
+            if self._END in node:
+                best = (depth, node[self._END])
+        for length, allow, regex in self._patterns:
+            if (length, allow) > best and regex.match(path):
+                best = (length, allow)
+        return best[1]
+
+
+class RobotsRules:
+    """
+    A parsed robots.txt, compiled once and queried in bulk.
+
+    Groups are matched on the crawler's product token (case-insensitive),
+    falling back to the `*` group; groups naming the same agent are merged.
+    Without a matching group everything is allowed, and so is /robots.txt.
+    """
+
+    def __init__(self, groups: Dict[str, List[Tuple[bool, str]]], sitemaps: Optional[List[str]] = None):
+        self._groups = {agent: _RuleSet(rules) for agent, rules in groups.items()}
+        self.sitemaps = sitemaps or []
+
+    @classmethod
+    def parse(cls, content: str) -> "RobotsRules":
+        groups: Dict[str, List[Tuple[bool, str]]] = {}
+        sitemaps = []
+        agents: List[str] = []
+        in_rules = False
+        for line in content.splitlines():
+            line = line.split("#", 1)[0].strip()
+            field, sep, value = line.partition(":")
+            if not sep:
+                continue
+            field, value = field.strip().lower(), value.strip()
+            if field == "user-agent":
+                if in_rules:
+                    # A user-agent line after rules starts a new group
+                    agents, in_rules = [], False
+                agents.append(product_token(value) or "*")
+                groups.setdefault(agents[-1], [])
+            elif field in ("allow", "disallow"):
+                in_rules = True
+                # An empty Disallow allows everything and adds no rule
+                if value:
+                    for agent in agents:
+                        groups[agent].append((field == "allow", _normalize(value)))
+            elif field == "sitemap":
+                sitemaps.append(value)
+        return cls(groups, sitemaps)
+
+    def _rules_for(self, user_agent: str) -> Optional[_RuleSet]:
+        return self._groups.get(product_token(user_agent)) or self._groups.get("*")
+
+    def can_fetch(self, user_agent: str, url: str) -> bool:
+        return self.allowed_paths(user_agent, [url])[0]
+
+    def _verdicts(self, user_agent: str, paths: List[str]) -> List[bool]:
+        rules = self._rules_for(user_agent)
+        if rules is None:
+            return [True] * len(paths)
+        return [path == "/robots.txt" or rules.allowed(path) for path in paths]
+
+    def allowed_paths(self, user_agent: str, urls: Iterable[str]) -> List[bool]:
+        """Whether `user_agent` may fetch each of `urls` (full URLs or paths), in order."""
+        return self._verdicts(user_agent, [_path_of(url) for url in urls])
+
+    def can_fetch_many(self, user_agents: Iterable[str], urls: Iterable[str]) -> Dict[str, List[bool]]:
+        """Allow/deny for every agent × URL: {agent: [allowed per URL, in order]}."""
+        paths = [_path_of(url) for url in urls]
+        # Agents that fall back to the same group share its verdicts
+        by_group: Dict[int, List[bool]] = {}
+        verdicts = {}
+        for agent in user_agents:
+            group = id(self._rules_for(agent))
+            if group not in by_group:
+                by_group[group] = self._verdicts(agent, paths)
+            verdicts[agent] = by_group[group]
+        return verdicts
@@ -0,0 +1,105 @@
+import gzip
+import io
+import itertools
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from utils.fetch_context import FetchContext
+
+GZIP_MAGIC = b"\x1f\x8b"
+READ_BUFFER = 64 * 1024
+
+ROOT_KINDS = {"urlset", "sitemapindex"}
+ENTRY_KINDS = {"url", "sitemap"}
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+class _ChunkStream(io.RawIOBase):
+    """Read-only binary file object over an iterator of byte chunks."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+@contextmanager
+def open_sitemap(fetch: FetchContext, url: str, timeout: float = 15):
+    """
+    Opens a sitemap for streaming and yields (response, binary stream).
+
+    HTTP content-encoding is undone on the fly, and so is gzip when the file
+    itself is gzipped (.xml.gz), recognised by its magic bytes rather than by
+    the URL or Content-Type. Raises for non-2xx statuses. Sitemaps are read
+    in bulk, so the requests are paced on the host's crawl budget.
+    """
+    with fetch.stream(url, timeout=timeout, crawl=True) as response:
+        response.raise_for_status()
+        chunks = response.iter_content(chunk_size=READ_BUFFER)
+        first = next(chunks, b"")
+        body = io.BufferedReader(_ChunkStream(itertools.chain([first], chunks)), buffer_size=READ_BUFFER)
+        if first[:2] == GZIP_MAGIC:
+            body = gzip.GzipFile(fileobj=body)
+        yield response, body
+
+
+class SitemapParser:
+    """
+    Incremental parser for one sitemap document.
+
+    Iterating yields (kind, loc, lastmod) for every <url> ("url") or
+    <sitemap> ("sitemap") entry as it is read, and then discards it, so
+    memory use doesn't grow with the size of the document. `kind` holds the
+    root element's name ("urlset" or "sitemapindex") once parsing started.
+    Raises ET.ParseError on malformed XML and ValueError for a root element
+    that isn't a sitemap.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.kind: Optional[str] = None
+
+    def __iter__(self) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        root = None
+        depth = 0
+        loc = lastmod = None
+        for event, elem in ET.iterparse(self.stream, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                    self.kind = _local_name(elem.tag)
+                    if self.kind not in ROOT_KINDS:
+                        raise ValueError(f"Unknown root tag '{elem.tag}'")
+                depth += 1
+                continue
+
+            # Depth of the element that just ended: root 0, entries 1, their fields 2
+            depth -= 1
+            name = _local_name(elem.tag)
+            if depth == 2 and name == "loc" and elem.text:
+                # Only the entry's own <loc>, not e.g. <image:loc> nested deeper
+                loc = elem.text.strip()
+            elif depth == 2 and name == "lastmod" and elem.text:
+                lastmod = elem.text.strip()
+            elif depth == 1 and name in ENTRY_KINDS:
+                yield name, loc, lastmod
+                loc = lastmod = None
+                # Drop the finished entry (and everything before it)
+                root.clear()